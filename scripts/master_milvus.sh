@@ -44,25 +44,22 @@ for dim in "${DIMENSIONS[@]}"; do
         echo "   [Status] Starting Milvus..." | tee -a "$LOG_FILE"
         docker compose -f "$DOCKER_COMPOSE_FILE" -p vector-bench up -d milvus-standalone milvus-minio milvus-etcd >> "$LOG_FILE" 2>&1
         
-        # 3. STABILIZATION
-        echo "   [Status] Waiting 45s for database health..." | tee -a "$LOG_FILE"
-        sleep 45
+        # 3. STABILIZATION (polls gRPC + :9091/healthz, records time_to_ready)
+        echo "   [Status] Waiting for database health..." | tee -a "$LOG_FILE"
+        if ! python3 "$PROJECT_ROOT/src/utils/healthcheck.py" --wait milvus --dim $dim --size $size >> "$LOG_FILE" 2>&1; then
+            echo "   [Error] Milvus did not become ready, skipping $TEST_ID" | tee -a "$LOG_FILE"
+            continue
+        fi
 
         # --- STATS RECORDER ---
+        # cgroup v2 sampler (cpu.stat / memory.current / io.stat, 0.2s) στο background.
+        # Το ingestion script γράφει τη φάση του (ingest / flush / recovery) στο $BENCH_PHASE_FILE.
         echo "   [Status] Starting Stats Recorder -> $STATS_FILE" | tee -a "$LOG_FILE"
-        echo "Timestamp,Container,CPU_Perc,Mem_Usage,Net_IO,Block_IO" > "$STATS_FILE"
-        
-        (
-            while true; do
-                timestamp=$(date +%H:%M:%S)
-                # Φιλτράρουμε μόνο τα containers αυτού του project
-                docker stats --no-stream --format "{{.Name}},{{.CPUPerc}},{{.MemUsage}},{{.NetIO}},{{.BlockIO}}" \
-                $(docker ps --format "{{.Names}}" | grep "vector-bench") \
-                | sed "s/^/$timestamp,/" >> "$STATS_FILE"
-                sleep 5
-            done
-        ) &
-        STATS_PID=$! 
+        export BENCH_PHASE_FILE="${STATS_DIR}/phase_${TEST_ID}"
+        echo "idle" > "$BENCH_PHASE_FILE"
+        python3 "$PROJECT_ROOT/src/utils/cgroups.py" --containers milvus_db,milvus-etcd,milvus-minio \
+            --output "$STATS_FILE" >> "$LOG_FILE" 2>&1 &
+        STATS_PID=$!
         # ----------------------
 
         # 4. EXECUTION 
@@ -70,7 +67,9 @@ for dim in "${DIMENSIONS[@]}"; do
         cd "$PROJECT_ROOT" && run_output=$(python3 "$PYTHON_SCRIPT" $dim $size 2>&1)
         
         # --- STOP STATS ---
-        kill $STATS_PID
+        kill $STATS_PID 2>/dev/null
+        wait $STATS_PID 2>/dev/null
+        rm -f "$BENCH_PHASE_FILE"
         echo "   [Status] Stats Recorder Stopped." | tee -a "$LOG_FILE"
 
         echo "$run_output" >> "$LOG_FILE"
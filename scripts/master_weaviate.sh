@@ -11,6 +11,8 @@ DOCKER_COMPOSE_FILE="$PROJECT_ROOT/docker/docker-compose.yml"
 PYTHON_SCRIPT="$PROJECT_ROOT/src/ingestion/ingest_weaviate.py"
 
 CONTAINER_NAME="weaviate_db"
+# Optional memory cap for the adaptive importer, e.g. WEAVIATE_MEM_LIMIT=6G ./master_weaviate.sh
+MEM_LIMIT_ARG=${WEAVIATE_MEM_LIMIT:+--mem-limit $WEAVIATE_MEM_LIMIT}
 
 mkdir -p "$STATS_DIR"
 mkdir -p "$(dirname "$LOG_FILE")"
@@ -60,32 +62,31 @@ for dim in "${DIMENSIONS[@]}"; do
         # 3. WAIT 
         echo "   [Status] Waiting for Weaviate to allow connections..." | tee -a "$LOG_FILE"
      
-        timeout 60s bash -c 'until curl -s -o /dev/null http://localhost:8080/v1/.well-known/ready; do sleep 2; done'
-       
-        sleep 5 
+        python3 "$PROJECT_ROOT/src/utils/healthcheck.py" --wait weaviate --dim $dim --size $size 2>&1 | tee -a "$LOG_FILE"
+        if [ "${PIPESTATUS[0]}" -ne 0 ]; then
+            echo "   [Error] Weaviate did not become ready, skipping $TEST_ID" | tee -a "$LOG_FILE"
+            continue
+        fi
         
         # --- STATS RECORDER ---
+        # cgroup v2 sampler (cpu.stat / memory.current / io.stat, 0.2s), φάσεις από το $BENCH_PHASE_FILE
         echo "   [Status] Recording Stats -> $STATS_FILE" | tee -a "$LOG_FILE"
-        echo "Timestamp,Container,CPU_Perc,Mem_Usage,Net_IO,Block_IO" > "$STATS_FILE"
-        (
-            while true; do
-                ts=$(date +%H:%M:%S)
-                
-                docker stats --no-stream --format "{{.Name}},{{.CPUPerc}},{{.MemUsage}},{{.NetIO}},{{.BlockIO}}" $CONTAINER_NAME \
-                | sed "s/^/$ts,/" >> "$STATS_FILE"
-                sleep 5
-            done
-        ) &
+        export BENCH_PHASE_FILE="${STATS_DIR}/phase_${TEST_ID}"
+        echo "idle" > "$BENCH_PHASE_FILE"
+        python3 "$PROJECT_ROOT/src/utils/cgroups.py" --containers $CONTAINER_NAME \
+            --output "$STATS_FILE" >> "$LOG_FILE" 2>&1 &
         STATS_PID=$!
         # ----------------------------
 
         # 4. RUN PYTHON LOADER
         echo "   [Status] Loading Data..." | tee -a "$LOG_FILE"
     
-        cd "$PROJECT_ROOT" && run_output=$(python3 "$PYTHON_SCRIPT" $dim $size 2>&1)
+        cd "$PROJECT_ROOT" && run_output=$(python3 "$PYTHON_SCRIPT" $dim $size $MEM_LIMIT_ARG 2>&1)
         
         # --- STOP STATS ---
         kill $STATS_PID 2>/dev/null
+        wait $STATS_PID 2>/dev/null
+        rm -f "$BENCH_PHASE_FILE"
         
         echo "$run_output" >> "$LOG_FILE"
 
@@ -3,11 +3,11 @@ import time
 import os
 import sys
 import argparse 
+import importlib
 
 # --- DEFAULT CONFIGURATION ---
 ALL_DATABASES = ["milvus", "weaviate"]
 ALL_DIMENSIONS = [128, 512, 1024]
-SIZES = ["small", "medium", "big"]
 
 QUERIES = [
     "src/queries/query1_city.py",
@@ -19,9 +19,17 @@ QUERIES = [
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../"))
+sys.path.append(PROJECT_ROOT)
+from src.utils import healthcheck
+from src.utils.dataset import Dataset, DATA_ROOT, folder_name, select_dataset
+from src.utils.layouts import LAYOUTS, select_layout
+from src.utils.cgroups import parse_size
 
 def docker_reset(db):
+    if db == "local":
+        return
     print(f"\n[DOCKER] Hard Reset for {db}...")
+    t0 = time.perf_counter()
     if db == "milvus":
         subprocess.run(["docker", "stop", "weaviate_db"], capture_output=True)
         subprocess.run(["docker", "restart", "milvus_db", "milvus-etcd", "milvus-minio"], capture_output=True)
@@ -29,16 +37,69 @@ def docker_reset(db):
         subprocess.run(["docker", "stop", "milvus_db", "milvus-etcd", "milvus-minio"], capture_output=True)
         subprocess.run(["docker", "restart", "weaviate_db"], capture_output=True)
     
-    print("   -> Waiting 45s for DB to stabilize...")
-    time.sleep(45) 
+    print("   -> Waiting for DB health checks...")
+    healthcheck.wait_ready(db)
+    healthcheck.record_lifecycle("time_to_ready", time.perf_counter() - t0, db)
+
+def run_subprocess_cell(db, dim, size, concurrency, query_args, append=False, mem_limit=None):
+    """Παλιά συμπεριφορά: ένα python3 process για το loading και ένα για κάθε query script."""
+    load_proc = subprocess.run(["python3", "src/ingestion/loader_wrapper.py", db, str(dim), size]
+                               + (["--append"] if append else []) + (["--mem-limit", str(mem_limit)] if mem_limit else []))
+    if load_proc.returncode != 0:
+        print(f" CRASH DURING LOADING {db} {dim} {size}. Skipping queries...")
+        return
+
+    for q_script in QUERIES:
+        print(f"   -> Running {q_script}...")
+        subprocess.run(["python3", q_script, db, str(dim), size, "--concurrency", concurrency] + query_args)
+
+
+def run_in_process_cell(db, dim, size, workloads, options, append=False, mem_limit=None):
+    """Loading και όλα τα workloads στο ίδιο process: ένα connection, ένα memmap των vectors
+    και ένα col.load() ανά (db, dim, size), χωρίς release ανάμεσα στα query scripts."""
+    from src.ingestion import loader_wrapper
+    from src.queries import driver
+
+    try:
+        loader_wrapper.load_data(db, dim, size, append=append, mem_limit=mem_limit)
+    except (Exception, SystemExit) as e:
+        print(f" CRASH DURING LOADING {db} {dim} {size} ({e}). Skipping queries...")
+        return
+
+    handle = driver.open_backend(db, dim)
+    try:
+        for q_script, workload in zip(QUERIES, workloads):
+            print(f"   -> Running {q_script}...")
+            try:
+                driver.run_workload(workload, db, dim, size, handle=handle, **options)
+            except Exception as e:
+                print(f"   [ERROR] {q_script} failed: {e}")
+    finally:
+        driver.close_backend(db, handle)
+
 
 def main():
     # --- 1. ARGUMENT PARSING ---
     parser = argparse.ArgumentParser(description="Run Full Benchmark Suite")
-    parser.add_argument("--db", type=str, choices=["milvus", "weaviate", "all"], default="all", help="Database to benchmark")
+    parser.add_argument("--db", type=str, choices=["milvus", "weaviate", "local", "all"], default="all",
+                        help="Database to benchmark ('local' = in-process NumPy brute force, no docker; not part of 'all')")
     parser.add_argument("--dim", type=int, choices=[128, 512, 1024, 0], default=0, help="Dimension to run (0 for all)")
+    parser.add_argument("--dataset", type=str, default=None,
+                        help="Dataset folder under data/ (e.g. imported by import_ann.py); its dimension replaces --dim")
+    parser.add_argument("--layout", choices=LAYOUTS, default=None,
+                        help="Load and query a partition-key / partitions (Milvus) or tenants (Weaviate) layout on city_id")
+    parser.add_argument("--partitions", type=int, default=None, help="Buckets of the --layout (1000 = one per city)")
+    parser.add_argument("--concurrency", type=str, default="1", help="Concurrent query workers, e.g. '1,8,32' or 'sweep' for 1,2,4...64")
     
-    args = parser.parse_args()
+    parser.add_argument("--mem-limit", type=parse_size, default=None,
+                        help="Weaviate container memory cap (e.g. 6G): the importer slows down / pauses before reaching it")
+    parser.add_argument("--growth", action="store_true",
+                        help="Grow one collection per dimension through the sizes, appending only the missing rows")
+    parser.add_argument("--subprocess", action="store_true",
+                        help="Run the loader and every query script in a fresh python3 process (old behaviour)")
+    
+    # Ό,τι δεν αναγνωρίζεται εδώ (π.χ. --mode open --rate sweep) περνάει αυτούσιο στα query scripts
+    args, query_args = parser.parse_known_args()
 
     # --- 2. FILTERING BASED ON ARGS ---
     if args.db != "all":
@@ -46,35 +107,60 @@ def main():
     else:
         target_databases = ALL_DATABASES
 
-    if args.dim != 0:
+    if args.dataset:
+        # Περνάει και στα subprocesses (BENCH_DATASET)
+        folder = os.path.join(DATA_ROOT, args.dataset)
+        if not Dataset.exists(folder):
+            parser.error(f"No dataset at {folder}")
+        select_dataset(args.dataset)
+        target_dimensions = [Dataset(folder).dim]
+    elif args.dim != 0:
         target_dimensions = [args.dim]
     else:
         target_dimensions = ALL_DIMENSIONS
 
+    # Και αυτό ως env var (BENCH_LAYOUT) για loader και query scripts
+    try:
+        select_layout(args.layout, args.partitions)
+    except ValueError as e:
+        parser.error(str(e))
+
     # --- 3. EXECUTION ---
     os.chdir(PROJECT_ROOT)
     print(f"Working Directory set to: {os.getcwd()}")
     print(f"Target DBs: {target_databases}")
     print(f"Target Dims: {target_dimensions}")
 
+    if not args.subprocess:
+        from src.queries import driver
+        # Τα ίδια options με τα query scripts, ώστε τα query_args να ελέγχονται μία φορά εδώ
+        options_parser = argparse.ArgumentParser(prog="run_full_suite.py (query options)")
+        driver.add_workload_options(options_parser)
+        options = driver.workload_options(options_parser.parse_args(query_args + ["--concurrency", args.concurrency]))
+        workloads = [importlib.import_module(q[:-3].replace("/", ".")) for q in QUERIES]
+
     for db in target_databases:
         for dim in target_dimensions:
             
             docker_reset(db) 
+            if not args.subprocess:
+                driver.reset_connection(db)
             
-            for size in SIZES:
+            # Size tiers (src/utils/sizes.py + data/sizes.json), μόνο όσα χωράνε στις γραμμές του dataset
+            folder = os.path.join(DATA_ROOT, folder_name(dim))
+            if not Dataset.exists(folder):
+                print(f" No dataset for {dim}d at {folder}. Skipping...")
+                continue
+            dataset = Dataset(folder)
+            sizes = sorted((s for s, rows in dataset.sizes.items() if rows <= dataset.rows), key=dataset.sizes.get)
+            for size in sizes:
                 print(f"\n🚀 STARTING EXPERIMENT: {db} | {dim}d | {size}")
-                
-                load_cmd = ["python3", "src/ingestion/loader_wrapper.py", db, str(dim), size]
-                load_proc = subprocess.run(load_cmd)
-                
-                if load_proc.returncode != 0:
-                    print(f" CRASH DURING LOADING {db} {dim} {size}. Skipping queries...")
-                    continue 
-                
-                for q_script in QUERIES:
-                    print(f"   -> Running {q_script}...")
-                    subprocess.run(["python3", q_script, db, str(dim), size])
+                # Growth mode: το πρώτο size ξεκινάει από άδειο collection, τα επόμενα συνεχίζουν από εκεί
+                append = args.growth and size != sizes[0]
+                if args.subprocess:
+                    run_subprocess_cell(db, dim, size, args.concurrency, query_args, append, args.mem_limit)
+                else:
+                    run_in_process_cell(db, dim, size, workloads, options, append, args.mem_limit)
                 
     print("\n BENCHMARK SUITE COMPLETE. Check results/ folder.")
 
@@ -0,0 +1,104 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+import numpy as np
+
+# --- CONFIGURATION ---
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, "../../data"))
+sys.path.append(os.path.normpath(os.path.join(SCRIPT_DIR, "../../")))
+from src.utils.dataset import Dataset, MANIFEST, CHUNK_ROWS, folder_name, select_dataset, write_manifest
+from src.utils.precision import PRECISIONS, STORAGE_DTYPES, PRECISION_DIR, PARAMS_FILE, column_stats, encode, vector_bytes
+
+# float16 / bfloat16 / int8 / binary αντίγραφα των float32 vectors ενός dataset (src/utils/precision.py).
+# Τα float32 δεν αλλάζουν: ground truth, query sets και payloads μένουν κοινά για όλα τα variants.
+VARIANTS = PRECISIONS[1:]
+
+
+def parse_precisions(value):
+    """'all' -> όλα τα variants, 'float16,binary' -> [float16, binary]"""
+    if value == "all":
+        return list(VARIANTS)
+    precisions = [v for v in value.split(",") if v]
+    unknown = set(precisions) - set(VARIANTS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown precisions: {', '.join(sorted(unknown))} (known: {', '.join(VARIANTS)})")
+    return precisions
+
+
+def variant_layout(precision, shards):
+    """Ένα αρχείο ανά float32 shard, με τα ίδια όρια γραμμών."""
+    if len(shards) == 1:
+        return [(os.path.join(PRECISION_DIR, f"{precision}.npy"), shards[0]["rows"])]
+    return [(os.path.join(PRECISION_DIR, precision, f"shard_{i:05d}.npy"), s["rows"]) for i, s in enumerate(shards)]
+
+
+def convert_dataset(folder, precisions=None):
+    """Γράφει τα variants με chunks των CHUNK_ROWS (σταθερή μνήμη) και τα δηλώνει στο manifest.
+    Ένα πέρασμα για τα min / max / mean ανά διάσταση (int8, binary), ένα για τα codes."""
+    precisions = precisions or list(VARIANTS)
+    dataset = Dataset(folder)
+    dim = dataset.dim
+    if not os.path.exists(os.path.join(folder, MANIFEST)):
+        # Παλιό dataset χωρίς manifest: ένα vectors.npy
+        write_manifest(folder, dim, [("vectors.npy", dataset.rows)])
+        dataset = Dataset(folder)
+    manifest = dict(dataset.manifest)
+    shards = manifest["shards"]
+    offsets = np.cumsum([0] + [s["rows"] for s in shards])
+    print(f"--- CONVERTING {dataset.name} ({dataset.rows:,} x {dim}d) -> {', '.join(precisions)} ---")
+
+    params = None
+    if {"int8", "binary"} & set(precisions):
+        print("   -> Per-dimension min / max / mean...")
+        params = column_stats(dataset.iter_chunks(chunk=CHUNK_ROWS), dim)
+        os.makedirs(os.path.join(folder, PRECISION_DIR), exist_ok=True)
+        np.savez(os.path.join(folder, PARAMS_FILE), **params)
+        manifest["precision_params"] = PARAMS_FILE
+
+    variants = manifest.get("precisions", {})
+    for precision in precisions:
+        layout = variant_layout(precision, shards)
+        shutil.rmtree(os.path.join(folder, PRECISION_DIR, precision), ignore_errors=True)
+        outputs = []
+        for path, rows in layout:
+            os.makedirs(os.path.dirname(os.path.join(folder, path)), exist_ok=True)
+            width = vector_bytes("binary", dim) if precision == "binary" else dim
+            outputs.append(np.lib.format.open_memmap(os.path.join(folder, path), mode="w+",
+                                                     dtype=STORAGE_DTYPES[precision], shape=(rows, width)))
+        for start, end, chunk in dataset.iter_chunks(chunk=CHUNK_ROWS):
+            # Τα chunks δεν περνάνε όρια shard
+            shard = int(np.searchsorted(offsets, start, side="right")) - 1
+            local = start - int(offsets[shard])
+            outputs[shard][local:local + end - start] = encode(precision, chunk, params)
+        for out in outputs:
+            out.flush()
+        del outputs
+        variants[precision] = {"dtype": precision, "bytes_per_vector": vector_bytes(precision, dim),
+                               "shards": [{"file": path, "rows": rows} for path, rows in layout]}
+        print(f"    {precision}: {vector_bytes(precision, dim)} bytes / vector "
+              f"({dataset.rows * vector_bytes(precision, dim) / 2**20:,.1f} MiB)")
+
+    manifest["precisions"] = variants
+    with open(os.path.join(folder, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    print("    Manifest updated.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write float16 / bfloat16 / int8 / binary copies of a dataset's vectors")
+    parser.add_argument("dims", type=lambda v: [int(d) for d in v.split(",") if d], help="Comma separated dimensions, e.g. 128,512")
+    parser.add_argument("--precisions", type=parse_precisions, default=list(VARIANTS),
+                        help=f"Comma separated subset of {','.join(VARIANTS)} (default: all)")
+    parser.add_argument("--dataset", default=None, help="Dataset folder under data/ instead of the exp_* of the dimension")
+    args = parser.parse_args()
+    select_dataset(args.dataset)
+    for dim in args.dims:
+        folder = os.path.join(DATA_DIR, folder_name(dim))
+        if not Dataset.exists(folder):
+            print(f"[Error] Dataset not found: {folder}")
+            sys.exit(1)
+        convert_dataset(folder, args.precisions)
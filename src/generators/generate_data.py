@@ -1,15 +1,25 @@
 import os
-import numpy as np
+import sys
 import json
-import random
+import argparse
+import numpy as np
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 
 # --- CONFIGURATION ---
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, "../../data"))
+sys.path.append(os.path.normpath(os.path.join(SCRIPT_DIR, "../../")))
+from src.utils.payloads import write_column, write_selectivity_columns
+from src.utils.dataset import write_manifest
+from src.generators.convert_precision import convert_dataset, parse_precisions
 
 TOTAL_VECTORS = 2_500_000
-TOTAL_VECTORS = 2_500_000 
+CHUNK_SIZE = 100_000
+# Πάνω από τόσες γραμμές τα vectors γράφονται σε shards (vectors/shard_00000.npy, ...) αντί για ένα αρχείο
+SHARD_ROWS = 10_000_000
+DEFAULT_SEED = 42
 
 EXPERIMENTS = [
     {"name": "exp_1_128d",  "dim": 128},
@@ -17,42 +27,171 @@ EXPERIMENTS = [
     {"name": "exp_3_1024d", "dim": 1024},
 ]
 
-def generate_dataset(config):
+# --- VECTOR DISTRIBUTIONS ---
+# Κάθε distribution: fn(rng, count, dim, options) -> (vectors float32, cluster labels ή None).
+# Για νέα κατανομή αρκεί μια εγγραφή στο DISTRIBUTIONS.
+
+def uniform_vectors(rng, count, dim, options):
+    return rng.random((count, dim), dtype=np.float32), None
+
+
+@lru_cache(maxsize=4)
+def mixture_centers(seed, dim, clusters, skew):
+    """Κέντρα και βάρη των clusters. Εξαρτώνται μόνο από το seed, ώστε όλα τα chunks
+    (σε οποιοδήποτε process) να βλέπουν το ίδιο mixture."""
+    rng = np.random.default_rng([seed, dim, clusters])
+    centers = rng.random((clusters, dim), dtype=np.float32)
+    # Zipf βάρη: skew=0 -> ισομεγέθη clusters, skew>0 -> λίγα πολύ μεγάλα clusters
+    weights = 1.0 / np.arange(1, clusters + 1) ** skew
+    return centers, weights / weights.sum()
+
+
+def gaussian_mixture_vectors(rng, count, dim, options):
+    centers, weights = mixture_centers(options["seed"], dim, options["clusters"], options["cluster_skew"])
+    labels = rng.choice(len(centers), size=count, p=weights).astype(np.int32)
+    noise = rng.standard_normal((count, dim), dtype=np.float32)
+    noise *= options["cluster_std"] / np.sqrt(dim)
+    return centers[labels] + noise, labels
+
+
+DISTRIBUTIONS = {
+    "uniform": uniform_vectors,
+    "mixture": gaussian_mixture_vectors,
+}
+
+
+def _generate_chunk(task):
+    """Τρέχει σε worker process: γράφει τις γραμμές [start, start+count) απευθείας στο .npy memmap
+    του shard τους (local_start = θέση μέσα στο shard)."""
+    vec_file, local_start, label_file, dim, start, count, options = task
+    # Το seed του chunk εξαρτάται μόνο από (seed, dim, chunk), όχι από τον αριθμό των workers
+    rng = np.random.default_rng([options["seed"], dim, start // CHUNK_SIZE])
+    chunk, labels = DISTRIBUTIONS[options["distribution"]](rng, count, dim, options)
+    if options["normalize"]:
+        chunk /= np.linalg.norm(chunk, axis=1, keepdims=True)
+
+    vectors = np.load(vec_file, mmap_mode="r+")
+    vectors[local_start:local_start + count] = chunk
+    vectors.flush()
+    if labels is not None:
+        clusters = np.load(label_file, mmap_mode="r+")
+        clusters[start:start + count] = labels
+        clusters.flush()
+    return start
+
+
+def generate_payloads(folder, total, seed, dim, jsonl=False):
+    """Vectorized payloads: οι στήλες φτιάχνονται με numpy και γράφονται ως .npy ανά στήλη
+    (src/utils/payloads.py). Το payloads.jsonl (μόνο οι βασικές στήλες) γράφεται μόνο αν ζητηθεί.
+    Οι στήλες selectivity χρειάζονται τα clusters / vectors, οπότε γράφονται μετά από αυτά."""
+    rng = np.random.default_rng([seed, dim, 0xC17])
+    city_ids = rng.integers(1, 1001, size=total)
+    quality_scores = np.round(rng.random(total), 2)
+
+    write_column(folder, "id", np.arange(total))
+    write_column(folder, "city_id", city_ids)
+    write_column(folder, "quality_score", quality_scores)
+    write_selectivity_columns(folder, seed)
+    if not jsonl:
+        return
+
+    with open(os.path.join(folder, "payloads.jsonl"), "w") as f:
+        for start in range(0, total, CHUNK_SIZE):
+            end = min(start + CHUNK_SIZE, total)
+            rows = zip(range(start, end), city_ids[start:end].tolist(), quality_scores[start:end].tolist())
+            f.write("".join(f'{{"id": {i}, "city_id": {c}, "quality_score": {q}}}\n' for i, c, q in rows))
+
+
+def shard_layout(total, shard_rows=SHARD_ROWS):
+    """[(relative path, first row, rows), ...]. Ένα vectors.npy αν χωράει, αλλιώς shards
+    πολλαπλάσια του CHUNK_SIZE ώστε κανένα chunk να μη μοιράζεται σε δύο αρχεία."""
+    if total <= shard_rows:
+        return [("vectors.npy", 0, total)]
+    shard_rows = max(CHUNK_SIZE, shard_rows // CHUNK_SIZE * CHUNK_SIZE)
+    return [(os.path.join("vectors", f"shard_{i:05d}.npy"), start, min(shard_rows, total - start))
+            for i, start in enumerate(range(0, total, shard_rows))]
+
+
+def generate_dataset(config, options, total=TOTAL_VECTORS, workers=None, jsonl=False, shard_rows=SHARD_ROWS, precisions=None):
     folder = os.path.join(DATA_DIR, config["name"])
     os.makedirs(folder, exist_ok=True)
-    
-    vec_file = os.path.join(folder, "vectors.npy")
-    payload_file = os.path.join(folder, "payloads.jsonl")
-    
-    print(f"--- GENERATING {config['name']} ({config['dim']}d) ---")
-    
+    dim = config["dim"]
+
+    label_file = os.path.join(folder, "clusters.npy")
+    shards = shard_layout(total, shard_rows)
+
+    print(f"--- GENERATING {config['name']} ({dim}d, {options['distribution']}, seed={options['seed']}, "
+          f"{len(shards)} file(s)) ---")
+
     # 1. Generate Vectors (Float32) with Header
-    if os.path.exists(vec_file):
-        print(f"  {vec_file} exists. Overwriting...")
-
-    vectors = np.lib.format.open_memmap(vec_file, mode='w+', dtype='float32', shape=(TOTAL_VECTORS, config['dim']))
-    
-    chunk_size = 100_000
-    for i in range(0, TOTAL_VECTORS, chunk_size):
-        vectors[i:i+chunk_size] = np.random.rand(chunk_size, config['dim']).astype('float32')
-        if i % 500_000 == 0:
-            print(f"   -> Generated {i} vectors...")
-            
-    del vectors # Flush to disk
+    if len(shards) > 1:
+        os.makedirs(os.path.join(folder, "vectors"), exist_ok=True)
+    for path, _, _ in shards:
+        if os.path.exists(os.path.join(folder, path)):
+            print(f"  {path} exists. Overwriting...")
+            break
+
+    # Δημιουργούμε κάθε αρχείο (header + μέγεθος) μία φορά. Τα workers γράφουν τα chunks τους σε r+ mode
+    for path, _, rows in shards:
+        np.lib.format.open_memmap(os.path.join(folder, path), mode='w+', dtype='float32', shape=(rows, dim)).flush()
+    if options["distribution"] == "mixture":
+        np.lib.format.open_memmap(label_file, mode='w+', dtype='int32', shape=(total,)).flush()
+    elif os.path.exists(label_file):
+        os.remove(label_file)
+
+    tasks = [(os.path.join(folder, path), start - first, label_file, dim, start, min(CHUNK_SIZE, first + rows - start), options)
+             for path, first, rows in shards
+             for start in range(first, first + rows, CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for done, start in enumerate(pool.map(_generate_chunk, tasks), 1):
+            if done % 5 == 0 or done == len(tasks):
+                print(f"   -> Generated {min(start + CHUNK_SIZE, total):,} vectors...")
     print("    Vectors Saved.")
 
+    # Το manifest πρώτα: το corr_bucket ενός uniform dataset διαβάζει τα vectors μέσω Dataset
+    write_manifest(folder, dim, [(path, rows) for path, _, rows in shards])
+
     # 2. Generate Payloads
     print("   -> Generating Metadata...")
-    with open(payload_file, "w") as f:
-        for i in range(TOTAL_VECTORS):
-            record = {
-                "id": i,
-                "city_id": random.randint(1, 1000),
-                "quality_score": round(random.random(), 2)
-            }
-            f.write(json.dumps(record) + "\n")
+    generate_payloads(folder, total, options["seed"], dim, jsonl)
     print("    Metadata Saved.")
 
+    # Ό,τι χρειάζεται για να ξαναβγεί ακριβώς το ίδιο dataset
+    with open(os.path.join(folder, "generation.json"), "w") as f:
+        json.dump(dict(options, total=total, dim=dim), f, indent=2)
+
+    # 3. Reduced-precision αντίγραφα (src/generators/convert_precision.py)
+    if precisions:
+        convert_dataset(folder, precisions)
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate benchmark datasets")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--total", type=int, default=TOTAL_VECTORS)
+    parser.add_argument("--dims", type=str, default="", help="Comma separated subset of 128,512,1024")
+    parser.add_argument("--distribution", choices=sorted(DISTRIBUTIONS), default="mixture")
+    parser.add_argument("--clusters", type=int, default=1000, help="Mixture components")
+    parser.add_argument("--cluster-std", type=float, default=0.5, help="Per-cluster spread (norm of the noise)")
+    parser.add_argument("--cluster-skew", type=float, default=1.0, help="Zipf exponent of cluster sizes (0 = equal)")
+    parser.add_argument("--normalize", action="store_true", help="Unit-normalize vectors (IP / cosine)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--jsonl", action="store_true", help="Also write the legacy payloads.jsonl")
+    parser.add_argument("--shard-rows", type=int, default=SHARD_ROWS,
+                        help="Split vectors into .npy shards of this many rows when --total is larger")
+    parser.add_argument("--precisions", type=parse_precisions, default=None,
+                        help="Also write float16,bfloat16,int8,binary copies (or 'all')")
+    args = parser.parse_args()
+
+    options = {
+        "seed": args.seed,
+        "distribution": args.distribution,
+        "clusters": args.clusters,
+        "cluster_std": args.cluster_std,
+        "cluster_skew": args.cluster_skew,
+        "normalize": args.normalize,
+    }
+    dims = {int(d) for d in args.dims.split(",") if d}
     for exp in EXPERIMENTS:
-        generate_dataset(exp)
\ No newline at end of file
+        if not dims or exp["dim"] in dims:
+            generate_dataset(exp, options, args.total, args.workers, args.jsonl, args.shard_rows, args.precisions)
@@ -0,0 +1,155 @@
+import os
+import sys
+import shutil
+import argparse
+import numpy as np
+
+# Προαιρετικό: μόνο για τα .hdf5 του ann-benchmarks
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+# --- CONFIGURATION ---
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, "../../data"))
+sys.path.append(os.path.normpath(os.path.join(SCRIPT_DIR, "../../")))
+from src.generators.generate_data import generate_payloads, shard_layout, CHUNK_SIZE, SHARD_ROWS, DEFAULT_SEED
+from src.utils.dataset import write_manifest
+
+# Metric του ann-benchmarks ("distance" attribute) -> metric των workloads.
+# Τα angular datasets κανονικοποιούνται, οπότε cosine = IP και η σειρά του L2 είναι η ίδια.
+HDF5_METRICS = {"euclidean": "L2", "angular": "IP"}
+
+# Στοιχεία ανά γραμμή των TEXMEX αρχείων (int32 dim + dim τιμές)
+VECS_TYPES = {".fvecs": np.float32, ".bvecs": np.uint8, ".ivecs": np.int32}
+
+
+def open_vecs(path):
+    """Read-only memmap (rows, dim) πάνω σε ένα .fvecs / .bvecs / .ivecs, χωρίς να διαβαστεί το αρχείο.
+    Κάθε γραμμή είναι <int32 dim><dim τιμές>, οπότε ένα structured dtype τη διαβάζει ολόκληρη."""
+    value_type = VECS_TYPES[os.path.splitext(path)[1]]
+    dim = int(np.fromfile(path, dtype=np.int32, count=1)[0])
+    row = np.dtype([("dim", np.int32), ("vec", value_type, (dim,))])
+    rows = os.path.getsize(path) // row.itemsize
+    return np.memmap(path, dtype=row, mode="r", shape=(rows,))["vec"]
+
+
+class Source:
+    """Base vectors, queries και neighbors μιας πηγής ως arrays που κόβονται σε slices
+    (memmap για τα TEXMEX αρχεία, h5py dataset για το HDF5)."""
+
+    def __init__(self, origin, base, queries=None, neighbors=None, metric="L2", angular=False, handle=None):
+        self.origin = origin
+        self.base = base
+        self.queries = queries
+        self.neighbors = neighbors
+        self.metric = metric
+        self.angular = angular
+        self._handle = handle
+
+    @classmethod
+    def from_vecs(cls, base, queries=None, neighbors=None, metric="L2"):
+        return cls(os.path.basename(base), open_vecs(base), open_vecs(queries) if queries else None,
+                   open_vecs(neighbors) if neighbors else None, metric)
+
+    @classmethod
+    def from_hdf5(cls, path):
+        if h5py is None:
+            raise SystemExit("HDF5 input needs h5py (pip install h5py)")
+        f = h5py.File(path, "r")
+        distance = f.attrs.get("distance", "euclidean")
+        if distance not in HDF5_METRICS:
+            raise SystemExit(f"Unsupported distance '{distance}' in {path}")
+        return cls(os.path.basename(path), f["train"], f["test"], f["neighbors"], HDF5_METRICS[distance],
+                   distance == "angular", f)
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+
+
+def unit(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def import_dataset(name, source, limit=None, seed=DEFAULT_SEED, normalize=False, shard_rows=SHARD_ROWS):
+    """Γράφει το data/<name>/ στο ίδιο layout με το generate_data.py: float32 vectors σε ένα .npy ή σε shards,
+    με chunks του CHUNK_SIZE (σταθερή μνήμη), payload στήλες, manifest. Το query set κρατιέται ως queries.npy.
+    Τα neighbors κρατιούνται μόνο όταν ισχύουν για το αποτέλεσμα: όλες οι γραμμές της πηγής και
+    ίδια σειρά αποστάσεων (το normalize αλλάζει τη σειρά όλων εκτός από τα angular)."""
+    folder = os.path.join(DATA_DIR, name)
+    os.makedirs(folder, exist_ok=True)
+    available, dim = source.base.shape
+    total = min(limit or available, available)
+    normalize = normalize or source.angular
+    shards = shard_layout(total, shard_rows)
+    print(f"--- IMPORTING {name} ({total:,} x {dim}d, {source.metric}{', normalized' if normalize else ''}, "
+          f"{len(shards)} file(s)) ---")
+
+    for path, first, rows in shards:
+        os.makedirs(os.path.dirname(os.path.join(folder, path)), exist_ok=True)
+        out = np.lib.format.open_memmap(os.path.join(folder, path), mode="w+", dtype="float32", shape=(rows, dim))
+        for start in range(first, first + rows, CHUNK_SIZE):
+            end = min(start + CHUNK_SIZE, first + rows)
+            chunk = np.asarray(source.base[start:end], dtype=np.float32)
+            out[start - first:end - first] = unit(chunk) if normalize else chunk
+            if (end // CHUNK_SIZE) % 5 == 0 or end == total:
+                print(f"   -> Imported {end:,} vectors...")
+        out.flush()
+        del out
+    print("    Vectors Saved.")
+
+    extra = {"source": source.origin, "metric": source.metric, "normalized": normalize, "seed": seed}
+    if source.queries is not None:
+        queries = np.asarray(source.queries[:], dtype=np.float32)
+        np.save(os.path.join(folder, "queries.npy"), unit(queries) if normalize else queries)
+        extra["queries"] = "queries.npy"
+        print(f"    Query set: {len(queries):,} queries")
+    keep_neighbors = total == available and (source.angular or not normalize)
+    if source.neighbors is not None and source.queries is not None and keep_neighbors:
+        np.save(os.path.join(folder, "neighbors.npy"), np.asarray(source.neighbors[:], dtype=np.int64))
+        extra["neighbors"] = "neighbors.npy"
+        print(f"    Ground truth: top-{source.neighbors.shape[1]} per query")
+    elif source.neighbors is not None:
+        print("    [WARN] Provided ground truth does not apply to the imported rows; it will be computed exactly")
+    # Υπολείμματα προηγούμενου import / generation στον ίδιο φάκελο: clusters.npy θα άλλαζε το corr_bucket,
+    # το cache του ground_truth/ θα ήταν για άλλα vectors
+    for stale in ("queries.npy", "neighbors.npy", "clusters.npy"):
+        if stale not in extra.values() and os.path.exists(os.path.join(folder, stale)):
+            os.remove(os.path.join(folder, stale))
+    shutil.rmtree(os.path.join(folder, "ground_truth"), ignore_errors=True)
+
+    # Το manifest πρώτα: το corr_bucket διαβάζει τα vectors μέσω Dataset (δεν υπάρχουν clusters)
+    write_manifest(folder, dim, [(path, rows) for path, _, rows in shards], **extra)
+
+    print("   -> Generating Metadata...")
+    generate_payloads(folder, total, seed, dim)
+    print("    Metadata Saved.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import an ANN benchmark dataset (TEXMEX .fvecs/.bvecs/.ivecs or "
+                                                 "ann-benchmarks .hdf5) into data/<name>/")
+    parser.add_argument("name", help="Dataset name, used with --dataset by the ingestion and query scripts")
+    parser.add_argument("--hdf5", help="ann-benchmarks file (train / test / neighbors, needs h5py)")
+    parser.add_argument("--base", help="Base vectors (.fvecs or .bvecs)")
+    parser.add_argument("--queries", help="Query vectors (.fvecs or .bvecs)")
+    parser.add_argument("--gt", help="Ground truth neighbors (.ivecs)")
+    parser.add_argument("--metric", choices=["L2", "IP"], default="L2", help="Metric of the TEXMEX ground truth")
+    parser.add_argument("--limit", type=int, default=None, help="Import only the first N base vectors")
+    parser.add_argument("--normalize", action="store_true", help="Unit-normalize vectors (always on for angular HDF5)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed for the synthetic payload columns")
+    parser.add_argument("--shard-rows", type=int, default=SHARD_ROWS,
+                        help="Split vectors into .npy shards of this many rows")
+    args = parser.parse_args()
+
+    if bool(args.hdf5) == bool(args.base):
+        parser.error("give either --hdf5 or --base")
+    source = Source.from_hdf5(args.hdf5) if args.hdf5 else Source.from_vecs(args.base, args.queries, args.gt, args.metric)
+    try:
+        import_dataset(args.name, source, args.limit, args.seed, args.normalize, args.shard_rows)
+    finally:
+        source.close()
@@ -0,0 +1,125 @@
+import os
+import json
+import time
+from src.utils import cgroups
+
+# --- PATH CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../../"))
+CHECKPOINT_DIR = os.path.join(PROJECT_ROOT, "results", "checkpoints")
+
+# --- CONFIGURATION ---
+CHECKPOINT_ROWS = 250_000     # γραμμές ανά segment: flush + checkpoint μετά από κάθε ένα
+MAX_RESTARTS = 5              # αποτυχημένα segments (π.χ. restart του container) πριν τα παρατήσουμε
+
+
+class Checkpoint:
+    """Το τελευταίο επιβεβαιωμένο (flushed) offset ενός load σε results/checkpoints/<db>_<collection>.json,
+    μαζί με τον active χρόνο μέχρι εκεί, ώστε ένα resumed load να αναφέρει συνολικό χρόνο χωρίς downtime."""
+
+    def __init__(self, db, collection, target, directory=CHECKPOINT_DIR):
+        self.path = os.path.join(directory, f"{db}_{collection}.json")
+        self.target = target
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            state = json.load(f)
+        return state if state.get("target") == self.target else None
+
+    def save(self, start, offset, active_seconds):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"target": self.target, "start": start, "offset": offset,
+                       "active_seconds": active_seconds, "updated": time.strftime("%Y-%m-%d %H:%M:%S")}, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def resume(self, live):
+        """State για resume, ή None για φρέσκο load. live: entities στη βάση (None αν δεν υπάρχει το collection).
+        Αν η βάση έχει λιγότερα από το checkpoint (π.χ. σβήστηκε το volume) το checkpoint δεν ισχύει."""
+        state = self.load()
+        if state is None or live is None:
+            return None
+        if live < state["offset"]:
+            print(f"   [Checkpoint] Database has {live:,} rows but checkpoint says {state['offset']:,}: starting over")
+            return None
+        print(f"   [Checkpoint] Resuming at row {state['offset']:,} / {self.target:,} "
+              f"({state['active_seconds']:.0f}s of active ingestion so far)")
+        return state
+
+
+def existing_rows(start, limit, append):
+    """Από ποια γραμμή συνεχίζει το growth mode. None = χρειάζεται πλήρες reload."""
+    if not append or start == 0:
+        return None
+    if start > limit:
+        print(f"   [GROW] Collection has {start:,} rows, more than {limit:,}: full reload")
+        return None
+    print(f"   [GROW] {start:,} rows already loaded, appending {limit - start:,}")
+    return start
+
+
+def resume_point(checkpoint, live, limit, append):
+    """(start, state): με έγκυρο checkpoint συνεχίζουμε από το offset του, αλλιώς από το growth offset.
+    start=None σημαίνει φρέσκο load (drop + create)."""
+    state = checkpoint.resume(live)
+    if state is not None:
+        return state["start"], state
+    return existing_rows(live or 0, limit, append), None
+
+
+def merge_totals(totals, result):
+    for key, value in result.items():
+        if isinstance(value, (int, float)):
+            totals[key] = totals.get(key, 0) + value
+
+
+def ingest_resumable(checkpoint, start, stop, ingest, wait_ready, state=None, segment=CHECKPOINT_ROWS, max_restarts=MAX_RESTARTS):
+    """Ingestion των γραμμών [start, stop) σε segments, με checkpoint μετά από κάθε επιβεβαιωμένο segment.
+
+    ingest(s, e, overlap) γράφει (και κάνει flush) τις γραμμές [s, e). overlap=True σημαίνει ότι μέρος
+    τους μπορεί να υπάρχει ήδη (resume μετά από crash στη μέση του segment), οπότε πρέπει να γραφτούν
+    idempotently. Αν ένα segment αποτύχει, περιμένουμε wait_ready() και το ξανατρέχουμε από το checkpoint.
+    Ο χρόνος των αποτυχημένων προσπαθειών και της αναμονής μετράει ως downtime, όχι ως active time."""
+    offset = state["offset"] if state else start
+    start = state["start"] if state else start
+    active = state["active_seconds"] if state else 0.0
+    overlap = state is not None
+    downtime, restarts, totals = 0.0, 0, {}
+
+    cgroups.mark_phase("ingest")
+    while offset < stop:
+        end = min(offset + segment, stop)
+        t0 = time.perf_counter()
+        try:
+            result = ingest(offset, end, overlap)
+        except Exception as e:
+            downtime += time.perf_counter() - t0
+            restarts += 1
+            if restarts > max_restarts:
+                raise
+            print(f"\n   [Checkpoint] Rows {offset:,}-{end:,} failed ({e}). Waiting for the database...")
+            cgroups.mark_phase("recovery")
+            downtime += wait_ready()
+            cgroups.mark_phase("ingest")
+            overlap = True
+            continue
+        active += time.perf_counter() - t0
+        merge_totals(totals, result or {})
+        offset, overlap = end, False
+        checkpoint.save(start, offset, active)
+
+    checkpoint.clear()
+    cgroups.mark_phase("idle")
+    return {"rows": stop - start, "active_seconds": active, "downtime": downtime, "restarts": restarts, "totals": totals}
+
+
+def print_resume_summary(result):
+    print(f"\n   [Checkpoint] active={result['active_seconds']:.2f}s downtime={result['downtime']:.2f}s "
+          f"restarts={result['restarts']}")
@@ -1,6 +1,5 @@
-import time
+import argparse
 import numpy as np
-import json
 import sys
 import os
 from pymilvus import (
@@ -17,21 +16,24 @@ from pymilvus import (
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../../"))
 DATA_ROOT = os.path.join(PROJECT_ROOT, "data")
+sys.path.append(PROJECT_ROOT)
+from src.utils.dataset import Dataset, folder_name, select_dataset
+from src.utils import dataset as datasets
+from src.ingestion import milvus_pipeline
+from src.utils.sizes import SIZES
+from src.utils.payloads import SELECTIVITY_COLUMNS
+from src.utils import healthcheck, cgroups
+from src.ingestion.checkpoint import Checkpoint, ingest_resumable, print_resume_summary
 
 # --- CONFIGURATION ---
 HOST = "localhost"
 PORT = "19530"
 BATCH_SIZE = 5000
-
-# Map dimensions to their folder names using ABSOLUTE PATHS
-EXPERIMENTS = {
-    128:  {"folder": os.path.join(DATA_ROOT, "exp_1_128d")},
-    512:  {"folder": os.path.join(DATA_ROOT, "exp_2_512d")},
-    1024: {"folder": os.path.join(DATA_ROOT, "exp_3_1024d")},
-}
+WORKERS = 4
 
 # --- TARGETS ---
-COUNTS = {"small": 100_000, "medium": 500_000, "big": 2_500_000}
+# Τα size tiers (src/utils/sizes.py + data/sizes.json), περιορισμένα στις γραμμές του dataset
+COUNTS = SIZES
 
 def connect_db():
     print(f"[Status] Connecting to Milvus at {HOST}:{PORT}...")
@@ -48,83 +50,77 @@ def create_collection(collection_name, dim):
         FieldSchema(name="vector", dtype=DataType.FLOAT_VECTOR, dim=dim),
         FieldSchema(name="city_id", dtype=DataType.INT32),
         FieldSchema(name="quality_score", dtype=DataType.FLOAT),
-    ]
+    ] + milvus_pipeline.selectivity_fields()
     schema = CollectionSchema(fields, f"Benchmark dim {dim}")
     return Collection(collection_name, schema)
 
-def load_data(dim, mode):
+def load_data(dim, mode, batch_size=BATCH_SIZE, workers=WORKERS, index="none"):
     connect_db()
     
-    config = EXPERIMENTS[dim]
-    collection_name = f"benchmark_{dim}d"
-    
-    # Χρησιμοποιούμε τα absolute paths που ορίσαμε στο EXPERIMENTS
-    vectors_file = os.path.join(config["folder"], "vectors.npy")
-    payloads_file = os.path.join(config["folder"], "payloads.jsonl")
+    folder = os.path.join(DATA_ROOT, folder_name(dim))
+    collection_name = datasets.collection_name(dim)
     
-    if not os.path.exists(vectors_file):
-        print(f"[Error] Data file not found: {vectors_file}")
+    if not Dataset.exists(folder):
+        print(f"[Error] Dataset not found: {folder}")
         sys.exit(1)
 
-    limit_count = COUNTS[mode]
-    collection = create_collection(collection_name, dim)
+    # Shape και πλήθος γραμμών από το manifest / .npy header, όχι hard-coded
+    dataset = Dataset(folder)
+    dataset.check_dim(dim)
+    limit_count = dataset.size_rows(mode)
+    # Αν υπάρχει checkpoint για το ίδιο target και η βάση έχει τουλάχιστον τόσες γραμμές, συνεχίζουμε
+    checkpoint = Checkpoint("milvus", collection_name, limit_count)
+    state = checkpoint.resume(milvus_pipeline.live_count(collection_name) if checkpoint.load() else None)
+    if state is None:
+        create_collection(collection_name, dim)
     
     print(f"\n[Status] STARTING BENCHMARK: DIM={dim} | MODE={mode.upper()}")
     print(f"   Target: {limit_count:,} vectors")
     
-    # Check actual file size (Assuming master dataset is 2.5M)
-    file_shape = (2_500_000, dim) 
-    vectors = np.memmap(vectors_file, dtype='float32', mode='r', shape=file_shape)
-    
-    start_time = time.time()
+    vectors = dataset.vectors(limit_count)
     
-    metadata_buffer = []
-    vector_buffer = []
-    ids_buffer = []
+    # Columnar payloads (memmap): κάθε batch είναι απλώς slice των στηλών.
+    # Η (μία φορά) μετατροπή από JSONL γίνεται πριν ξεκινήσει η χρονομέτρηση.
+    payloads = dataset.payloads()
     
-    with open(payloads_file, "r") as f:
-        for i, line in enumerate(f):
-            if i >= limit_count: break
-                
-            record = json.loads(line)
-            ids_buffer.append(record["id"])
-            vector_buffer.append(vectors[i])
-            metadata_buffer.append({
-                "city_id": record["city_id"], 
-                "quality_score": record["quality_score"]
-            })
-            
-            if len(ids_buffer) >= BATCH_SIZE:
-                collection.insert([
-                    ids_buffer,
-                    vector_buffer,
-                    [m["city_id"] for m in metadata_buffer],
-                    [m["quality_score"] for m in metadata_buffer]
-                ])
-                ids_buffer, vector_buffer, metadata_buffer = [], [], []
-                print(f"   -> Inserted {i+1:,} / {limit_count:,}", end="\r")
+    columns = [payloads["id"], vectors, payloads["city_id"], payloads["quality_score"]] + [payloads[name] for name in SELECTIVITY_COLUMNS]
 
-    if ids_buffer:
-        collection.insert([
-            ids_buffer,
-            vector_buffer,
-            [m["city_id"] for m in metadata_buffer],
-            [m["quality_score"] for m in metadata_buffer]
-        ])
+    # Producer/consumer pipeline: N workers, ο καθένας με δικό του connection alias.
+    # Ανά CHECKPOINT_ROWS γραμμές: flush + checkpoint. Αν πέσει η βάση, περιμένουμε και συνεχίζουμε.
+    def ingest(start, end, overlap):
+        return milvus_pipeline.run_pipeline(
+            collection_name, columns, start, end,
+            batch_size=batch_size, workers=workers,
+            connection={"host": HOST, "port": PORT},
+            op="upsert" if overlap else "insert",
+        )
 
-    print("\n   [Status] Flushing data to disk...")
-    collection.flush()
-    duration = time.time() - start_time
+    result = ingest_resumable(checkpoint, 0, limit_count, ingest, lambda: healthcheck.wait_ready("milvus"), state)
+    # Time/Throughput: μόνο active χρόνος (και από προηγούμενα runs), χωρίς downtime
+    duration = result["active_seconds"]
     
     print(f"\n[Result] FINISHED: DIM={dim} | MODE={mode.upper()}")
     print(f"[Result] Time: {duration:.2f} seconds")
-    print(f"[Result] Throughput: {limit_count / duration:.2f} vectors/sec")
+    print(f"[Result] Throughput: {result['rows'] / duration:.2f} vectors/sec")
+    print_resume_summary(result)
+    milvus_pipeline.print_stage_timings(result["totals"], workers)
+
+    # Index build μετά το ingestion, ώστε ο χρόνος του να μη χάνεται μέσα στο insert time
+    if index != "none":
+        with cgroups.phase("index"):
+            seconds = milvus_pipeline.build_vector_index(
+                Collection(collection_name), index, milvus_pipeline.index_build_params(index, dim))
+        print(f"[Result] Index Build ({index}): {seconds:.2f} seconds")
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python3 ingest_milvus.py [dim] [small|medium|big]")
-        sys.exit(1)
-        
-    dim = int(sys.argv[1])
-    mode = sys.argv[2]
-    load_data(dim, mode)
\ No newline at end of file
+    parser = argparse.ArgumentParser(usage="python3 ingest_milvus.py [dim] [small|medium|big] [--workers N] [--batch-size B]")
+    parser.add_argument("dim", type=int)
+    parser.add_argument("mode", choices=list(COUNTS))
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Parallel insert workers (one connection each)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--index", choices=["none"] + milvus_pipeline.MILVUS_INDEX_TYPES, default="none",
+                        help="Build this vector index after ingestion and report its build time")
+    parser.add_argument("--dataset", default=None, help="Dataset folder under data/ instead of the exp_* of the dimension")
+    args = parser.parse_args()
+    select_dataset(args.dataset)
+    load_data(args.dim, args.mode, args.batch_size, args.workers, args.index)
\ No newline at end of file
@@ -1,7 +1,6 @@
 import weaviate
 import numpy as np
-import json
-import time
+import argparse
 import sys
 import os
 
@@ -9,38 +8,43 @@ import os
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../../"))
 DATA_ROOT = os.path.join(PROJECT_ROOT, "data")
+sys.path.append(PROJECT_ROOT)
+from src.utils.dataset import Dataset, folder_name, weaviate_class, select_dataset
+from src.utils.cgroups import parse_size
+from src.utils.payloads import SELECTIVITY_COLUMNS
+from src.ingestion import weaviate_importer
+from src.utils import healthcheck
+from src.ingestion.checkpoint import Checkpoint, ingest_resumable, print_resume_summary
 
 # --- CONFIGURATION ---
-INITIAL_BATCH_SIZE = 100 
-
-if len(sys.argv) != 3:
-    print("Usage: python3 ingest_weaviate.py <dim> <size>")
-    sys.exit(1)
-
-DIM = int(sys.argv[1])
-SIZE_NAME = sys.argv[2] 
-
-if DIM == 128:
-    DATA_DIR = os.path.join(DATA_ROOT, "exp_1_128d")
-elif DIM == 512:
-    DATA_DIR = os.path.join(DATA_ROOT, "exp_2_512d")
-else:
-    DATA_DIR = os.path.join(DATA_ROOT, "exp_3_1024d")
-
-VEC_FILE = os.path.join(DATA_DIR, "vectors.npy")
-PAYLOAD_FILE = os.path.join(DATA_DIR, "payloads.jsonl")
-
-if not os.path.exists(VEC_FILE):
-    print(f"[Error] Vectors file not found: {VEC_FILE}")
+parser = argparse.ArgumentParser(usage="python3 ingest_weaviate.py <dim> <size> [--workers N] [--mem-limit 8G]")
+parser.add_argument("dim", type=int)
+parser.add_argument("size")
+parser.add_argument("--workers", type=int, default=weaviate_importer.MAX_WORKERS, help="Upper bound for parallel batch requests")
+parser.add_argument("--batch-size", type=int, default=weaviate_importer.INITIAL_BATCH, help="Initial batch size")
+parser.add_argument("--mem-limit", type=parse_size, default=None,
+                    help="Memory cap for the Weaviate container (e.g. 6G); imports slow down before reaching it")
+parser.add_argument("--dataset", default=None, help="Dataset folder under data/ instead of the exp_* of the dimension")
+args = parser.parse_args()
+select_dataset(args.dataset)
+
+DIM = args.dim
+SIZE_NAME = args.size
+
+DATA_DIR = os.path.join(DATA_ROOT, folder_name(DIM))
+
+if not Dataset.exists(DATA_DIR):
+    print(f"[Error] Dataset not found: {DATA_DIR}")
     sys.exit(1)
+dataset = Dataset(DATA_DIR)
+dataset.check_dim(DIM)
 
 # --- TARGETS ---
-COUNTS = {"small": 100_000, "medium": 500_000, "big": 2_500_000}
-if SIZE_NAME not in COUNTS:
+if SIZE_NAME not in dataset.sizes:
     print(f"[Error] Unknown size: {SIZE_NAME}")
     sys.exit(1)
     
-TARGET_COUNT = COUNTS[SIZE_NAME]
+TARGET_COUNT = dataset.size_rows(SIZE_NAME)
 
 print(f"[Status] Connecting to Weaviate (Dim: {DIM}, Size: {SIZE_NAME})...")
 
@@ -50,79 +54,53 @@ client = weaviate.Client(
     startup_period=30
 )
 
-class_name = f"Benchmark_{DIM}d"
-if client.schema.exists(class_name):
+class_name = weaviate_class(DIM)
+vectors = dataset.vectors(TARGET_COUNT)
+payloads = dataset.payloads()
+city_ids = payloads["city_id"]
+quality_scores = payloads["quality_score"]
+selectivity = {name: payloads[name] for name in SELECTIVITY_COLUMNS}
+
+# Αν υπάρχει checkpoint για το ίδιο target και το class έχει τουλάχιστον τόσα objects, συνεχίζουμε
+checkpoint = Checkpoint("weaviate", class_name, TARGET_COUNT)
+state = checkpoint.resume(weaviate_importer.live_count(class_name))
+if state is None and client.schema.exists(class_name):
     client.schema.delete_class(class_name)
 
 schema = {
     "classes": [{
         "class": class_name,
         "vectorizer": "none",
-        "properties": [
-            {"name": "city_id", "dataType": ["int"]},
-            {"name": "quality_score", "dataType": ["number"]}
-        ]
+        "properties": weaviate_importer.class_properties()
     }]
 }
-client.schema.create(schema)
-print(f"   -> Created Schema: {class_name}")
+if state is None:
+    client.schema.create(schema)
+    print(f"   -> Created Schema: {class_name}")
 
 print(f"[Status] STARTING WEAVIATE BENCHMARK")
-vectors = np.load(VEC_FILE, mmap_mode="r")
-payloads = open(PAYLOAD_FILE, "r")
-
-start_time = time.time()
-inserted_count = 0
-
-# --- CRITICAL STABILITY CONFIGURATION ---
-# 1. batch_size=100: Μικρά πακέτα φεύγουν γρήγορα.
-# 2. dynamic=True: Αν αργεί η βάση, το batch μικραίνει αυτόματα.
-# 3. num_workers=1: Σειριακή αποστολή για να μην γίνει OOM Kill.
-# 4. retries: Αν αποτύχει ένα πακέτο, ξαναπροσπαθεί 3 φορές.
-client.batch.configure(
-    batch_size=INITIAL_BATCH_SIZE, 
-    dynamic=True,
-    num_workers=1,
-    timeout_retries=3,
-    connection_error_retries=3
-) 
-
-try:
-    with client.batch as batch:
-        for i in range(TARGET_COUNT):
-            vec = vectors[i]
-            line = payloads.readline()
-            
-            if not line:
-                break
-                
-            meta = json.loads(line)
-            
-            batch.add_data_object(
-                data_object={
-                    "city_id": meta["city_id"],
-                    "quality_score": meta["quality_score"]
-                },
-                class_name=class_name,
-                vector=vec
-            )
-            
-            inserted_count += 1
-            if inserted_count % 5000 == 0:
-                print(f"   -> Inserted {inserted_count} / {TARGET_COUNT}")
-
-except Exception as e:
-    print(f"[ERROR] Batch ingestion failed: {e}")
-
-finally:
-    payloads.close()
-
-end_time = time.time()
-duration = end_time - start_time
+
+# Παράλληλα batch requests με adaptive concurrency / batch size (src/ingestion/weaviate_importer.py).
+# Αντί για σταθερό num_workers=1, η ταχύτητα μειώνεται μόνο όταν η βάση δείχνει πίεση:
+# 429/5xx, timeouts, αργά batches ή μνήμη container κοντά στο --mem-limit.
+# Checkpoint ανά CHECKPOINT_ROWS. Τα UUIDs είναι ντετερμινιστικά, οπότε το overlap ενός resume απλώς ξαναγράφεται.
+def ingest(start, end, overlap):
+    result = weaviate_importer.import_objects(
+        class_name, vectors, {"city_id": city_ids, "quality_score": quality_scores, **selectivity}, start, end,
+        max_workers=args.workers, batch_size=args.batch_size, mem_limit=args.mem_limit,
+    )
+    weaviate_importer.print_import_summary(result)
+    return result
+
+resumed = ingest_resumable(checkpoint, 0, TARGET_COUNT, ingest, lambda: healthcheck.wait_ready("weaviate"), state)
+print_resume_summary(resumed)
+
+# Time/Throughput: μόνο active χρόνος (και από προηγούμενα runs), χωρίς downtime
+duration = resumed["active_seconds"]
 
 if duration == 0: duration = 0.01
 
-throughput = inserted_count / duration
+throughput = resumed["rows"] / duration
 
 print(f"[Result] FINISHED: {class_name}")
 print(f"[Result] Time: {duration:.2f} seconds") 
@@ -1,8 +1,6 @@
 import numpy as np
-import time
-import json
+import argparse
 import sys
-import gc
 import os
 import weaviate
 from pymilvus import connections, FieldSchema, CollectionSchema, DataType, Collection, utility
@@ -12,79 +10,147 @@ from pymilvus import connections, FieldSchema, CollectionSchema, DataType, Colle
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../../"))
 DATA_ROOT = os.path.join(PROJECT_ROOT, "data")
+sys.path.append(PROJECT_ROOT)
+from src.utils.dataset import Dataset, folder_name, collection_name, weaviate_class, select_dataset
+from src.ingestion import milvus_pipeline, weaviate_importer
+from src.ingestion.checkpoint import Checkpoint, ingest_resumable, print_resume_summary, resume_point
+from src.utils import local_backend, healthcheck, cgroups
+from src.utils.cgroups import parse_size
+from src.utils.sizes import SIZES, SIZE_NAMES
+from src.utils.payloads import SELECTIVITY_COLUMNS, SCALAR_INDEXES
+from src.utils.precision import PRECISIONS
+from src.utils.layouts import LAYOUTS, Permuted, engine_layout, partition_names, partition_ranges, select_layout
 
 # Ρυθμίσεις
 MILVUS_CONFIG = {"host": "localhost", "port": "19530"}
 WEAVIATE_URL = "http://localhost:8080"
 
 def get_limits(size):
-    if size == "small": return 100000
-    if size == "medium": return 500000
-    if size == "big": return 2000000
-    return 0
-
-def load_data(db, dim, size):
-    limit = get_limits(size)
-    
+    return SIZES.get(size, 0)
+
+def drop_collection(col_name):
+    """True όταν το collection έχει πράγματι φύγει (το drop είναι async στους coordinators)."""
+    if utility.has_collection(col_name):
+        utility.drop_collection(col_name)
+    return not utility.has_collection(col_name)
+
+# HNSW build παράμετροι (Milvus). Η Weaviate κρατάει τα δικά της defaults αν δεν δοθεί index_params
+DEFAULT_HNSW = milvus_pipeline.DEFAULT_HNSW
+
+def load_data(db, dim, size, index_params=None, batch_size=milvus_pipeline.BATCH_SIZE, workers=milvus_pipeline.WORKERS, mem_limit=None, append=False, scalar_index=False, compression=None, precision="float32"):
+    """Το _load_data με έναν cgroup sampler από πάνω: server-side CPU / μνήμη / IO των containers
+    ανά φάση (ingest, flush, index) στο results/stats/resources/load_<db>_<dim>d_<size>.csv."""
+    containers = cgroups.CONTAINERS[db]
+    sampler = cgroups.ResourceSampler(containers, output=cgroups.resources_file("load", db, dim, size) if containers else None)
+    with sampler:
+        _load_data(db, dim, size, index_params, batch_size, workers, mem_limit, append, scalar_index, compression, precision)
+    sampler.print_summary()
+
+def _load_data(db, dim, size, index_params, batch_size, workers, mem_limit, append, scalar_index, compression, precision="float32"):
+    """Φορτώνει τις πρώτες SIZES[size] γραμμές. Με append=True (growth mode) ένα υπάρχον
+    collection / class δεν σβήνεται: εισάγονται μόνο οι γραμμές που λείπουν, π.χ. small -> medium
+    στέλνει 400k αντί για 500k. Τα ids είναι οι row indexes, οπότε το prefix είναι πάντα συνεχές.
+    Ένα load που διακόπηκε συνεχίζει από το τελευταίο checkpoint (src/ingestion/checkpoint.py).
+    scalar_index: Milvus INVERTED / STL_SORT στις στήλες selectivity (αλλάζουν και αργότερα από το query6),
+    Weaviate indexRangeFilters (μόνο στη δημιουργία του class).
+    compression: επιπλέον vectorIndexConfig της Weaviate, π.χ. {"bq": {"enabled": True}}.
+    precision: Milvus collection με float16 / bfloat16 / binary vectors (ή float32 + IVF_SQ8 για int8) από τα
+    αντίγραφα του convert_precision.py. Η Weaviate κρατάει μόνο float32: int8 -> SQ, binary -> BQ.
+    Το layout (select_layout / --layout) ορίζει partition key, explicit partitions ή tenants στο city_id.
+    Με partitions / tenants οι γραμμές στέλνονται ταξινομημένες ανά bucket, οπότε το growth mode γίνεται full reload."""
+    if db == "weaviate" and precision != "float32":
+        compression = dict(weaviate_importer.precision_compression(precision), **(compression or {}))
     # Absolute paths για τα data
-    folder = f"exp_{1 if dim==128 else 2 if dim==512 else 3}_{dim}d"
-    path_vectors = os.path.join(DATA_ROOT, folder, "vectors.npy")
-    path_payloads = os.path.join(DATA_ROOT, folder, "payloads.jsonl")
+    folder = folder_name(dim)
+    if not Dataset.exists(os.path.join(DATA_ROOT, folder)):
+        print(f"ERROR: Dataset not found at {os.path.join(DATA_ROOT, folder)}")
+        sys.exit(1)
 
+    # 1. Φόρτωση Δεδομένων (manifest, ένα ή πολλά shards)
+    dataset = Dataset(os.path.join(DATA_ROOT, folder))
+    dataset.check_dim(dim)
+    limit = dataset.size_rows(size)
     print(f"\n>>> LOADING {db.upper()} | DIM: {dim} | SIZE: {size} ({limit} vectors)")
 
-    if not os.path.exists(path_vectors):
-        print(f"ERROR: Data file not found at {path_vectors}")
-        sys.exit(1)
+    vectors = dataset.vectors(limit)
+    payloads = dataset.payloads()
+    city_ids = payloads["city_id"][:limit]
+    quality_scores = payloads["quality_score"][:limit]
+    selectivity = {name: payloads[name][:limit] for name in SELECTIVITY_COLUMNS}
 
-    # 1. Φόρτωση Δεδομένων
-    vectors = np.load(path_vectors, mmap_mode='r')[:limit]
-    city_ids = []
-    quality_scores = []
-    
-    with open(path_payloads, 'r') as f:
-        for i, line in enumerate(f):
-            if i >= limit: break
-            data = json.loads(line)
-            city_ids.append(data.get('city_id', 0))
-            quality_scores.append(data.get('quality_score', 0.0))
+    # Layout: explicit partitions / tenants θέλουν τις γραμμές ανά bucket (ranges στη σειρά του order)
+    kind, partitions = engine_layout(db)
+    ids, ranges = payloads["id"], None
+    if kind in ("partitions", "tenants"):
+        order, ranges = partition_ranges(city_ids, partitions)
+        vectors, ids, city_ids, quality_scores = (Permuted(c, order) for c in (vectors, ids, city_ids, quality_scores))
+        selectivity = {name: Permuted(c, order) for name, c in selectivity.items()}
+        if append:
+            print(f"   [GROW] {kind} layout is ordered by bucket: full reload")
+            append = False
+        print(f"   [LAYOUT] {kind}: {len(ranges)} / {partitions} buckets with rows")
+    elif kind == "pkey":
+        print(f"   [LAYOUT] partition key on city_id, {partitions} partitions")
 
     # 2. MILVUS LOAD
     if db == "milvus":
         connections.connect("default", **MILVUS_CONFIG)
-        col_name = f"benchmark_{dim}d"
-        
-        # Reset με retry logic
-        for attempt in range(5):
-            try:
-                if utility.has_collection(col_name):
-                    print(f"   [RESET] Dropping collection for fresh {size} start...")
-                    utility.drop_collection(col_name)
-                    time.sleep(5)
-                break
-            except Exception as e:
-                print(f"   [WAIT] Milvus syncing, retrying drop in 10s...")
-                time.sleep(10)
-
-        fields = [
-            FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=False),
-            FieldSchema(name="vector", dtype=DataType.FLOAT_VECTOR, dim=dim),
-            FieldSchema(name="city_id", dtype=DataType.INT64),
-            FieldSchema(name="quality_score", dtype=DataType.FLOAT)
-        ]
-        col = Collection(col_name, CollectionSchema(fields))
-        # Δημιουργία Index κατευθείαν για να είναι έτοιμο για queries
-        col.create_index("vector", {"metric_type": "L2", "index_type": "HNSW", "params": {"M": 16, "efConstruction": 256}})
-
-        step = 5000 
-        for i in range(0, len(vectors), step):
-            end = i + step
-            col.insert([list(range(i, end)), vectors[i:end].tolist(), city_ids[i:end], quality_scores[i:end]])
-            if i % 50000 == 0:
-                gc.collect()
-        
-        col.flush()
-        col.load()
+        col_name = collection_name(dim, precision)
+        # int8: FLOAT_VECTOR με IVF_SQ8, οπότε στέλνονται τα float32
+        if precision in ("float32", "int8"):
+            vector_column = vectors
+        else:
+            codes = dataset.vectors(limit, precision)
+            vector_column = milvus_pipeline.PrecisionVectors(Permuted(codes, order) if ranges else codes, precision)
+
+        checkpoint = Checkpoint(db, col_name, len(vectors))
+        # Το count(*) κάνει load όλο το collection: μόνο όταν το offset χρειάζεται (growth / checkpoint)
+        live = milvus_pipeline.live_count(col_name) if append or checkpoint.load() else None
+        start, state = resume_point(checkpoint, live, len(vectors), append)
+        col = Collection(col_name) if start is not None else None
+
+        if start is None:
+            start = 0
+            # Reset: polling μέχρι το drop να φανεί, αντί για σταθερά sleeps
+            if utility.has_collection(col_name):
+                print(f"   [RESET] Dropping collection for fresh {size} start...")
+                healthcheck.wait_until(lambda: drop_collection(col_name), what=f"drop {col_name}")
+
+            fields = [
+                FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=False),
+                milvus_pipeline.vector_field(dim, precision),
+                FieldSchema(name="city_id", dtype=DataType.INT64, is_partition_key=kind == "pkey"),
+                FieldSchema(name="quality_score", dtype=DataType.FLOAT)
+            ] + milvus_pipeline.selectivity_fields()
+            if kind == "pkey":
+                col = Collection(col_name, CollectionSchema(fields), num_partitions=partitions)
+            else:
+                col = Collection(col_name, CollectionSchema(fields))
+            if kind == "partitions":
+                # Όλα τα buckets, ώστε και ένα query σε πόλη χωρίς γραμμές να βρίσκει το partition του
+                for name in partition_names(partitions):
+                    col.create_partition(name)
+            # Δημιουργία Index κατευθείαν για να είναι έτοιμο για queries
+            index_type, params, metric = milvus_pipeline.precision_index(precision, dim)
+            if index_type == "HNSW":
+                params = index_params or DEFAULT_HNSW
+            col.create_index("vector", {"metric_type": metric, "index_type": index_type, "params": params})
+            if scalar_index:
+                for field, index_type in SCALAR_INDEXES.items():
+                    col.create_index(field, {"index_type": index_type}, index_name=field)
+
+        def ingest(s, e, overlap):
+            return milvus_pipeline.run_pipeline(
+                col_name, [ids, vector_column, city_ids, quality_scores] + list(selectivity.values()), s, e,
+                batch_size=batch_size, workers=workers, connection=MILVUS_CONFIG,
+                op="upsert" if overlap else "insert", partitions=ranges)
+
+        result = ingest_resumable(checkpoint, start, len(vectors), ingest, lambda: healthcheck.wait_ready(db), state)
+        print_resume_summary(result)
+        milvus_pipeline.print_stage_timings(result["totals"], workers)
+        # Από το τέλος του flush μέχρι index build + load + πρώτο search
+        with cgroups.phase("index"):
+            healthcheck.record_lifecycle("time_to_queryable", healthcheck.wait_milvus_queryable(col), db, dim, size)
         print(f"   [DONE] Milvus loaded. Total Entities: {col.num_entities}")
 
     # 3. WEAVIATE LOAD
@@ -93,32 +159,72 @@ def load_data(db, dim, size):
             url=WEAVIATE_URL,
             timeout_config=(10, 900)
         )
-        class_name = f"Benchmark_{dim}d"
+        class_name = weaviate_class(dim)
         
-        if client.schema.exists(class_name):
+        checkpoint = Checkpoint(db, class_name, len(vectors))
+        start, state = resume_point(checkpoint, weaviate_importer.live_count(class_name, WEAVIATE_URL), len(vectors), append)
+        if start is None and client.schema.exists(class_name):
             client.schema.delete_class(class_name)
 
+        vector_index_config = {"distance": "l2-squared"}
+        if index_params:
+            vector_index_config["maxConnections"] = index_params["M"]
+            vector_index_config["efConstruction"] = index_params["efConstruction"]
+        vector_index_config.update(compression or {})
+
         class_obj = {
             "class": class_name,
-            "vectorIndexConfig": {"distance": "l2-squared"},
-            "properties": [
-                {"name": "city_id", "dataType": ["int"]},
-                {"name": "quality_score", "dataType": ["number"]}
-            ]
+            "vectorIndexConfig": vector_index_config,
+            "properties": weaviate_importer.class_properties(range_index=scalar_index)
         }
-        client.schema.create_class(class_obj)
-
-        client.batch.configure(batch_size=100, dynamic=True)
-        with client.batch as batch:
-            for i in range(len(vectors)):
-                batch.add_data_object({
-                    "city_id": int(city_ids[i]),
-                    "quality_score": float(quality_scores[i])
-                }, class_name, vector=vectors[i])
-                if i % 10000 == 0: gc.collect()
+        if kind == "tenants":
+            class_obj["multiTenancyConfig"] = {"enabled": True}
+        if start is None:
+            start = 0
+            client.schema.create_class(class_obj)
+            if kind == "tenants":
+                weaviate_importer.create_tenants(class_name, partition_names(partitions), WEAVIATE_URL)
+
+        def ingest(s, e, overlap):
+            result = weaviate_importer.import_objects(
+                class_name, vectors, {"city_id": city_ids, "quality_score": quality_scores, **selectivity}, s, e,
+                url=WEAVIATE_URL, mem_limit=mem_limit, ids=ids if ranges else None, tenants=ranges)
+            weaviate_importer.print_import_summary(result)
+            return result
+
+        print_resume_summary(ingest_resumable(checkpoint, start, len(vectors), ingest, lambda: healthcheck.wait_ready(db), state))
+        with cgroups.phase("index"):
+            healthcheck.record_lifecycle("time_to_queryable", healthcheck.wait_weaviate_queryable(
+                client, class_name, dim, tenant=ranges[0][0] if ranges else None), db, dim, size)
         print(f"   [DONE] Weaviate loaded.")
 
+    # 4. LOCAL (NumPy brute force, χωρίς container)
+    elif db == "local":
+        seconds = local_backend.load(os.path.join(DATA_ROOT, folder), limit)
+        print(f"   [DONE] Local backend ready: {len(vectors):,} vectors in page cache ({seconds:.2f}s)")
+
 if __name__ == "__main__":
-    if len(sys.argv) == 4:
-        # Παράμετροι: db, dim, size (π.χ. milvus 128 small)
-        load_data(sys.argv[1], int(sys.argv[2]), sys.argv[3])
\ No newline at end of file
+    # Παράμετροι: db, dim, size (π.χ. milvus 128 small)
+    parser = argparse.ArgumentParser(description="Load a dataset size into a backend")
+    parser.add_argument("db", choices=["milvus", "weaviate", "local"])
+    parser.add_argument("dim", type=int)
+    parser.add_argument("size", choices=SIZE_NAMES)
+    parser.add_argument("--append", action="store_true",
+                        help="Growth mode: keep the existing collection and insert only the missing rows")
+    parser.add_argument("--scalar-index", action="store_true",
+                        help="Index the selectivity columns (Milvus INVERTED/STL_SORT, Weaviate indexRangeFilters)")
+    parser.add_argument("--mem-limit", type=parse_size, default=None,
+                        help="Weaviate: memory cap of the container (e.g. 6G); the importer slows down before reaching it")
+    parser.add_argument("--precision", choices=PRECISIONS, default="float32",
+                        help="Milvus: vector type of a separate benchmark_<dim>d_<precision> collection; "
+                             "Weaviate: int8 -> SQ, binary -> BQ")
+    parser.add_argument("--layout", choices=LAYOUTS, default=None,
+                        help="Milvus: pkey (partition key) or partitions on city_id; Weaviate: tenants (multi-tenancy)")
+    parser.add_argument("--partitions", type=int, default=None,
+                        help="Buckets of the layout, city bucket = (city_id - 1) %% partitions (1000 = one per city)")
+    parser.add_argument("--dataset", default=None, help="Dataset folder under data/ instead of the exp_* of the dimension")
+    args = parser.parse_args()
+    select_dataset(args.dataset)
+    select_layout(args.layout, args.partitions)
+    load_data(args.db, args.dim, args.size, mem_limit=args.mem_limit, append=args.append, scalar_index=args.scalar_index,
+              precision=args.precision)
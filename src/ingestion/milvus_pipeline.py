@@ -0,0 +1,284 @@
+import time
+import queue
+import threading
+import numpy as np
+from pymilvus import connections, Collection, FieldSchema, DataType, LoadState, utility
+from src.utils import cgroups
+from src.utils.payloads import SELECTIVITY_COLUMNS
+from src.utils.precision import bfloat16_rows, encode
+from src.utils.layouts import range_at
+
+# --- CONFIGURATION ---
+MILVUS_CONFIG = {"host": "localhost", "port": "19530"}
+BATCH_SIZE = 5000
+WORKERS = 4
+BATCH_RETRIES = 4
+
+# Index types του index matrix (src/queries/index_matrix.py) και του ingest_milvus.py --index
+MILVUS_INDEX_TYPES = ["FLAT", "IVF_FLAT", "IVF_SQ8", "IVF_PQ", "HNSW", "DISKANN"]
+IVF_NLIST = 1024
+DEFAULT_HNSW = {"M": 16, "efConstruction": 256}
+
+# Precision variants (src/utils/precision.py): τύπος του vector πεδίου και index ανά variant.
+# Η Milvus 2.4 δεν έχει INT8_VECTOR: το int8 είναι FLOAT_VECTOR με IVF_SQ8 (1 byte ανά διάσταση στο index).
+# Τα BINARY_VECTOR δέχονται μόνο BIN_FLAT / BIN_IVF_FLAT, με HAMMING ή JACCARD.
+VECTOR_TYPES = {"float32": DataType.FLOAT_VECTOR, "float16": DataType.FLOAT16_VECTOR,
+                "bfloat16": DataType.BFLOAT16_VECTOR, "int8": DataType.FLOAT_VECTOR, "binary": DataType.BINARY_VECTOR}
+PRECISION_INDEXES = {"int8": "IVF_SQ8", "binary": "BIN_IVF_FLAT"}
+BINARY_METRICS = ["HAMMING", "JACCARD"]
+
+
+class StageTimer:
+    """Αθροιστικοί χρόνοι ανά στάδιο, κοινοί για όλα τα threads του pipeline."""
+
+    def __init__(self):
+        self.totals = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+
+
+class PrecisionVectors:
+    """Τα codes ενός precision variant ως στήλη του pipeline: κάθε batch γίνεται ό,τι δέχεται η pymilvus
+    (float16 / bfloat16 numpy γραμμές, bytes για binary)."""
+
+    def __init__(self, codes, precision):
+        self.codes = codes
+        self.precision = precision
+
+    def __len__(self):
+        return len(self.codes)
+
+    def batch(self, start, end):
+        return milvus_rows(self.precision, np.ascontiguousarray(self.codes[start:end]))
+
+
+def milvus_rows(precision, codes):
+    if precision == "binary":
+        return [row.tobytes() for row in codes]
+    if precision == "bfloat16":
+        return bfloat16_rows(codes)
+    if precision == "float16":
+        return list(codes)
+    return codes
+
+
+def milvus_query_vectors(precision, vectors, params=None):
+    """float32 query vectors -> ό,τι δέχεται το col.search για το vector πεδίο του variant.
+    Στο int8 (IVF_SQ8) η quantization γίνεται στον server, οπότε τα queries μένουν float32."""
+    if precision in ("float32", "int8"):
+        return [list(v) for v in vectors]
+    return milvus_rows(precision, encode(precision, vectors, params))
+
+
+def prepare_batch(columns, start, end):
+    """Slices των memmaps στη σειρά του schema. Κανένα .tolist(): το np.ascontiguousarray
+    απλώς διαβάζει τις σελίδες του memmap σε συνεχή buffer (και δεν αντιγράφει αν είναι ήδη)."""
+    return [col.batch(start, end) if isinstance(col, PrecisionVectors) else np.ascontiguousarray(col[start:end])
+            for col in columns]
+
+
+def insert_worker(alias, collection_name, batches, timer, errors, connection, op="insert"):
+    """Ένας consumer του run_pipeline. Αν το connect αποτύχει, ο worker συνεχίζει να αδειάζει την ουρά
+    και γράφει κάθε batch στα errors (για το retry_failed), ώστε ο producer να μη μπλοκάρει στο put."""
+    col, connect_error = None, None
+    try:
+        connections.connect(alias, **connection)
+        col = Collection(collection_name, using=alias)
+    except Exception as e:
+        connect_error = e
+        print(f"\n   [WARN] Worker {alias} could not connect: {e}")
+    try:
+        while True:
+            wait_start = time.perf_counter()
+            item = batches.get()
+            timer.add("worker_idle", time.perf_counter() - wait_start)
+            if item is None:
+                return
+            start, end, partition, data = item
+            if col is None:
+                errors.append((start, end, partition, connect_error))
+                continue
+            t0 = time.perf_counter()
+            try:
+                getattr(col, op)(data, partition_name=partition)
+            except Exception as e:
+                errors.append((start, end, partition, e))
+            timer.add("insert", time.perf_counter() - t0)
+    finally:
+        connections.disconnect(alias)
+
+
+def retry_failed(collection_name, columns, failed, connection, retries=BATCH_RETRIES):
+    """Ξαναστέλνει τα αποτυχημένα batches ανά id range με exponential backoff. Upsert, γιατί ένα
+    insert που έληξε με timeout μπορεί να έχει γραφτεί στον server. Επιστρέφει όσα απέτυχαν ξανά."""
+    connections.connect("ingest_retry", **connection)
+    col = Collection(collection_name, using="ingest_retry")
+    try:
+        for attempt in range(retries):
+            if not failed:
+                break
+            time.sleep(min(30.0, 2.0 ** attempt))
+            still_failed = []
+            for start, end, partition, _ in failed:
+                try:
+                    col.upsert(prepare_batch(columns, start, end), partition_name=partition)
+                except Exception as e:
+                    still_failed.append((start, end, partition, e))
+            print(f"\n   [Retry] {len(failed) - len(still_failed)} / {len(failed)} failed batches recovered")
+            failed = still_failed
+    finally:
+        connections.disconnect("ingest_retry")
+    return failed
+
+
+def run_pipeline(collection_name, columns, start, stop, batch_size=BATCH_SIZE, workers=WORKERS,
+                 connection=MILVUS_CONFIG, flush=True, progress=True, op="insert", partitions=None):
+    """Producer/consumer ingestion των γραμμών [start, stop).
+
+    columns: arrays (memmaps) στη σειρά των πεδίων του schema, π.χ. [ids, vectors, city_ids, scores].
+    Ο producer ετοιμάζει batches σε ουρά με όριο 2*workers (backpressure) και N workers κάνουν
+    insert, ο καθένας με δικό του connection alias. Επιστρέφει τους χρόνους ανά στάδιο:
+    αν ο producer περιμένει την ουρά (producer_blocked) η βάση είναι το bottleneck,
+    αν οι workers περιμένουν batches (worker_idle) το bottleneck είναι ο client.
+    op="upsert" για ranges που μπορεί να υπάρχουν ήδη (resume). Αποτυχημένα batches ξαναστέλνονται ανά id range.
+    partitions: [(partition, start, end)] για explicit partitions (src/utils/layouts.py): κανένα batch δεν
+    περνάει όριο partition και κάθε insert πάει στο partition του."""
+    timer = StageTimer()
+    errors = []
+    batches = queue.Queue(maxsize=2 * workers)
+    threads = [
+        threading.Thread(target=insert_worker, args=(f"ingest_{k}", collection_name, batches, timer, errors, connection, op), daemon=True)
+        for k in range(workers)
+    ]
+    for t in threads: t.start()
+
+    wall_start = time.perf_counter()
+    i = start
+    while i < stop:
+        end = min(i + batch_size, stop)
+        partition = None
+        if partitions:
+            partition, boundary = range_at(partitions, i)
+            end = min(end, boundary)
+        t0 = time.perf_counter()
+        data = prepare_batch(columns, i, end)
+        timer.add("prepare", time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        batches.put((i, end, partition, data))
+        timer.add("producer_blocked", time.perf_counter() - t0)
+        if progress:
+            print(f"   -> Queued {end:,} / {stop:,}", end="\r")
+        i = end
+
+    for _ in threads: batches.put(None)
+    for t in threads: t.join()
+    timer.add("insert_wall", time.perf_counter() - wall_start)
+
+    if errors:
+        errors = retry_failed(collection_name, columns, errors, connection)
+    if errors:
+        raise RuntimeError(f"{len(errors)} insert batches failed, first at row {errors[0][0]}: {errors[0][3]}")
+
+    if flush:
+        t0 = time.perf_counter()
+        with cgroups.phase("flush"):
+            Collection(collection_name).flush()
+        timer.add("flush", time.perf_counter() - t0)
+    return timer.totals
+
+
+def live_count(collection_name):
+    """Ζωντανές entities (count(*) με Strong consistency), ή None αν το collection δεν υπάρχει.
+    Το num_entities μετράει και τις deleted γραμμές μέχρι το compaction (π.χ. μετά το cleanup του
+    mixed_workload.py), οπότε ένα growth load θα ξεκινούσε από λάθος offset. Χωρίς index (δεν γίνεται load)
+    μένει το num_entities. Ένα collection που δεν ήταν loaded γίνεται πάλι release, ώστε το ingestion
+    να τρέχει όπως πριν. Κοστίζει ένα πλήρες load, οπότε καλείται μόνο για growth / resume από checkpoint."""
+    if not utility.has_collection(collection_name):
+        return None
+    col = Collection(collection_name)
+    col.flush()
+    loaded = utility.load_state(collection_name) == LoadState.Loaded
+    try:
+        col.load()
+        return col.query(expr="", output_fields=["count(*)"], consistency_level="Strong")[0]["count(*)"]
+    except Exception as e:
+        print(f"   [WARN] count(*) on {collection_name} failed ({e}), using num_entities")
+        return col.num_entities
+    finally:
+        if not loaded:
+            col.release()
+
+
+def selectivity_fields():
+    """Τα πεδία των στηλών selectivity (query6), μετά τα city_id / quality_score στο schema."""
+    return [FieldSchema(name=name, dtype=DataType.INT32) for name in SELECTIVITY_COLUMNS]
+
+
+def vector_field(dim, precision="float32"):
+    return FieldSchema(name="vector", dtype=VECTOR_TYPES[precision], dim=dim)
+
+
+def precision_index(precision, dim, metric="L2"):
+    """(index type, build params, metric) του vector index ενός variant. Το binary παίρνει HAMMING
+    αν το metric δεν είναι ήδη binary metric."""
+    index_type = PRECISION_INDEXES.get(precision, "HNSW")
+    if precision == "binary" and metric not in BINARY_METRICS:
+        metric = "HAMMING"
+    return index_type, index_build_params(index_type, dim), metric
+
+
+def index_build_params(index_type, dim):
+    """Build παράμετροι ανά index type. IVF_PQ: ένα subquantizer ανά 8 διαστάσεις (το m πρέπει να διαιρεί το dim)."""
+    if index_type.startswith("IVF") or index_type == "BIN_IVF_FLAT":
+        params = {"nlist": IVF_NLIST}
+        if index_type == "IVF_PQ":
+            params.update(m=dim // 8, nbits=8)
+        return params
+    if index_type == "HNSW":
+        return dict(DEFAULT_HNSW)
+    return {}
+
+
+def build_vector_index(col, index_type, params, metric="L2"):
+    """release -> drop του υπάρχοντος vector index -> create -> αναμονή μέχρι να χτιστεί για όλες τις γραμμές.
+    Τα scalar indexes μένουν. Επιστρέφει τα seconds του build (το col μένει released)."""
+    col.release()
+    for index in col.indexes:
+        if index.field_name == "vector":
+            col.drop_index(index_name=index.index_name)
+    t0 = time.perf_counter()
+    col.create_index("vector", {"metric_type": metric, "index_type": index_type, "params": params})
+    name = next(index.index_name for index in col.indexes if index.field_name == "vector")
+    utility.wait_for_index_building_complete(col.name, index_name=name)
+    return time.perf_counter() - t0
+
+
+def set_scalar_indexes(col, indexes, enabled):
+    """Δημιουργεί (enabled) ή σβήνει τα scalar indexes {field: index_type}. Το drop θέλει
+    released collection, οπότε release -> αλλαγές -> load μόνο αν κάτι αλλάζει. True αν άλλαξε κάτι."""
+    present = {index.field_name for index in col.indexes}
+    changes = [field for field in indexes if (field in present) != enabled]
+    if not changes:
+        return False
+    col.release()
+    for field in changes:
+        if enabled:
+            col.create_index(field, {"index_type": indexes[field]}, index_name=field)
+        else:
+            col.drop_index(index_name=field)
+    col.load()
+    return True
+
+
+def print_stage_timings(timings, workers):
+    print(f"\n   [Stages] prepare={timings.get('prepare', 0):.2f}s "
+          f"insert={timings.get('insert', 0):.2f}s (sum over {workers} workers) "
+          f"insert_wall={timings.get('insert_wall', 0):.2f}s flush={timings.get('flush', 0):.2f}s")
+    print(f"   [Stages] producer_blocked={timings.get('producer_blocked', 0):.2f}s "
+          f"worker_idle={timings.get('worker_idle', 0):.2f}s (sum over workers)")
+    if timings.get("worker_idle", 0) / workers > timings.get("producer_blocked", 0):
+        print("   [Stages] Workers waited on the producer: the client is the bottleneck.")
@@ -0,0 +1,293 @@
+import time
+import json
+import threading
+import requests
+import sys
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# --- PATH CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../../"))
+sys.path.append(PROJECT_ROOT)
+from src.utils.ids import row_uuid
+from src.utils.cgroups import ContainerMemory
+from src.utils.payloads import SELECTIVITY_COLUMNS
+from src.utils.layouts import range_at
+
+# --- CONFIGURATION ---
+WEAVIATE_URL = "http://localhost:8080"
+CONTAINER_NAME = "weaviate_db"
+
+MAX_WORKERS = 8
+INITIAL_WORKERS = 2
+MIN_BATCH, INITIAL_BATCH, MAX_BATCH = 50, 100, 2000
+LATENCY_TARGET = 5.0          # sec ανά batch request πριν αρχίσουμε να μικραίνουμε τα batches
+MEMORY_HIGH = 0.85            # πάνω από αυτό (ως ποσοστό του cap) μειώνουμε concurrency και batch
+MEMORY_CRITICAL = 0.95        # πάνω από αυτό σταματάμε να στέλνουμε μέχρι να πέσει κάτω από MEMORY_HIGH
+MEMORY_POLL = 0.5
+# Η μνήμη του HNSW δεν πέφτει όταν σταματάει το import: αν μείνει πάνω από MEMORY_HIGH τόσα sec
+# χωρίς τίποτα in flight, το import σταματάει με error αντί να περιμένει για πάντα
+PAUSE_TIMEOUT = 300
+MAX_RETRIES = 6
+REQUEST_TIMEOUT = 120
+
+THROTTLE_STATUS = {429, 500, 502, 503, 504}
+
+# Η Weaviate αποθηκεύει μόνο float32 vectors. Τα precision variants (src/utils/precision.py) αντιστοιχούν
+# σε compression του HNSW, που ορίζεται στη δημιουργία του class: int8 -> SQ (1 byte ανά διάσταση,
+# μετά από trainingLimit objects), binary -> BQ (1 bit ανά διάσταση). Float16 / bfloat16 δεν υπάρχουν.
+SQ_TRAINING_LIMIT = 100_000
+PRECISION_COMPRESSION = {
+    "int8": {"sq": {"enabled": True, "trainingLimit": SQ_TRAINING_LIMIT}},
+    "binary": {"bq": {"enabled": True}},
+}
+
+
+class AdaptiveController:
+    """AIMD για concurrency και batch size: προσθετική αύξηση όσο όλα πάνε καλά,
+    υποδιπλασιασμός σε 429/5xx/timeout, αργά batches ή πίεση μνήμης."""
+
+    def __init__(self, max_workers, batch_size, mem_limit=None, memory=None):
+        self.max_workers = max_workers
+        self.concurrency = min(INITIAL_WORKERS, max_workers)
+        self.batch_size = batch_size
+        self.mem_limit = mem_limit
+        self.memory = memory
+        self.paused = False
+        self.paused_since = None
+        self.cooldown_until = 0.0
+        self.peak_memory = 0
+        self.last_memory = 0
+        self.throttles = 0
+        self._successes = 0
+        self._last_poll = 0.0
+
+    def backoff(self, attempt):
+        self.throttles += 1
+        self.concurrency = max(1, self.concurrency // 2)
+        self.batch_size = max(MIN_BATCH, self.batch_size // 2)
+        self._successes = 0
+        self.cooldown_until = time.perf_counter() + min(30.0, 0.5 * 2 ** attempt)
+
+    def on_success(self, latency):
+        if latency > LATENCY_TARGET:
+            self.batch_size = max(MIN_BATCH, int(self.batch_size * 0.7))
+            return
+        self._successes += 1
+        # Μία αύξηση ανά "γύρο" επιτυχιών σε όλους τους ενεργούς workers
+        if self._successes >= self.concurrency:
+            self._successes = 0
+            if not self._memory_tight():
+                self.concurrency = min(self.max_workers, self.concurrency + 1)
+                self.batch_size = min(MAX_BATCH, int(self.batch_size * 1.25))
+
+    def _memory_tight(self):
+        return self.mem_limit and self.last_memory > MEMORY_HIGH * self.mem_limit
+
+    def poll_memory(self):
+        now = time.perf_counter()
+        if not self.mem_limit or not self.memory or now - self._last_poll < MEMORY_POLL:
+            return
+        self._last_poll = now
+        used = self.memory.read()
+        if used is None:
+            return
+        self.last_memory = used
+        self.peak_memory = max(self.peak_memory, used)
+        if used > MEMORY_CRITICAL * self.mem_limit:
+            if not self.paused:
+                print(f"\n   [Memory] {used / 2**30:.2f} GiB > {MEMORY_CRITICAL:.0%} of cap, pausing imports...")
+                self.paused_since = now
+            self.paused = True
+            self.concurrency = 1
+            self.batch_size = max(MIN_BATCH, self.batch_size // 2)
+        elif used > MEMORY_HIGH * self.mem_limit:
+            self.concurrency = max(1, self.concurrency - 1)
+            self.batch_size = max(MIN_BATCH, int(self.batch_size * 0.8))
+        else:
+            self.paused = False
+            self.paused_since = None
+
+    def check_stalled(self, inflight):
+        """RuntimeError όταν το import είναι paused χωρίς τίποτα in flight για πάνω από PAUSE_TIMEOUT."""
+        if self.paused and not inflight and time.perf_counter() - self.paused_since > PAUSE_TIMEOUT:
+            raise RuntimeError(f"Import paused for {PAUSE_TIMEOUT}s: container memory "
+                               f"{self.last_memory / 2**30:.2f} GiB stays above {MEMORY_HIGH:.0%} of the "
+                               f"{self.mem_limit / 2**30:.2f} GiB cap. Raise --mem-limit or load a smaller size.")
+
+    def can_dispatch(self, inflight):
+        return not self.paused and inflight < self.concurrency and time.perf_counter() >= self.cooldown_until
+
+
+_local = threading.local()
+
+
+def _session():
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def batch_objects(class_name, ids, vectors, columns, tenant=None):
+    """Τα objects ενός /v1/batch/objects: vectors (n, dim) και columns {property: n τιμές} για τα row ids.
+    tenant: ο tenant όλων των objects σε multi-tenant class."""
+    vecs = vectors.tolist()
+    props = {name: col.tolist() for name, col in columns.items()}
+    extra = {"tenant": tenant} if tenant else {}
+    return [
+        {"class": class_name, "id": row_uuid(i), "vector": vecs[j],
+         "properties": {name: values[j] for name, values in props.items()}, **extra}
+        for j, i in enumerate(ids)
+    ]
+
+
+def post_batch(url, class_name, vectors, columns, start, end, ids=None, tenant=None):
+    """Ένα POST /v1/batch/objects για τις γραμμές [start, end). Τα UUIDs είναι ντετερμινιστικά
+    (row index, ή ids[start:end] όταν οι γραμμές είναι σε άλλη σειρά), οπότε ένα retry του ίδιου range
+    απλώς ξαναγράφει τα ίδια objects. Επιστρέφει "ok" ή "retry" (429/5xx, timeout ή errors σε επίπεδο object)."""
+    objects = batch_objects(class_name, range(start, end) if ids is None else ids[start:end].tolist(), vectors[start:end],
+                            {name: col[start:end] for name, col in columns.items()}, tenant)
+    try:
+        resp = _session().post(f"{url}/v1/batch/objects", data=json.dumps({"objects": objects}),
+                               headers={"Content-Type": "application/json"}, timeout=REQUEST_TIMEOUT)
+    except (requests.Timeout, requests.ConnectionError):
+        return "retry"
+    if resp.status_code in THROTTLE_STATUS:
+        return "retry"
+    resp.raise_for_status()
+    if any(obj.get("result", {}).get("errors") for obj in resp.json()):
+        return "retry"
+    return "ok"
+
+
+def write_objects(class_name, ids, vectors, columns, url=WEAVIATE_URL):
+    """Insert / upsert αυθαίρετων row ids σε ένα request (mixed workload): ένα υπάρχον id ξαναγράφεται.
+    Σε αποτυχία σηκώνει exception, χωρίς retries."""
+    objects = batch_objects(class_name, ids, vectors, columns)
+    resp = _session().post(f"{url}/v1/batch/objects", data=json.dumps({"objects": objects}),
+                           headers={"Content-Type": "application/json"}, timeout=REQUEST_TIMEOUT)
+    resp.raise_for_status()
+    errors = [obj["result"]["errors"] for obj in resp.json() if obj.get("result", {}).get("errors")]
+    if errors:
+        raise RuntimeError(f"{len(errors)} objects failed: {errors[0]}")
+
+
+def delete_objects(class_name, ids, url=WEAVIATE_URL):
+    """Batch delete (DELETE /v1/batch/objects) των row ids. Επιστρέφει πόσα σβήστηκαν."""
+    match = {"class": class_name, "where": {"path": ["id"], "operator": "ContainsAny",
+                                            "valueTextArray": [row_uuid(i) for i in ids]}}
+    resp = _session().delete(f"{url}/v1/batch/objects", data=json.dumps({"match": match}),
+                             headers={"Content-Type": "application/json"}, timeout=REQUEST_TIMEOUT)
+    resp.raise_for_status()
+    return resp.json().get("results", {}).get("successful", 0)
+
+
+def precision_compression(precision):
+    if precision not in PRECISION_COMPRESSION:
+        raise ValueError(f"Weaviate has no {precision} vectors (supported: float32, {', '.join(PRECISION_COMPRESSION)})")
+    return PRECISION_COMPRESSION[precision]
+
+
+def class_properties(range_index=False):
+    """Properties του benchmark class. Οι στήλες selectivity είναι πάντα indexFilterable (χωρίς αυτό η
+    Weaviate δεν φιλτράρει καθόλου). range_index προσθέτει indexRangeFilters για τα range φίλτρα.
+    Και τα δύο ορίζονται μόνο στη δημιουργία του class."""
+    return [
+        {"name": "city_id", "dataType": ["int"]},
+        {"name": "quality_score", "dataType": ["number"]},
+    ] + [{"name": name, "dataType": ["int"], "indexFilterable": True, "indexRangeFilters": range_index}
+         for name in SELECTIVITY_COLUMNS]
+
+
+def create_tenants(class_name, tenants, url=WEAVIATE_URL, chunk=100):
+    """POST /v1/schema/{class}/tenants σε κομμάτια των chunk ονομάτων (το class πρέπει να έχει
+    multiTenancyConfig enabled)."""
+    for i in range(0, len(tenants), chunk):
+        resp = _session().post(f"{url}/v1/schema/{class_name}/tenants",
+                               json=[{"name": name} for name in tenants[i:i + chunk]], timeout=REQUEST_TIMEOUT)
+        resp.raise_for_status()
+
+
+def live_count(class_name, url=WEAVIATE_URL):
+    """Objects του class (Aggregate meta count), ή None αν το class δεν υπάρχει. Ένα multi-tenant class
+    θέλει tenant στο Aggregate, οπότε κι αυτό δίνει None (φρέσκο load)."""
+    resp = _session().post(f"{url}/v1/graphql", json={"query": f"{{Aggregate{{{class_name}{{meta{{count}}}}}}}}"},
+                           timeout=REQUEST_TIMEOUT)
+    resp.raise_for_status()
+    body = resp.json()
+    if body.get("errors"):
+        return None
+    return body["data"]["Aggregate"][class_name][0]["meta"]["count"]
+
+
+def import_objects(class_name, vectors, columns, start, stop, url=WEAVIATE_URL, max_workers=MAX_WORKERS,
+                   batch_size=INITIAL_BATCH, mem_limit=None, container=CONTAINER_NAME, progress=True,
+                   ids=None, tenants=None):
+    """Παράλληλο import των γραμμών [start, stop) με adaptive concurrency / batch size.
+
+    columns: {property: array} (memmaps). mem_limit: όριο μνήμης του container σε bytes
+    (None = προσαρμογή μόνο σε errors και latency). Αποτυχημένα ranges ξαναμπαίνουν στην ουρά.
+    tenants: [(tenant, start, end)] για multi-tenant class (src/utils/layouts.py): κανένα batch δεν περνάει
+    όριο tenant. ids: τα row ids των γραμμών όταν είναι ταξινομημένες ανά tenant."""
+    controller = AdaptiveController(max_workers, batch_size, mem_limit, ContainerMemory(container) if mem_limit else None)
+    if mem_limit and controller.memory.read() is None:
+        print(f"   [WARN] Cannot read memory of container '{container}', adapting on errors/latency only.")
+
+    retries = deque()
+    inflight = {}
+    next_row = start
+    inserted = 0
+    last_report = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while next_row < stop or retries or inflight:
+            controller.poll_memory()
+            while controller.can_dispatch(len(inflight)) and (retries or next_row < stop):
+                if retries:
+                    s, e, tenant, attempt = retries.popleft()
+                else:
+                    s, e, tenant, attempt = next_row, min(next_row + controller.batch_size, stop), None, 0
+                    if tenants:
+                        tenant, boundary = range_at(tenants, s)
+                        e = min(e, boundary)
+                    next_row = e
+                fut = pool.submit(post_batch, url, class_name, vectors, columns, s, e, ids, tenant)
+                inflight[fut] = (s, e, tenant, attempt, time.perf_counter())
+
+            if not inflight:
+                controller.check_stalled(inflight)
+                time.sleep(0.1)
+                continue
+
+            done, _ = wait(inflight, timeout=MEMORY_POLL, return_when=FIRST_COMPLETED)
+            for fut in done:
+                s, e, tenant, attempt, t0 = inflight.pop(fut)
+                if fut.result() == "ok":
+                    inserted += e - s
+                    controller.on_success(time.perf_counter() - t0)
+                    continue
+                if attempt + 1 > MAX_RETRIES:
+                    raise RuntimeError(f"Rows {s}-{e} failed after {MAX_RETRIES} retries")
+                controller.backoff(attempt)
+                retries.append((s, e, tenant, attempt + 1))
+
+            if progress and inserted - last_report >= 50_000:
+                last_report = inserted
+                print(f"   -> Inserted {inserted:,} / {stop - start:,} "
+                      f"(workers={controller.concurrency}, batch={controller.batch_size})", end="\r")
+
+    return {
+        "inserted": inserted,
+        "throttles": controller.throttles,
+        "final_workers": controller.concurrency,
+        "final_batch_size": controller.batch_size,
+        "peak_memory": controller.peak_memory,
+    }
+
+
+def print_import_summary(result):
+    peak = f"{result['peak_memory'] / 2**30:.2f} GiB" if result["peak_memory"] else "n/a"
+    print(f"\n   [Import] throttles={result['throttles']} final_workers={result['final_workers']} "
+          f"final_batch={result['final_batch_size']} peak_mem={peak}")
@@ -0,0 +1,624 @@
+import time
+import random
+import threading
+import argparse
+import functools
+import json
+import requests
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import weaviate
+import sys
+import os
+from pymilvus import connections, Collection
+
+# --- PATH CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../../"))
+sys.path.append(PROJECT_ROOT)
+from src.utils.metrics import BenchmarkMetrics, begin_request, end_request, lap
+from src.utils.ground_truth import ground_truth, recall_at, GT_K, RECALL_AT
+from src.utils.ids import uuid_row
+from src.utils.local_backend import LocalBackend
+from src.utils.sizes import SIZE_NAMES
+from src.utils.dataset import Dataset, DATA_ROOT, folder_name, collection_name, weaviate_class, select_dataset, selected_dataset
+from src.utils import cgroups, query_sets, traces
+from src.utils.layouts import LAYOUTS, engine_layout, layout_label, partition_name, select_layout, selected_layout
+
+# --- CONFIGURATION ---
+MILVUS_CONFIG = {"host": "localhost", "port": "19530"}
+WEAVIATE_URL = "http://localhost:8080"
+
+WARMUP_QUERIES = 5
+DEFAULT_SEED = 42
+
+# Search-time παράμετροι. Το ef του HNSW πρέπει να είναι >= limit, το nprobe αφορά μόνο IVF_*
+DEFAULT_EF = 128
+DEFAULT_NPROBE = 16
+CONCURRENCY_SWEEP = [1, 2, 4, 8, 16, 32, 64]
+# Κάθε worker πρέπει να στείλει αρκετά queries ώστε τα percentiles να έχουν νόημα
+MIN_QUERIES_PER_WORKER = 20
+
+NQ_SWEEP = [1, 10, 100, 1000]
+MIN_BATCHES = 10
+
+# Open loop: κλίμακα offered load (queries/sec) όταν δίνεται --rate sweep
+RATE_SWEEP = [10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+OPEN_LOOP_WORKERS = 64
+
+
+def parse_levels(value):
+    """'sweep' -> CONCURRENCY_SWEEP, '1,4,16' -> [1, 4, 16]"""
+    if value == "sweep":
+        return list(CONCURRENCY_SWEEP)
+    return [int(v) for v in value.split(",") if v]
+
+
+def parse_nq(value):
+    """'sweep' -> NQ_SWEEP, '1,100' -> [1, 100]"""
+    if value == "sweep":
+        return list(NQ_SWEEP)
+    return [int(v) for v in value.split(",") if v]
+
+
+def parse_rates(value):
+    """'sweep' -> RATE_SWEEP, '50,100.5' -> [50.0, 100.5]"""
+    if value == "sweep":
+        return [float(r) for r in RATE_SWEEP]
+    return [float(v) for v in value.split(",") if v]
+
+
+def results_path(workload, suffix=""):
+    base, ext = os.path.splitext(workload.RESULTS_FILE)
+    return os.path.join(PROJECT_ROOT, f"{base}{suffix}{ext}")
+
+
+def print_stats(label, stats):
+    if stats:
+        errors = f" errors={stats['Errors']} ({stats['Error Rate (%)']}%)" if stats.get("Errors") else ""
+        print(f"   [{label}] QPS={stats['Throughput (QPS)']} p50={stats['P50 Latency (s)']} "
+              f"p95={stats['P95 Latency (s)']} p99={stats['P99 Latency (s)']}{errors}")
+
+
+def batch_columns(nq, stats):
+    """Με nq vectors ανά request, το latency/QPS του request μεταφράζεται σε per-vector νούμερα."""
+    columns = {"NQ": nq}
+    if stats:
+        columns["Per-Vector Latency (s)"] = round(stats["Avg Latency (s)"] / nq, 7)
+        columns["Vectors/sec"] = round(stats["Throughput (QPS)"] * nq, 2)
+    return columns
+
+
+class WeaviateHandle:
+    """Ένας weaviate.Client ανά thread: το requests.Session του v3 client δεν είναι
+    thread-safe και το connection pool του γεμίζει με πολλούς workers.
+    Τα searches στέλνονται με δικό μας Session (επίσης ανά thread), ώστε serialize / wire / decode
+    να χρονομετρούνται χωριστά. Ο client μένει για schema / config."""
+
+    def __init__(self, url, class_name):
+        self.url = url
+        self.class_name = class_name
+        self._local = threading.local()
+
+    @property
+    def client(self):
+        if not hasattr(self._local, "client"):
+            self._local.client = weaviate.Client(self.url)
+        return self._local.client
+
+    @property
+    def session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+            self._local.session.headers["Content-Type"] = "application/json"
+        return self._local.session
+
+
+def dataset_folder(dim):
+    return os.path.join(DATA_ROOT, folder_name(dim))
+
+
+def open_backend(db_type, dim, precision=None):
+    """precision: το collection ενός precision variant (Milvus) ή search πάνω στα codes του (local)."""
+    if db_type == "local":
+        return LocalBackend(dataset_folder(dim), precision=precision)
+    if db_type == "milvus":
+        connections.connect("default", **MILVUS_CONFIG)
+        col = Collection(collection_name(dim, precision))
+        col.load()
+        return col
+    elif db_type == "weaviate":
+        return WeaviateHandle(WEAVIATE_URL, weaviate_class(dim))
+    raise ValueError(f"Unknown database: {db_type}")
+
+
+def close_backend(db_type, handle):
+    if db_type == "milvus":
+        handle.release()
+    elif db_type == "local":
+        handle.close()
+
+
+def reset_connection(db_type):
+    """Μετά από restart του container το "default" connection της pymilvus είναι νεκρό."""
+    if db_type == "milvus":
+        connections.disconnect("default")
+
+
+@functools.lru_cache(maxsize=None)
+def load_dataset(folder):
+    """Ένα Dataset (memmaps) ανά φάκελο για όλο το process: τα workloads του ίδιου cell μοιράζονται το page cache."""
+    return Dataset(folder)
+
+
+def build_workload_queries(workload, dataset, max_idx, count, seed=DEFAULT_SEED):
+    """Τα queries ενός workload πάνω στις πρώτες max_idx γραμμές. Workloads που χρειάζονται payloads
+    τα δηλώνουν στο QUERY_PAYLOADS και τα queries τους είναι γραμμές του dataset. Τα υπόλοιπα παίρνουν
+    τα vectors από το query set ενός imported dataset, αν υπάρχει, αντί για γραμμές της συλλογής."""
+    if hasattr(workload, "QUERY_PAYLOADS"):
+        payloads = dataset.payloads(workload.QUERY_PAYLOADS)
+        return workload.build_queries(dataset.vectors(), max_idx, count, random.Random(seed), payloads=payloads)
+    query_set = dataset.queries()
+    if query_set is not None:
+        return workload.build_queries(query_set, len(query_set), count, random.Random(seed))
+    return workload.build_queries(dataset.vectors(), max_idx, count, random.Random(seed))
+
+
+def query_set_name(workload):
+    return getattr(workload, "QUERY_SET_NAME", os.path.splitext(os.path.basename(workload.RESULTS_FILE))[0])
+
+
+def workload_queries(workload, dataset, max_idx, count, seed=DEFAULT_SEED):
+    """(queries, φάκελος του query set). Το set φτιάχνεται την πρώτη φορά (ή όταν ζητηθούν περισσότερα queries)
+    και μετά διαβάζεται από το <dataset>/query_sets/, ώστε όλα τα runs και όλες οι βάσεις να βλέπουν τα ίδια
+    queries, χωρίς random reads στο memmap λίγο πριν από τη μέτρηση."""
+    name = query_set_name(workload)
+    path = query_sets.query_set_path(dataset.folder, name, max_idx, seed, dataset.fingerprint())
+    queries = query_sets.load_query_set(path, count)
+    if queries is None:
+        queries = build_workload_queries(workload, dataset, max_idx, count, seed)
+        query_sets.save_query_set(path, queries, workload=name, dataset=dataset.name, rows=max_idx, seed=seed,
+                                  fingerprint=dataset.fingerprint())
+        print(f"   [Queries] Saved {len(queries)} queries to {os.path.relpath(path, PROJECT_ROOT)}")
+    elif hasattr(workload, "query_set_loaded"):
+        # Ό,τι κρατούσε το build_queries στο workload (π.χ. η selectivity του query6)
+        workload.query_set_loaded(queries, dataset, max_idx)
+    return queries, path
+
+
+def trace_recorder(workload, db_type, dim, dataset_size, nq, label, **header):
+    """Ένα TraceRecorder για ένα run, στο results/traces/<query set>_<db>_<dim>d_<size>_nq<nq>_<label>.jsonl."""
+    name = query_set_name(workload)
+    path = os.path.join(PROJECT_ROOT, traces.TRACES_DIR, f"{name}_{db_type}_{dim}d_{dataset_size}_nq{nq}_{label}.jsonl")
+    return traces.TraceRecorder(path, workload=name, db=db_type, dim=dim, size=dataset_size, nq=nq, **header)
+
+
+def milvus_index_type(col):
+    for index in col.indexes:
+        if index.field_name == "vector":
+            return index.params.get("index_type", "FLAT")
+    return "FLAT"
+
+
+def milvus_search_params(index_type, ef=DEFAULT_EF, nprobe=DEFAULT_NPROBE):
+    """Τα params που καταλαβαίνει το συγκεκριμένο index (HNSW: ef, DISKANN: search_list, IVF_*: nprobe)."""
+    if index_type == "HNSW":
+        return {"ef": ef}
+    if index_type == "DISKANN":
+        return {"search_list": ef}
+    if index_type.startswith(("IVF", "BIN_IVF")):
+        return {"nprobe": nprobe}
+    return {}
+
+
+def set_weaviate_ef(client, class_name, ef=None, dynamic_ef=None):
+    """Το ef της Weaviate είναι ρύθμιση του class. ef=-1 ενεργοποιεί το dynamic ef
+    (dynamic_ef = (min, max, factor))."""
+    config = {"ef": -1 if ef is None else ef}
+    if dynamic_ef:
+        config.update(zip(["dynamicEfMin", "dynamicEfMax", "dynamicEfFactor"], dynamic_ef))
+    client.schema.update_config(class_name, {"vectorIndexConfig": config})
+
+
+def milvus_search(workload, col, batch, limit=10, params=None):
+    """Ένα col.search ανά ομάδα queries με το ίδιο expr και partition. Το expr (και τα partition_names)
+    της Milvus ισχύουν για όλα τα vectors ενός search, οπότε ένα filtered batch σπάει σε τόσα searches όσα
+    τα διαφορετικά φίλτρα του, όπως η Weaviate φιλτράρει ανά alias. Τα unfiltered batches μένουν ένα search.
+    Η pymilvus κάνει το protobuf serialization μέσα στο search, οπότε μετράει στο wire.
+    Στο partitions layout ένα workload με partition_key ψάχνει μόνο στο partition κάθε query
+    (στο pkey layout το routing το κάνει ο server από το expr)."""
+    params = dict(params or {})
+    for key in ("ef", "search_list"):
+        if key in params:
+            params[key] = max(params[key], limit)
+    groups = {}
+    for i, query in enumerate(batch):
+        key = (workload.milvus_expr(query), tuple(query_partitions(workload, "milvus", query) or ()))
+        groups.setdefault(key, []).append(i)
+    lap("prepare")
+    results = [(rows, col.search(data=[batch[i][0] for i in rows], anns_field="vector",
+                                 param={"metric_type": workload.METRIC, "params": params}, limit=limit,
+                                 expr=expr, partition_names=list(partitions) or None))
+               for (expr, partitions), rows in groups.items()]
+    lap("wire")
+    # Τα Hit objects φτιάχνονται από το protobuf όταν τα διαβάσουμε
+    ids = [None] * len(batch)
+    for rows, result in results:
+        for i, hits in zip(rows, result_ids("milvus", result, len(rows))):
+            ids[i] = hits
+    lap("decode")
+    return ids
+
+
+def query_partitions(workload, db_type, query):
+    """[partition / tenant] του query στο explicit partitions / tenants layout, αλλιώς None (όλο το collection).
+    Το φίλτρο του workload μένει, αφού ένα bucket μπορεί να έχει πολλές πόλεις."""
+    kind, partitions = engine_layout(db_type)
+    if kind not in ("partitions", "tenants") or not hasattr(workload, "partition_key"):
+        return None
+    return [partition_name(workload.partition_key(query), partitions)]
+
+
+def weaviate_builder(workload, client, class_name, query, limit=10):
+    builder = client.query.get(class_name, workload.WEAVIATE_PROPERTIES).with_near_vector({"vector": query[0]}).with_limit(limit).with_additional(["id"])
+    where_filter = workload.weaviate_where(query)
+    if where_filter:
+        builder = builder.with_where(where_filter)
+    tenant = query_partitions(workload, "weaviate", query)
+    if tenant:
+        builder = builder.with_tenant(tenant[0])
+    return builder
+
+
+def weaviate_search(workload, handle, batch, limit=10):
+    """nq=1: ένα nearVector. nq>1: ένα GraphQL request με ένα alias ανά query (multi_get),
+    το πλησιέστερο ισοδύναμο της Weaviate σε batched search με φίλτρο ανά query."""
+    client, class_name = handle.client, handle.class_name
+    if len(batch) == 1:
+        query = weaviate_builder(workload, client, class_name, batch[0], limit).build()
+    else:
+        query = client.query.multi_get([
+            weaviate_builder(workload, client, class_name, q, limit).with_alias(f"q{i}") for i, q in enumerate(batch)
+        ]).build()
+    lap("prepare")
+    body = json.dumps({"query": query}).encode()
+    lap("serialize")
+    response = handle.session.post(f"{handle.url}/v1/graphql", data=body)
+    response.raise_for_status()
+    content = response.content
+    lap("wire")
+    result = json.loads(content)
+    if result.get("errors"):
+        raise RuntimeError(f"GraphQL error: {result['errors'][0].get('message')}")
+    ids = result_ids("weaviate", result, len(batch), class_name)
+    lap("decode")
+    return ids
+
+
+def local_search(workload, backend, batch, limit=10):
+    ids = backend.search(workload, batch, limit)
+    lap("wire")
+    ids = result_ids("local", ids, len(batch))
+    lap("decode")
+    return ids
+
+
+def make_search_fn(workload, db_type, handle, params=None):
+    """search_fn(batch, limit) -> row ids ανά query vector. Κάθε backend καλεί lap() στο τέλος
+    κάθε φάσης (prepare / serialize / wire / decode) για το breakdown του BenchmarkMetrics."""
+    if db_type == "local":
+        return lambda batch, limit=10: local_search(workload, handle, batch, limit)
+    if db_type == "milvus":
+        return lambda batch, limit=10: milvus_search(workload, handle, batch, limit, params)
+    return lambda batch, limit=10: weaviate_search(workload, handle, batch, limit)
+
+
+def result_ids(db_type, result, batch_size, class_name=None):
+    """Row ids ανά query vector από την απάντηση του backend."""
+    if db_type == "local":
+        return [[int(i) for i in row if i >= 0] for row in result]
+    if db_type == "milvus":
+        return [[hit.id for hit in hits] for hits in result]
+    data = result["data"]["Get"]
+    groups = [data[class_name]] if batch_size == 1 else [data[f"q{i}"] for i in range(batch_size)]
+    return [[uuid_row(obj["_additional"]["id"]) for obj in objs or []] for objs in groups]
+
+
+def measure_recall(workload, db_type, handle, search_fn, queries, folder, max_idx, limit=GT_K, ks=RECALL_AT, gt_queries=None):
+    """Ένα μη χρονομετρημένο πέρασμα με το δοσμένο limit για recall@k έναντι του exact ground truth.
+    gt_queries: τα float32 queries του ground truth, όταν τα queries του search είναι κωδικοποιημένα (precision variants)."""
+    gt_ids = ground_truth(folder, workload, gt_queries or queries, max_idx)
+    found = [search_fn([q], limit=limit)[0] for q in queries]
+    recalls = recall_at(found, gt_ids, ks)
+    print(f"   [Recall] " + " ".join(f"{k}={v}" for k, v in recalls.items()))
+    return recalls
+
+
+def make_batches(queries, nq, count):
+    """count batches των nq queries, παίρνοντας τα queries κυκλικά."""
+    return [[queries[(b * nq + j) % len(queries)] for j in range(nq)] for b in range(count)]
+
+
+def run_closed_loop(search_fn, batches, concurrency, total_queries=None, resources=None, trace=None, duration=None):
+    """Closed loop: κάθε worker στέλνει το επόμενο query μόλις επιστρέψει το προηγούμενο.
+    Τα batches μοιράζονται κυκλικά, οπότε total_queries μπορεί να ξεπερνά το len(batches).
+    Με duration (sec) τρέχει για τόσο χρόνο αντί για total_queries requests.
+    Με trace (TraceRecorder) καταγράφεται πότε στάλθηκε κάθε request.
+    Ένα search_fn που αποτυγχάνει δεν σταματάει τον worker: μετράει στα Errors του tracker."""
+    total = float("inf") if duration else total_queries or len(batches)
+    end_at = [None]
+    tracker = BenchmarkMetrics(resources=resources)
+    lock = threading.Lock()
+    cursor = [0]
+
+    def worker():
+        while True:
+            with lock:
+                i = cursor[0]
+                cursor[0] += 1
+            if i >= total or (end_at[0] and time.perf_counter() >= end_at[0]):
+                return
+            begin_request()
+            start_q = time.perf_counter()
+            if trace: trace.record(i % len(batches), start_q)
+            try:
+                search_fn(batches[i % len(batches)])
+            except Exception as e:
+                # Ο worker συνεχίζει: το error μετράει στα Errors / Error Rate (%) και όχι στα percentiles
+                end_request()
+                if tracker.record_error() == 1:
+                    print(f"   [WARN] Request failed: {e}")
+                continue
+            tracker.record_latency(time.perf_counter() - start_q, end_request())
+            if i % 10 == 0: tracker.sample_system_resources()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    tracker.start()
+    if trace: trace.start()
+    if duration: end_at[0] = time.perf_counter() + duration
+    for t in threads: t.start()
+    for t in threads: t.join()
+    tracker.stop()
+    return tracker
+
+
+def arrival_offsets(rate, count, arrival="constant", seed=None):
+    """Χρόνοι αποστολής (sec από την αρχή) για count requests με μέσο ρυθμό rate."""
+    if arrival == "poisson":
+        gaps = np.random.default_rng(seed).exponential(1.0 / rate, count)
+        return np.cumsum(gaps) - gaps[0]
+    return np.arange(count) / rate
+
+
+def run_schedule(search_fn, batches, offsets, order=None, max_workers=OPEN_LOOP_WORKERS, resources=None, trace=None):
+    """Στέλνει το request i τη στιγμή offsets[i] (sec από την αρχή) με το batch order[i] (κυκλικά αν None),
+    ανεξάρτητα από το αν έχουν απαντηθεί τα προηγούμενα. Το latency μετριέται από τον *προγραμματισμένο*
+    χρόνο αποστολής, οπότε όταν η βάση κολλάει η αναμονή στην ουρά μετράει κανονικά
+    (διόρθωση coordinated omission). Ένα request που αποτυγχάνει (ή λήγει) μετράει στο histogram με τον
+    χρόνο μέχρι την αποτυχία και στη στήλη Errors. Επιστρέφει (tracker, αποτυχημένα requests)."""
+    tracker = BenchmarkMetrics(resources=resources)
+
+    def fire(i, intended):
+        begin_request()
+        try:
+            search_fn(batches[order[i] if order is not None else i % len(batches)])
+        except Exception as e:
+            end_request()
+            if tracker.record_error(time.perf_counter() - intended) == 1:
+                print(f"   [WARN] Request failed: {e}")
+            return
+        tracker.record_latency(time.perf_counter() - intended, end_request())
+        if i % 10 == 0: tracker.sample_system_resources()
+
+    tracker.start()
+    t0 = time.perf_counter()
+    if trace: trace.start(t0)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for i, offset in enumerate(offsets):
+            intended = t0 + offset
+            delay = intended - time.perf_counter()
+            if delay > 0: time.sleep(delay)
+            if trace: trace.record(order[i] if order is not None else i % len(batches), intended)
+            pool.submit(fire, i, intended)
+    tracker.stop()
+    return tracker, tracker.errors
+
+
+def run_open_loop(search_fn, batches, rate, duration, arrival="constant", max_workers=OPEN_LOOP_WORKERS, resources=None, trace=None):
+    """Open loop με σταθερό ή Poisson ρυθμό rate για duration seconds (run_schedule)."""
+    offsets = arrival_offsets(rate, max(1, int(rate * duration)), arrival)
+    tracker, errors = run_schedule(search_fn, batches, offsets, max_workers=max_workers, resources=resources, trace=trace)
+    if errors:
+        print(f"   [WARN] {errors} requests failed at {rate} req/s")
+    return tracker
+
+
+def run_replay(search_fn, batches, offsets, order, speed=1.0, max_workers=OPEN_LOOP_WORKERS, resources=None):
+    """Ξαναστέλνει ένα trace (traces.load_trace): ίδια batches, στα ίδια offsets διαιρεμένα με το speed
+    (speed=2 -> διπλάσιος ρυθμός)."""
+    tracker, errors = run_schedule(search_fn, batches, offsets / speed, order, max_workers, resources)
+    if errors:
+        print(f"   [WARN] {errors} requests failed during replay at {speed:g}x")
+    return tracker
+
+
+def run_rate_sweep(search_fn, batches, rates, duration, arrival="constant", slo_p99=None, resources=None, trace_factory=None):
+    """Ανεβάζει το offered load βήμα-βήμα. Με slo_p99 σταματάει στο πρώτο rate που το παραβιάζει.
+    trace_factory(rate) -> TraceRecorder ή None, για να γραφτεί το trace κάθε βήματος.
+    Επιστρέφει [(rate, tracker), ...] για την καμπύλη latency vs offered load."""
+    points = []
+    for rate in sorted(rates):
+        trace = trace_factory(rate) if trace_factory else None
+        tracker = run_open_loop(search_fn, batches, rate, duration, arrival, resources=resources, trace=trace)
+        if trace: trace.save()
+        stats = tracker.get_stats()
+        points.append((rate, tracker))
+        print_stats(f"open {arrival} {rate:g} req/s", stats)
+        if slo_p99 is not None and (stats is None or stats["P99 Latency (s)"] > slo_p99):
+            print(f"   [SLO] p99 > {slo_p99}s at {rate:g} req/s, stopping sweep.")
+            break
+    return points
+
+
+def run_workload(workload, db_type, dim, dataset_size, num_queries=100, concurrency_levels=None,
+                 mode="closed", rates=None, arrival="constant", duration=10.0, slo_p99=None, nq_levels=None,
+                 seed=DEFAULT_SEED, recall=True, ef=None, nprobe=DEFAULT_NPROBE, handle=None,
+                 record_trace=False, replay=None, speed=1.0):
+    """Κοινός driver για όλα τα src/queries/query*.py: φορτώνει τα queries, ανοίγει το backend
+    μία φορά (ή χρησιμοποιεί το handle που του δίνεται, χωρίς release στο τέλος) και τρέχει ένα closed loop για κάθε (concurrency, nq) ή (mode="open")
+    ένα open loop για κάθε offered rate. Κάθε request στέλνει nq query vectors.
+    Τα queries είναι seeded και persisted (workload_queries), ώστε κάθε run και κάθε βάση να βλέπει τα ίδια
+    και το ground truth για το recall να μένει στο cache μεταξύ runs.
+    record_trace: γράφει το trace κάθε run στο results/traces/. replay: ένα τέτοιο trace ξαναστέλνεται
+    (με τα queries του δικού του query set και το nq του) με speed x ρυθμό, αντί για closed / open loop.
+    Ένας cgroup sampler καταγράφει τα containers της βάσης (φάσεις warmup / recall / query) στο
+    results/stats/resources/<results file>_<db>_<dim>d_<size>.csv και δίνει τις Server * στήλες."""
+    nq_levels = nq_levels or [1]
+    folder = dataset_folder(dim)
+    if not Dataset.exists(folder):
+        print(f"Error: Dataset not found at {folder}")
+        return
+    if engine_layout(db_type)[0] == "tenants" and not hasattr(workload, "partition_key"):
+        # Ένα multi-tenant class δεν ψάχνεται χωρίς tenant
+        print(f"   [SKIP] {query_set_name(workload)} has no partition key to route to a Weaviate tenant")
+        return
+
+    dataset = load_dataset(folder)
+    dataset.check_dim(dim)
+    max_idx = dataset.size_rows(dataset_size)
+    replay_trace = traces.load_trace(replay) if replay else None
+    if replay_trace:
+        header = replay_trace[0]
+        if header["workload"] != query_set_name(workload):
+            raise ValueError(f"Trace {replay} was recorded for {header['workload']}, not {query_set_name(workload)}")
+        query_set = os.path.join(PROJECT_ROOT, header["query_set"])
+        queries = query_sets.load_query_set(query_set)
+        if queries is None:
+            raise FileNotFoundError(f"Query set of trace {replay} not found: {query_set}")
+        nq_levels = [header["nq"]]
+    else:
+        queries, query_set = workload_queries(workload, dataset, max_idx, max(num_queries, max(nq_levels)), seed)
+    query_set = os.path.relpath(query_set, PROJECT_ROOT)
+    # Επιπλέον στήλες του workload σε κάθε γραμμή (π.χ. selectivity του query6)
+    workload_columns = workload.extra_columns() if hasattr(workload, "extra_columns") else {}
+    if selected_dataset():
+        workload_columns = dict(Dataset=dataset.name, **workload_columns)
+    if selected_layout()[0] != "flat":
+        workload_columns = dict(Layout=layout_label(db_type), **workload_columns)
+
+    owns_handle = handle is None
+    if owns_handle:
+        handle = open_backend(db_type, dim)
+    params = None
+    if db_type == "milvus":
+        params = milvus_search_params(milvus_index_type(handle), ef or DEFAULT_EF, nprobe)
+    elif db_type == "weaviate" and ef is not None:
+        set_weaviate_ef(handle.client, handle.class_name, ef)
+    search_fn = make_search_fn(workload, db_type, handle, params)
+    containers = cgroups.CONTAINERS[db_type]
+    name = os.path.splitext(os.path.basename(workload.RESULTS_FILE))[0]
+    sampler = cgroups.ResourceSampler(containers, output=cgroups.resources_file(name, db_type, dim, dataset_size) if containers else None).start()
+    try:
+        # Warmup
+        cgroups.mark_phase("warmup")
+        for _ in range(WARMUP_QUERIES): search_fn(queries[:1])
+
+        cgroups.mark_phase("recall")
+        recalls = measure_recall(workload, db_type, handle, search_fn, queries[:num_queries], folder, max_idx) if recall else {}
+        cgroups.mark_phase("query")
+
+        for nq in nq_levels:
+            batches = make_batches(queries, nq, replay_trace[0]["batches"] if replay_trace else max(num_queries // nq, MIN_BATCHES))
+
+            def trace_for(label, **header):
+                return trace_recorder(workload, db_type, dim, dataset_size, nq, label, query_set=query_set,
+                                      dataset=dataset.name, batches=len(batches), **header)
+
+            if replay_trace:
+                header, offsets, order = replay_trace
+                tracker = run_replay(search_fn, batches, offsets, order, speed, resources=sampler)
+                stats = tracker.get_stats()
+                print_stats(f"replay {os.path.basename(replay)} {speed:g}x", stats)
+                extra = dict(workload_columns, Trace=os.path.basename(replay), Recorded_DB=header["db"], Speed=speed)
+                extra.update(batch_columns(nq, stats))
+                extra.update(recalls)
+                tracker.save_to_csv(results_path(workload, "_replay"), db_type, dim, dataset_size, extra=extra)
+                continue
+
+            if mode == "open":
+                results_file = results_path(workload, "_open_loop")
+                trace_factory = (lambda rate: trace_for(f"r{rate:g}", mode="open", rate=rate, arrival=arrival)) if record_trace else None
+                for rate, tracker in run_rate_sweep(search_fn, batches, rates or [10.0], duration, arrival, slo_p99, sampler, trace_factory):
+                    extra = dict(workload_columns, Arrival=arrival, Offered_Rate=rate)
+                    extra.update(batch_columns(nq, tracker.get_stats()))
+                    extra.update(recalls)
+                    tracker.save_to_csv(results_file, db_type, dim, dataset_size, extra=extra)
+                continue
+
+            results_file = results_path(workload)
+            for concurrency in concurrency_levels or [1]:
+                total = max(len(batches), concurrency * MIN_QUERIES_PER_WORKER)
+                trace = trace_for(f"c{concurrency}", mode="closed", concurrency=concurrency) if record_trace else None
+                tracker = run_closed_loop(search_fn, batches, concurrency, total, sampler, trace)
+                if trace: print(f"   [Trace] {os.path.relpath(trace.save(), PROJECT_ROOT)}")
+                stats = tracker.get_stats()
+                print_stats(f"{db_type} {dim}d {dataset_size} N={concurrency} nq={nq}", stats)
+                extra = dict(workload_columns, Concurrency=concurrency)
+                extra.update(batch_columns(nq, stats))
+                extra.update(recalls)
+                tracker.save_to_csv(results_file, db_type, dim, dataset_size, extra=extra)
+    finally:
+        cgroups.mark_phase("idle")
+        sampler.stop()
+        if owns_handle:
+            close_backend(db_type, handle)
+
+
+def add_workload_options(parser):
+    """Τα options του run_workload, κοινά για τα query scripts και το scripts/run_full_suite.py."""
+    parser.add_argument("--queries", type=int, default=100, help="Number of distinct queries")
+    parser.add_argument("--concurrency", type=parse_levels, default=[1],
+                        help="Comma separated worker counts, or 'sweep' for 1,2,4...64")
+    parser.add_argument("--nq", type=parse_nq, default=[1],
+                        help="Query vectors per request, comma separated or 'sweep' for 1,10,100,1000")
+    parser.add_argument("--ef", type=int, default=None,
+                        help=f"HNSW search ef (Milvus default {DEFAULT_EF}; Weaviate keeps its class config unless set)")
+    parser.add_argument("--nprobe", type=int, default=DEFAULT_NPROBE, help="IVF nprobe (Milvus IVF_* indexes)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed for the query set")
+    parser.add_argument("--no-recall", action="store_true", help="Skip the ground truth / recall pass")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed",
+                        help="closed: N workers back-to-back, open: fixed arrival rate")
+    parser.add_argument("--rate", type=parse_rates, default=[10.0],
+                        help="Open loop offered load in req/s, comma separated or 'sweep'")
+    parser.add_argument("--arrival", choices=["constant", "poisson"], default="constant")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per open loop rate step")
+    parser.add_argument("--slo-p99", type=float, default=None, help="Stop the rate sweep once p99 (s) exceeds this")
+    parser.add_argument("--dataset", default=None,
+                        help="Dataset folder under data/ (e.g. one imported by import_ann.py) instead of the exp_* of the dimension")
+    parser.add_argument("--layout", choices=LAYOUTS, default=None,
+                        help="Query the collection / class of a layout loaded with loader_wrapper.py --layout "
+                             "(city filters are routed to their partition / tenant)")
+    parser.add_argument("--partitions", type=int, default=None, help="Buckets of the --layout")
+    parser.add_argument("--record-trace", action="store_true", help="Write a timestamped request trace per run to results/traces/")
+    parser.add_argument("--replay", default=None, help="Replay a recorded trace instead of the closed / open loop")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay rate multiplier (2 = twice the recorded rate)")
+
+
+def workload_options(args):
+    """argparse Namespace -> kwargs του run_workload. Τα --dataset / --layout επιλέγονται εδώ για όλο το process."""
+    select_dataset(args.dataset)
+    select_layout(args.layout, args.partitions)
+    return dict(num_queries=args.queries, concurrency_levels=args.concurrency,
+                mode=args.mode, rates=args.rate, arrival=args.arrival, duration=args.duration, slo_p99=args.slo_p99,
+                nq_levels=args.nq, seed=args.seed, recall=not args.no_recall,
+                ef=args.ef, nprobe=args.nprobe, record_trace=args.record_trace, replay=args.replay, speed=args.speed)
+
+
+def cli(workload):
+    parser = argparse.ArgumentParser(description=f"Run {workload.__name__} workload")
+    parser.add_argument("db", choices=["milvus", "weaviate", "local"])
+    parser.add_argument("dim", type=int)
+    parser.add_argument("size", choices=SIZE_NAMES)
+    add_workload_options(parser)
+    args = parser.parse_args()
+    run_workload(workload, args.db, args.dim, args.size, **workload_options(args))
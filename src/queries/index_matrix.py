@@ -0,0 +1,178 @@
+import argparse
+import importlib
+import json
+import time
+import sys
+import os
+import requests
+from pymilvus import connections, Collection, utility
+
+# --- PATH CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../../"))
+sys.path.append(PROJECT_ROOT)
+from src.queries import driver
+from src.ingestion import loader_wrapper, milvus_pipeline, weaviate_importer
+from src.utils import cgroups, healthcheck
+from src.utils.sizes import SIZE_NAMES
+from src.utils.dataset import collection_name, weaviate_class, select_dataset
+
+# --- CONFIGURATION ---
+# Index stage μετά το load: για κάθε index type build time, peak μνήμη (cgroups), μέγεθος στο δίσκο
+# και recall / QPS με τις default search παραμέτρους του driver.
+WEAVIATE_INDEXES = ["HNSW", "HNSW+PQ", "HNSW+SQ", "HNSW+BQ"]
+PQ_TRAINING_LIMIT = 100_000
+# Τα index files της Milvus ζουν στο MinIO (bucket a-bucket, rootPath files)
+MILVUS_INDEX_PATH = ("milvus-minio", "/minio_data/a-bucket/files/index_files")
+WEAVIATE_DATA_PATH = ("weaviate_db", "/var/lib/weaviate")
+
+RESULTS_FILE = os.path.join(PROJECT_ROOT, "results/sweeps/index_matrix.csv")
+
+
+def mib(value):
+    return round(value / 2**20, 1) if value is not None else ""
+
+
+def milvus_loaded_size(col):
+    """Μνήμη των loaded segments σύμφωνα με τον query node."""
+    return sum(segment.mem_size for segment in utility.get_query_segment_info(col.name))
+
+
+def milvus_collection(dim):
+    """Το collection χωρίς load: το build κάνει ούτως ή άλλως release."""
+    connections.connect("default", **driver.MILVUS_CONFIG)
+    return Collection(collection_name(dim))
+
+
+def build_milvus(handle, index_type, dim, metric):
+    params = milvus_pipeline.index_build_params(index_type, dim)
+    print(f"   [Build] {index_type} {params}...")
+    build = milvus_pipeline.build_vector_index(handle, index_type, params, metric)
+    cgroups.mark_phase("load")
+    t0 = time.perf_counter()
+    handle.load()
+    load = time.perf_counter() - t0
+    return {"Index_Params": json.dumps(params), "Build Time (s)": round(build, 2), "Load Time (s)": round(load, 2),
+            "Loaded Size (MiB)": mib(milvus_loaded_size(handle)),
+            "Disk (MiB)": mib(cgroups.container_disk_usage(*MILVUS_INDEX_PATH))}
+
+
+def weaviate_compressed(class_name):
+    """True όταν όλα τα shards του class είναι compressed (GET /v1/nodes?output=verbose)."""
+    resp = requests.get(f"{driver.WEAVIATE_URL}/v1/nodes", params={"output": "verbose"}, timeout=10)
+    resp.raise_for_status()
+    shards = [s for node in resp.json()["nodes"] for s in node.get("shards") or [] if s["class"] == class_name]
+    return bool(shards) and all(s.get("compressed") for s in shards)
+
+
+def build_weaviate(index, dim, dataset_size, previous):
+    """HNSW: νέο ingestion (η Weaviate χτίζει το HNSW κατά το import, οπότε build = ingestion).
+    HNSW+PQ: PQ πάνω στο υπάρχον HNSW class, build = χρόνος μέχρι να γίνουν compressed όλα τα shards.
+    HNSW+SQ / HNSW+BQ: ορίζονται μόνο στη δημιουργία του class, άρα νέο ingestion. Το SQ εκπαιδεύεται μετά από
+    trainingLimit objects, οπότε build = ingestion + αναμονή μέχρι να γίνουν compressed όλα τα shards."""
+    class_name = weaviate_class(dim)
+    t0 = time.perf_counter()
+    if index == "HNSW+PQ":
+        if previous != "HNSW":
+            loader_wrapper.load_data("weaviate", dim, dataset_size)
+            t0 = time.perf_counter()
+        params = {"pq": {"enabled": True, "segments": min(256, dim // 4), "trainingLimit": PQ_TRAINING_LIMIT}}
+        driver.WeaviateHandle(driver.WEAVIATE_URL, class_name).client.schema.update_config(class_name, {"vectorIndexConfig": params})
+        healthcheck.wait_until(lambda: weaviate_compressed(class_name), what=f"{class_name} PQ compression")
+    else:
+        params = {"HNSW+BQ": weaviate_importer.precision_compression("binary"),
+                  "HNSW+SQ": weaviate_importer.precision_compression("int8")}.get(index, {})
+        loader_wrapper.load_data("weaviate", dim, dataset_size, compression=params)
+        if index == "HNSW+SQ":
+            healthcheck.wait_until(lambda: weaviate_compressed(class_name), what=f"{class_name} SQ compression")
+    return {"Index_Params": json.dumps(params), "Build Time (s)": round(time.perf_counter() - t0, 2), "Load Time (s)": "",
+            "Loaded Size (MiB)": "", "Disk (MiB)": mib(cgroups.container_disk_usage(*WEAVIATE_DATA_PATH))}
+
+
+def run_matrix(workload, db_type, dim, dataset_size, indexes=None, num_queries=100, concurrency=1, seed=driver.DEFAULT_SEED):
+    folder = driver.dataset_folder(dim)
+    dataset = driver.load_dataset(folder)
+    max_idx = dataset.size_rows(dataset_size)
+    queries, _ = driver.workload_queries(workload, dataset, max_idx, num_queries, seed)
+    batches = driver.make_batches(queries, 1, num_queries)
+    workload_name = os.path.splitext(os.path.basename(workload.RESULTS_FILE))[0]
+    indexes = indexes or (milvus_pipeline.MILVUS_INDEX_TYPES if db_type == "milvus" else WEAVIATE_INDEXES)
+
+    sampler = cgroups.ResourceSampler(cgroups.CONTAINERS[db_type]).start()
+    previous = None     # το τελευταίο index που χτίστηκε επιτυχώς
+    try:
+        for index in indexes:
+            last, previous = previous, None
+            print(f"\n>>> INDEX {db_type} {dim}d {dataset_size} | {index}")
+            build_start = sampler.elapsed()
+            cgroups.mark_phase("build")
+            try:
+                if db_type == "milvus":
+                    handle = milvus_collection(dim)
+                    built = build_milvus(handle, index, dim, workload.METRIC)
+                else:
+                    built = build_weaviate(index, dim, dataset_size, last)
+                    handle = driver.open_backend(db_type, dim)
+            except Exception as e:
+                # π.χ. DISKANN χωρίς queryNode.enableDisk
+                print(f"   [WARN] {index} failed: {e}")
+                continue
+            previous = index
+            query_start = sampler.elapsed()
+            cgroups.mark_phase("query")
+
+            params = None
+            if db_type == "milvus":
+                params = driver.milvus_search_params(index, driver.DEFAULT_EF, driver.DEFAULT_NPROBE)
+            search_fn = driver.make_search_fn(workload, db_type, handle, params)
+            for _ in range(driver.WARMUP_QUERIES): search_fn(queries[:1])
+            recalls = driver.measure_recall(workload, db_type, handle, search_fn, queries, folder, max_idx)
+            tracker = driver.run_closed_loop(search_fn, batches, concurrency,
+                                             max(num_queries, concurrency * driver.MIN_QUERIES_PER_WORKER), sampler)
+            driver.print_stats(f"{db_type} {dim}d {index}", tracker.get_stats())
+
+            build_mem = sampler.summary(since=build_start, until=query_start)
+            query_mem = sampler.summary(since=query_start)
+            extra = {"Workload": workload_name, "Index": index, "Concurrency": concurrency}
+            extra.update(built)
+            extra["Build Peak MEM (MiB)"] = build_mem["Server Peak MEM (MiB)"] if build_mem else ""
+            extra["Query Peak MEM (MiB)"] = query_mem["Server Peak MEM (MiB)"] if query_mem else ""
+            extra.update(recalls)
+            tracker.save_to_csv(RESULTS_FILE, db_type, dim, dataset_size, extra=extra)
+            driver.close_backend(db_type, handle)
+    finally:
+        cgroups.mark_phase("idle")
+        sampler.stop()
+
+    # Τα επόμενα query runs περιμένουν το default HNSW
+    if db_type == "milvus" and previous != "HNSW":
+        print("\n   [Build] Restoring the default HNSW index...")
+        handle = milvus_collection(dim)
+        build_milvus(handle, "HNSW", dim, "L2")
+        handle.release()
+    elif db_type == "weaviate" and previous != "HNSW":
+        print(f"\n   [Note] Weaviate class is left as {previous or 'failed'}; re-run loader_wrapper.py for plain HNSW.")
+    print(f"\n[Result] Index matrix -> {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build each index type on the loaded data and measure build time, memory, disk and recall/QPS")
+    parser.add_argument("db", choices=["milvus", "weaviate"])
+    parser.add_argument("dim", type=int)
+    parser.add_argument("size", choices=SIZE_NAMES)
+    parser.add_argument("--indexes", type=lambda v: v.split(","), default=None,
+                        help=f"Milvus: {','.join(milvus_pipeline.MILVUS_INDEX_TYPES)}; Weaviate: {','.join(WEAVIATE_INDEXES)}")
+    parser.add_argument("--workload", default="query4_pure_l2", help="Module name in src/queries")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=driver.DEFAULT_SEED)
+    parser.add_argument("--dataset", default=None, help="Dataset folder under data/ instead of the exp_* of the dimension")
+    args = parser.parse_args()
+    select_dataset(args.dataset)
+
+    known = milvus_pipeline.MILVUS_INDEX_TYPES if args.db == "milvus" else WEAVIATE_INDEXES
+    unknown = set(args.indexes or []) - set(known)
+    if unknown:
+        parser.error(f"Unknown {args.db} indexes: {', '.join(sorted(unknown))}")
+    workload = importlib.import_module(f"src.queries.{args.workload}")
+    run_matrix(workload, args.db, args.dim, args.size, args.indexes, args.queries, args.concurrency, args.seed)
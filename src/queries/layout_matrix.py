@@ -0,0 +1,137 @@
+import argparse
+import importlib
+import time
+import sys
+import os
+
+# --- PATH CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../../"))
+sys.path.append(PROJECT_ROOT)
+from src.queries import driver
+from src.queries.index_matrix import milvus_loaded_size, mib
+from src.ingestion import loader_wrapper
+from src.utils import cgroups
+from src.utils.layouts import ENGINE_LAYOUTS, PARTITION_SWEEP, CITIES, select_layout
+from src.utils.sizes import SIZE_NAMES
+from src.utils.dataset import select_dataset
+
+# --- CONFIGURATION ---
+# Layout stage: τα filtered workloads (φίλτρο city_id) πάνω σε flat collection / class και σε κάθε layout
+# του src/utils/layouts.py για κάθε αριθμό partitions, με τα ίδια queries και το ίδιο ground truth.
+#   Milvus:   flat, pkey (partition key, routing από τον server), partitions (partition_names ανά query)
+#   Weaviate: flat, tenants (ένας tenant ανά bucket, with_tenant ανά query)
+# Κάθε layout φορτώνεται από την αρχή (δικό του collection / class). Τα ποσοστά είναι έναντι του flat.
+DEFAULT_WORKLOADS = ["query1_city", "query3_combined"]
+
+RESULTS_FILE = os.path.join(PROJECT_ROOT, "results/sweeps/layout_matrix.csv")
+
+
+def parse_counts(value):
+    """'sweep' -> PARTITION_SWEEP, '16,1000' -> [16, 1000]"""
+    if value == "sweep":
+        return list(PARTITION_SWEEP)
+    counts = [int(v) for v in value.split(",") if v]
+    if any(not 1 <= n <= CITIES for n in counts):
+        raise argparse.ArgumentTypeError(f"Partition counts must be between 1 and {CITIES}")
+    return counts
+
+
+def layout_runs(db_type, kinds, counts):
+    """[(kind, partitions)]: flat πρώτο (baseline των ποσοστών), μετά κάθε layout με κάθε αριθμό partitions."""
+    kinds = [k for k in ENGINE_LAYOUTS[db_type] if k in kinds and k != "flat"]
+    return [("flat", 0)] + [(kind, n) for kind in kinds for n in counts]
+
+
+def run_matrix(workloads, db_type, dim, dataset_size, kinds=None, counts=None, num_queries=100,
+               concurrency=1, seed=driver.DEFAULT_SEED):
+    folder = driver.dataset_folder(dim)
+    dataset = driver.load_dataset(folder)
+    dataset.check_dim(dim)
+    max_idx = dataset.size_rows(dataset_size)
+    query_sets = {w: driver.workload_queries(w, dataset, max_idx, num_queries, seed)[0] for w in workloads}
+    runs = layout_runs(db_type, kinds or ENGINE_LAYOUTS[db_type], counts or PARTITION_SWEEP)
+
+    sampler = cgroups.ResourceSampler(cgroups.CONTAINERS[db_type]).start()
+    baselines = {}
+    try:
+        for kind, partitions in runs:
+            label = kind if kind == "flat" else f"{kind}:{partitions}"
+            print(f"\n>>> LAYOUT {db_type} {dim}d {dataset_size} | {label}")
+            select_layout(kind, partitions)
+            cgroups.mark_phase("build")
+            try:
+                t0 = time.perf_counter()
+                loader_wrapper.load_data(db_type, dim, dataset_size)
+                load_seconds = time.perf_counter() - t0
+                handle = driver.open_backend(db_type, dim)
+            except (Exception, SystemExit) as e:
+                print(f"   [WARN] {label} failed: {e}")
+                continue
+            memory = mib(milvus_loaded_size(handle)) if db_type == "milvus" else ""
+
+            search_params = None
+            if db_type == "milvus":
+                search_params = driver.milvus_search_params(driver.milvus_index_type(handle), driver.DEFAULT_EF, driver.DEFAULT_NPROBE)
+            for workload in workloads:
+                workload_name = driver.query_set_name(workload)
+                queries = query_sets[workload]
+                cgroups.mark_phase("query")
+                search_fn = driver.make_search_fn(workload, db_type, handle, search_params)
+                batches = driver.make_batches(queries, 1, num_queries)
+                for _ in range(driver.WARMUP_QUERIES): search_fn(queries[:1])
+                recalls = driver.measure_recall(workload, db_type, handle, search_fn, queries, folder, max_idx)
+                tracker = driver.run_closed_loop(search_fn, batches, concurrency,
+                                                 max(num_queries, concurrency * driver.MIN_QUERIES_PER_WORKER), sampler)
+                stats = tracker.get_stats()
+                driver.print_stats(f"{db_type} {dim}d {workload_name} {label}", stats)
+
+                extra = {"Workload": workload_name, "Layout": kind, "Partitions": partitions or "",
+                         "Concurrency": concurrency, "Load (s)": round(load_seconds, 2), "Memory (MiB)": memory}
+                extra.update(recalls)
+                if kind == "flat":
+                    baselines[workload_name] = stats
+                baseline = baselines.get(workload_name)
+                if baseline:
+                    extra["P50 vs flat (%)"] = round(100 * stats["P50 Latency (s)"] / baseline["P50 Latency (s)"], 1) \
+                        if baseline["P50 Latency (s)"] else ""
+                    extra["QPS vs flat (%)"] = round(100 * stats["Throughput (QPS)"] / baseline["Throughput (QPS)"], 1) \
+                        if baseline["Throughput (QPS)"] else ""
+                tracker.save_to_csv(RESULTS_FILE, db_type, dim, dataset_size, extra=extra)
+            driver.close_backend(db_type, handle)
+    finally:
+        select_layout("flat")
+        cgroups.mark_phase("idle")
+        sampler.stop()
+
+    print(f"\n[Result] Layout matrix -> {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare flat filtered search with partition-key / partitions (Milvus) "
+                                                 "and multi-tenant (Weaviate) layouts routed by city")
+    parser.add_argument("db", choices=["milvus", "weaviate"])
+    parser.add_argument("dim", type=int)
+    parser.add_argument("size", choices=SIZE_NAMES)
+    parser.add_argument("--layouts", type=lambda v: v.split(","), default=None,
+                        help="Milvus: pkey,partitions; Weaviate: tenants (default: all of the engine)")
+    parser.add_argument("--partitions", type=parse_counts, default=list(PARTITION_SWEEP),
+                        help=f"Comma separated partition counts or 'sweep' for {','.join(map(str, PARTITION_SWEEP))}")
+    parser.add_argument("--workloads", type=lambda v: v.split(","), default=list(DEFAULT_WORKLOADS),
+                        help="Module names in src/queries with a partition_key")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=driver.DEFAULT_SEED)
+    parser.add_argument("--dataset", default=None, help="Dataset folder under data/ instead of the exp_* of the dimension")
+    args = parser.parse_args()
+    select_dataset(args.dataset)
+
+    unknown = set(args.layouts or []) - set(ENGINE_LAYOUTS[args.db])
+    if unknown:
+        parser.error(f"Unknown {args.db} layouts: {', '.join(sorted(unknown))}")
+    workloads = [importlib.import_module(f"src.queries.{name}") for name in args.workloads]
+    unrouted = [w.__name__ for w in workloads if not hasattr(w, "partition_key")]
+    if unrouted:
+        parser.error(f"Workloads without partition_key: {', '.join(unrouted)}")
+    run_matrix(workloads, args.db, args.dim, args.size, args.layouts, args.partitions, args.queries,
+               args.concurrency, args.seed)
@@ -0,0 +1,488 @@
+import argparse
+import importlib
+import threading
+import time
+import sys
+import os
+import numpy as np
+from pymilvus import connections, Collection, utility
+
+# --- PATH CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../../"))
+sys.path.append(PROJECT_ROOT)
+from src.queries import driver, query4_pure_l2
+from src.ingestion import weaviate_importer
+from src.utils import cgroups
+from src.utils.dataset import select_dataset
+from src.utils.histogram import LatencyHistogram
+from src.utils.metrics import append_row
+from src.utils.payloads import SELECTIVITY_COLUMNS
+from src.utils.sizes import SIZE_NAMES
+
+# Mixed read/write: ένα query workload τρέχει (closed loop) ενώ ένας writer στέλνει inserts / upserts / deletes.
+#   read_only:  baseline χωρίς writes
+#   mixed:      reads + writes + freshness probes (+ segment snapshots της Milvus)
+#   compaction: (Milvus, --compact) flush + col.compact() μετά τα writes, με reads όσο τρέχει
+# Οι writes αγγίζουν μόνο νέα ids (>= dataset.rows), οπότε οι γραμμές του size, τα query sets και το
+# ground truth μένουν ίδια. Στο τέλος τα νέα ids σβήνονται.
+
+# --- CONFIGURATION ---
+RESULTS_FILE = "results/stats/mixed_workload.csv"
+SEGMENTS_FILE = "results/stats/mixed_segments.csv"
+DEFAULT_MIX = {"insert": 0.6, "upsert": 0.3, "delete": 0.1}
+WRITE_BATCH = 100               # γραμμές ανά write request
+DEFAULT_WRITE_RATE = 1000.0     # offered γραμμές / sec
+DEFAULT_DURATION = 30.0         # sec ανά φάση
+FRESHNESS_INTERVAL = 0.5        # sec ανάμεσα σε δύο probes
+FRESHNESS_POLL = 0.005          # sec ανάμεσα στα searches ενός probe
+FRESHNESS_TIMEOUT = 30.0
+SEGMENT_INTERVAL = 1.0
+PERTURBATION = 0.01             # θόρυβος (ως ποσοστό του μέσου |x|) όταν τα νέα vectors είναι αντίγραφα
+CLEANUP_BATCH = 1000
+MILVUS_WRITER = "mixed_writer"
+# Τα πεδία μετά τα id / vector, στη σειρά του schema της Milvus και ως properties της Weaviate
+PAYLOAD_FIELDS = ["city_id", "quality_score"] + SELECTIVITY_COLUMNS
+# QuerySegmentInfo.state (common.SegmentState): 2 = Growing, 3 / 4 / 5 = Sealed / Flushed / Flushing
+SEGMENT_GROWING = 2
+
+
+def parse_mix(value):
+    """'insert=0.6,upsert=0.3,delete=0.1' -> {op: πιθανότητα}, κανονικοποιημένο σε άθροισμα 1."""
+    mix = {}
+    for item in value.split(","):
+        op, _, weight = item.partition("=")
+        if op not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown write op '{op}' (known: {', '.join(DEFAULT_MIX)})")
+        mix[op] = float(weight)
+    total = sum(mix.values())
+    if total <= 0:
+        raise argparse.ArgumentTypeError("Write mix weights must add up to more than 0")
+    return {op: weight / total for op, weight in mix.items() if weight > 0}
+
+
+def mix_label(mix):
+    return "/".join(f"{op}={weight:g}" for op, weight in mix.items())
+
+
+class RowSource:
+    """Ids, vectors και payloads για νέες γραμμές. Τα vectors είναι γραμμές του dataset πέρα από το size
+    (ίδια κατανομή, όχι duplicates), αλλιώς γραμμές του size με λίγο θόρυβο."""
+
+    def __init__(self, dataset, max_idx, seed=driver.DEFAULT_SEED):
+        self.vectors = dataset.vectors()
+        self.payloads = dataset.payloads(PAYLOAD_FIELDS)
+        self.max_idx = max_idx
+        self.spare = dataset.rows - max_idx
+        self.base_id = self.next_id = dataset.rows
+        self._cursor = 0
+        self._rng = np.random.default_rng([seed, 0x3D1])
+        self._lock = threading.Lock()
+
+    def allocate(self, count):
+        with self._lock:
+            start, self.next_id = self.next_id, self.next_id + count
+        return np.arange(start, start + count, dtype=np.int64)
+
+    def rows(self, count):
+        """(vectors (count, dim) float32, {πεδίο: count τιμές})"""
+        with self._lock:
+            k = np.arange(self._cursor, self._cursor + count)
+            self._cursor += count
+            noise = None if self.spare > 0 else self._rng.standard_normal((count, self.vectors.shape[1]), dtype=np.float32)
+        src = self.max_idx + k % self.spare if self.spare > 0 else k % self.max_idx
+        vectors = np.stack([np.asarray(self.vectors[int(r)], dtype=np.float32) for r in src])
+        if noise is not None:
+            vectors += noise * PERTURBATION * np.abs(vectors).mean()
+        return vectors, {name: np.asarray(self.payloads[name][src]) for name in PAYLOAD_FIELDS}
+
+
+class LiveIds:
+    """Τα ids που έχει γράψει το workload και υπάρχουν ακόμα: στόχοι των upserts / deletes."""
+
+    def __init__(self):
+        self._ids = []
+        self._lock = threading.Lock()
+
+    def add(self, ids):
+        with self._lock:
+            self._ids.extend(int(i) for i in ids)
+
+    def sample(self, rng, count):
+        with self._lock:
+            if not self._ids:
+                return np.empty(0, dtype=np.int64)
+            picks = rng.choice(len(self._ids), size=min(count, len(self._ids)), replace=False)
+            return np.asarray([self._ids[j] for j in picks], dtype=np.int64)
+
+    def remove(self, ids):
+        drop = set(int(i) for i in ids)
+        with self._lock:
+            self._ids = [i for i in self._ids if i not in drop]
+
+    def all(self):
+        with self._lock:
+            return list(self._ids)
+
+
+class MilvusWriter:
+    """col.insert / col.upsert / col.delete με δικό του connection alias (ξεχωριστό κανάλι από τα reads)."""
+
+    def __init__(self, collection_name):
+        connections.connect(MILVUS_WRITER, **driver.MILVUS_CONFIG)
+        self.col = Collection(collection_name, using=MILVUS_WRITER)
+
+    def write(self, op, ids, vectors, columns):
+        getattr(self.col, op)([ids, vectors] + [columns[name] for name in PAYLOAD_FIELDS])
+
+    def delete(self, ids):
+        self.col.delete(f"id in {[int(i) for i in ids]}")
+
+    def delete_from(self, base_id):
+        self.col.delete(f"id >= {base_id}")
+
+    def close(self):
+        connections.disconnect(MILVUS_WRITER)
+
+
+class WeaviateWriter:
+    """/v1/batch/objects: POST για insert / upsert (ίδιο UUID = overwrite), DELETE με where στο id."""
+
+    def __init__(self, class_name):
+        self.class_name = class_name
+
+    def write(self, op, ids, vectors, columns):
+        weaviate_importer.write_objects(self.class_name, ids, vectors, columns, url=driver.WEAVIATE_URL)
+
+    def delete(self, ids):
+        weaviate_importer.delete_objects(self.class_name, ids, url=driver.WEAVIATE_URL)
+
+    def close(self):
+        pass
+
+
+class WriteLoad:
+    """Ένα thread που στέλνει write requests των WRITE_BATCH γραμμών με offered ρυθμό rate γραμμές/sec.
+    Αν η βάση δεν προλαβαίνει, ο ρυθμός πέφτει (δεν γίνεται catch-up): το Write Throughput είναι ό,τι πέτυχε.
+    Upserts / deletes διαλέγουν ids από όσα έχει γράψει το workload, αλλιώς γίνονται insert."""
+
+    def __init__(self, writer, source, live, mix, rate, seed=driver.DEFAULT_SEED):
+        self.writer = writer
+        self.source = source
+        self.live = live
+        self.ops, self.weights = list(mix), list(mix.values())
+        self.interval = WRITE_BATCH / rate
+        self.rng = np.random.default_rng([seed, 0x3D2])
+        self.latency = {op: LatencyHistogram() for op in DEFAULT_MIX}
+        self.rows = {op: 0 for op in DEFAULT_MIX}
+        self.errors = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _write(self, op):
+        if op != "insert":
+            ids = self.live.sample(self.rng, WRITE_BATCH)
+            if len(ids) == 0:
+                op = "insert"
+        if op == "insert":
+            ids = self.source.allocate(WRITE_BATCH)
+        t0 = time.perf_counter()
+        if op == "delete":
+            self.writer.delete(ids)
+            self.live.remove(ids)
+        else:
+            vectors, columns = self.source.rows(len(ids))
+            t0 = time.perf_counter()
+            self.writer.write(op, ids, vectors, columns)
+        self.latency[op].record(time.perf_counter() - t0)
+        self.rows[op] += len(ids)
+        if op == "insert":
+            self.live.add(ids)
+
+    def _run(self):
+        t0 = time.perf_counter()
+        next_send = t0
+        while not self._stop.wait(max(0.0, next_send - time.perf_counter())):
+            try:
+                self._write(self.rng.choice(self.ops, p=self.weights))
+            except Exception as e:
+                self.errors += 1
+                if self.errors == 1:
+                    print(f"   [WARN] Write failed: {e}")
+            # Τα slots που χάθηκαν σε ένα αργό write δεν ξαναστέλνονται μαζεμένα
+            next_send = max(next_send + self.interval, time.perf_counter())
+        self.elapsed = time.perf_counter() - t0
+
+    def stats(self):
+        written = sum(self.rows.values())
+        stats = {"Write Throughput (rows/s)": round(written / self.elapsed, 1) if self.elapsed else 0,
+                 "Write Errors": self.errors}
+        for op, hist in self.latency.items():
+            if hist.count:
+                label = op.capitalize()
+                stats[f"{label} Rows"] = self.rows[op]
+                stats[f"{label} P50 (s)"] = round(hist.percentile(50), 5)
+                stats[f"{label} P99 (s)"] = round(hist.percentile(99), 5)
+        return stats
+
+
+class FreshnessProbe:
+    """Κάθε FRESHNESS_INTERVAL γράφει μία νέα γραμμή και ψάχνει το ίδιο της το vector (unfiltered, limit 10)
+    μέχρι να εμφανιστεί το id της. Lag = από την επιβεβαίωση του insert μέχρι το πρώτο search που το βρίσκει.
+    Η Milvus ψάχνει με το consistency level του collection (default Bounded), οπότε το lag το περιλαμβάνει."""
+
+    def __init__(self, writer, source, live, search_fn):
+        self.writer = writer
+        self.source = source
+        self.live = live
+        self.search_fn = search_fn
+        self.lag = LatencyHistogram()
+        self.timeouts = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _probe(self):
+        ids = self.source.allocate(1)
+        vectors, columns = self.source.rows(1)
+        self.writer.write("insert", ids, vectors, columns)
+        acked = time.perf_counter()
+        query = [(vectors[0].tolist(),)]
+        try:
+            while not self._stop.is_set():
+                if int(ids[0]) in self.search_fn(query, 10)[0]:
+                    self.lag.record(time.perf_counter() - acked)
+                    return
+                if time.perf_counter() - acked > FRESHNESS_TIMEOUT:
+                    self.timeouts += 1
+                    return
+                time.sleep(FRESHNESS_POLL)
+        finally:
+            # Μόνο μετά το probe: ο writer δεν πρέπει να σβήσει το id πριν βρεθεί
+            self.live.add(ids)
+
+    def _run(self):
+        while not self._stop.wait(FRESHNESS_INTERVAL):
+            try:
+                self._probe()
+            except Exception as e:
+                print(f"   [WARN] Freshness probe failed: {e}")
+
+    def stats(self):
+        lag = self.lag
+        return {"Freshness P50 (s)": round(lag.percentile(50), 4) if lag.count else "",
+                "Freshness P99 (s)": round(lag.percentile(99), 4) if lag.count else "",
+                "Freshness Max (s)": round(lag.max, 4) if lag.count else "",
+                "Freshness Probes": lag.count + self.timeouts, "Freshness Timeouts": self.timeouts}
+
+
+class SegmentMonitor:
+    """Growing / sealed segments του collection στους query nodes ανά SEGMENT_INTERVAL, με τη φάση."""
+
+    def __init__(self, collection_name):
+        self.collection_name = collection_name
+        self.phase = None
+        self.snapshots = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._t0 = time.perf_counter()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            try:
+                segments = utility.get_query_segment_info(self.collection_name)
+            except Exception:
+                segments = None
+            if segments is not None:
+                snapshot = {"Time (s)": round(time.perf_counter() - self._t0, 2), "Phase": self.phase}
+                growing = [s for s in segments if s.state == SEGMENT_GROWING]
+                sealed = [s for s in segments if s.state != SEGMENT_GROWING]
+                snapshot.update({"Growing Segments": len(growing), "Growing Rows": sum(s.num_rows for s in growing),
+                                 "Sealed Segments": len(sealed), "Sealed Rows": sum(s.num_rows for s in sealed)})
+                self.snapshots.append(snapshot)
+            if self._stop.wait(SEGMENT_INTERVAL):
+                return
+
+    def stats(self, phase):
+        snapshots = [s for s in self.snapshots if s["Phase"] == phase]
+        if not snapshots:
+            return {}
+        return {"Growing Segments (max)": max(s["Growing Segments"] for s in snapshots),
+                "Sealed Segments (end)": snapshots[-1]["Sealed Segments"]}
+
+    def save(self, db_type, dim, dataset_size):
+        path = os.path.join(PROJECT_ROOT, SEGMENTS_FILE)
+        for snapshot in self.snapshots:
+            append_row(path, dict({"Database": db_type, "Dimension": dim, "Dataset_Size": dataset_size}, **snapshot))
+
+
+def deltas(stats, baseline):
+    """Μεταβολή (%) έναντι του read-only baseline."""
+    if not stats or not baseline:
+        return {}
+    change = lambda key: round(100 * (stats[key] / baseline[key] - 1), 1) if baseline[key] else ""
+    return {"P50 Delta (%)": change("P50 Latency (s)"), "P99 Delta (%)": change("P99 Latency (s)"),
+            "QPS Delta (%)": change("Throughput (QPS)")}
+
+
+def cleanup(db_type, writer, source, live):
+    """Σβήνει ό,τι έγραψε το workload. Η Milvus με ένα range delete, η Weaviate ανά CLEANUP_BATCH ids."""
+    if db_type == "milvus":
+        writer.delete_from(source.base_id)
+        return
+    ids = live.all()
+    for start in range(0, len(ids), CLEANUP_BATCH):
+        writer.delete(np.asarray(ids[start:start + CLEANUP_BATCH], dtype=np.int64))
+
+
+def run_mixed(workload, db_type, dim, dataset_size, concurrency=8, duration=DEFAULT_DURATION, write_rate=DEFAULT_WRITE_RATE,
+              mix=None, compact=False, num_queries=100, seed=driver.DEFAULT_SEED, ef=None, nprobe=driver.DEFAULT_NPROBE):
+    mix = mix or dict(DEFAULT_MIX)
+    folder = driver.dataset_folder(dim)
+    dataset = driver.load_dataset(folder)
+    dataset.check_dim(dim)
+    max_idx = dataset.size_rows(dataset_size)
+    queries, _ = driver.workload_queries(workload, dataset, max_idx, num_queries, seed)
+    batches = driver.make_batches(queries, 1, num_queries)
+
+    handle = driver.open_backend(db_type, dim)
+    params = None
+    if db_type == "milvus":
+        params = driver.milvus_search_params(driver.milvus_index_type(handle), ef or driver.DEFAULT_EF, nprobe)
+    elif ef is not None:
+        driver.set_weaviate_ef(handle.client, handle.class_name, ef)
+    search_fn = driver.make_search_fn(workload, db_type, handle, params)
+    probe_fn = driver.make_search_fn(query4_pure_l2, db_type, handle, params)
+
+    source = RowSource(dataset, max_idx, seed)
+    live = LiveIds()
+    writer = MilvusWriter(handle.name) if db_type == "milvus" else WeaviateWriter(handle.class_name)
+    segments = SegmentMonitor(handle.name).start() if db_type == "milvus" else None
+    containers = cgroups.CONTAINERS[db_type]
+    sampler = cgroups.ResourceSampler(containers, output=cgroups.resources_file("mixed", db_type, dim, dataset_size) if containers else None).start()
+    results_file = os.path.join(PROJECT_ROOT, RESULTS_FILE)
+    common = {"Workload": driver.query_set_name(workload), "Concurrency": concurrency,
+              "Write Mix": mix_label(mix), "Offered Write Rate (rows/s)": write_rate}
+
+    def phase(name):
+        cgroups.mark_phase(name)
+        if segments:
+            segments.phase = name
+        print(f"\n>>> MIXED {db_type} {dim}d {dataset_size} | {name}")
+
+    def read_phase(name, extra):
+        tracker = driver.run_closed_loop(search_fn, batches, concurrency, resources=sampler, duration=duration)
+        stats = tracker.get_stats()
+        driver.print_stats(name, stats)
+        if segments:
+            extra.update(segments.stats(name))
+        tracker.save_to_csv(results_file, db_type, dim, dataset_size, extra=dict(common, Phase=name, **extra))
+        return stats
+
+    try:
+        for _ in range(driver.WARMUP_QUERIES): search_fn(queries[:1])
+        phase("read_only")
+        baseline = read_phase("read_only", {})
+
+        phase("mixed")
+        load = WriteLoad(writer, source, live, mix, write_rate, seed).start()
+        probe = FreshnessProbe(writer, source, live, probe_fn).start()
+        tracker = driver.run_closed_loop(search_fn, batches, concurrency, resources=sampler, duration=duration)
+        load.stop()
+        probe.stop()
+        stats = tracker.get_stats()
+        driver.print_stats("mixed", stats)
+        extra = dict(load.stats(), **probe.stats())
+        print(f"   [Writes] {extra['Write Throughput (rows/s)']} rows/s, freshness p50={extra['Freshness P50 (s)']}s "
+              f"p99={extra['Freshness P99 (s)']}s, {extra['Freshness Timeouts']} timeouts")
+        extra.update(deltas(stats, baseline))
+        if segments:
+            extra.update(segments.stats("mixed"))
+        tracker.save_to_csv(results_file, db_type, dim, dataset_size, extra=dict(common, Phase="mixed", **extra))
+
+        if compact and db_type == "milvus":
+            # Flush: οι growing segments γίνονται sealed. Μετά compaction (deletes / upserts -> tombstones) με reads
+            phase("flush")
+            t0 = time.perf_counter()
+            handle.flush()
+            flush_time = time.perf_counter() - t0
+            phase("compaction")
+            done = {}
+
+            def compaction():
+                t1 = time.perf_counter()
+                handle.compact()
+                handle.wait_for_compaction_completed()
+                done["seconds"] = time.perf_counter() - t1
+
+            worker = threading.Thread(target=compaction, daemon=True)
+            worker.start()
+            tracker = driver.run_closed_loop(search_fn, batches, concurrency, resources=sampler, duration=duration)
+            worker.join()
+            stats = tracker.get_stats()
+            driver.print_stats("compaction", stats)
+            extra = {"Flush Time (s)": round(flush_time, 2), "Compaction Time (s)": round(done.get("seconds", 0.0), 2)}
+            extra.update(deltas(stats, baseline))
+            if segments:
+                extra.update(segments.stats("compaction"))
+            tracker.save_to_csv(results_file, db_type, dim, dataset_size, extra=dict(common, Phase="compaction", **extra))
+        elif compact:
+            print("   [Note] Weaviate compacts its LSM stores on its own; --compact only applies to Milvus.")
+    finally:
+        cgroups.mark_phase("idle")
+        if segments:
+            segments.stop()
+            segments.save(db_type, dim, dataset_size)
+        sampler.stop()
+        cleanup(db_type, writer, source, live)
+        writer.close()
+        driver.close_backend(db_type, handle)
+    print(f"\n[Result] Mixed workload -> {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Queries alongside inserts / upserts / deletes: latency degradation, "
+                                                 "write throughput, freshness lag and compaction")
+    parser.add_argument("db", choices=["milvus", "weaviate"])
+    parser.add_argument("dim", type=int)
+    parser.add_argument("size", choices=SIZE_NAMES)
+    parser.add_argument("--workload", default="query4_pure_l2", help="Module name in src/queries")
+    parser.add_argument("--concurrency", type=int, default=8, help="Query workers")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="Seconds per phase")
+    parser.add_argument("--write-rate", type=float, default=DEFAULT_WRITE_RATE, help="Offered write load in rows/s")
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+                        help="Write op weights, e.g. insert=0.6,upsert=0.3,delete=0.1")
+    parser.add_argument("--compact", action="store_true", help="Milvus: flush + compact after the writes, with queries running")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=driver.DEFAULT_SEED)
+    parser.add_argument("--ef", type=int, default=None)
+    parser.add_argument("--dataset", default=None, help="Dataset folder under data/ instead of the exp_* of the dimension")
+    args = parser.parse_args()
+    select_dataset(args.dataset)
+    workload = importlib.import_module(f"src.queries.{args.workload}")
+    run_mixed(workload, args.db, args.dim, args.size, args.concurrency, args.duration, args.write_rate,
+              args.mix, args.compact, args.queries, args.seed, args.ef)
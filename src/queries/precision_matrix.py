@@ -0,0 +1,204 @@
+import argparse
+import importlib
+import sys
+import os
+import numpy as np
+from pymilvus import connections, Collection
+
+# --- PATH CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../../"))
+sys.path.append(PROJECT_ROOT)
+from src.queries import driver
+from src.queries.index_matrix import build_weaviate, milvus_loaded_size, mib
+from src.ingestion import loader_wrapper, milvus_pipeline
+from src.utils import cgroups
+from src.utils.precision import PRECISIONS, vector_bytes
+from src.utils.sizes import SIZE_NAMES
+from src.utils.dataset import collection_name, select_dataset
+
+# --- CONFIGURATION ---
+# Precision stage: τα ίδια δεδομένα σε κάθε precision variant (src/utils/precision.py), με μνήμη, QPS
+# και recall έναντι του float32 ground truth.
+#   Milvus:   ένα collection ανά variant (benchmark_<dim>d_<precision>), FLOAT16 / BFLOAT16 με HNSW,
+#             int8 = FLOAT_VECTOR + IVF_SQ8, binary = BINARY_VECTOR + BIN_IVF_FLAT με HAMMING και JACCARD
+#   Weaviate: ένα class που ξαναφορτώνεται ανά variant: float32 HNSW, int8 -> SQ, pq -> PQ, binary -> BQ
+#   local:    exact search πάνω στα codes, δηλαδή μόνο η απώλεια της κωδικοποίησης, χωρίς index
+WEAVIATE_VARIANTS = {"float32": "HNSW", "int8": "HNSW+SQ", "pq": "HNSW+PQ", "binary": "HNSW+BQ"}
+VARIANTS = {"milvus": PRECISIONS, "weaviate": list(WEAVIATE_VARIANTS), "local": PRECISIONS}
+
+RESULTS_FILE = os.path.join(PROJECT_ROOT, "results/sweeps/precision_matrix.csv")
+
+
+class PrecisionWorkload:
+    """Ένα query*.py module με το metric ενός variant (HAMMING / JACCARD για binary)."""
+
+    def __init__(self, workload, metric):
+        self._workload = workload
+        self.METRIC = metric
+
+    def __getattr__(self, name):
+        return getattr(self._workload, name)
+
+
+def variant_runs(db_type, variants, binary_metrics, metric):
+    """[(variant, metric)]: float32 πρώτο (baseline των ποσοστών), binary μία φορά ανά binary metric.
+    Το local κάνει το binary μόνο με Hamming (L2 πάνω σε ±1)."""
+    variants = sorted(variants, key=VARIANTS[db_type].index)
+    runs = []
+    for variant in variants:
+        if variant == "binary" and db_type == "milvus":
+            runs += [(variant, m) for m in binary_metrics]
+        elif variant == "binary" and db_type == "local":
+            runs.append((variant, "HAMMING"))
+        else:
+            runs.append((variant, metric))
+    return runs
+
+
+def variant_bytes(variant, dim):
+    """Bytes ανά vector στη μνήμη του index (PQ: ένα byte ανά segment)."""
+    if variant == "pq":
+        return min(256, dim // 4)
+    return vector_bytes(variant, dim)
+
+
+def prepare_milvus(dim, dataset_size, precision, metric):
+    """Φορτώνει το collection του variant (growth mode: ένα ήδη φορτωμένο collection μένει) και ξαναχτίζει
+    το vector index αν είναι για άλλο metric (HAMMING <-> JACCARD). Επιστρέφει το index type."""
+    loader_wrapper.load_data("milvus", dim, dataset_size, append=True, precision=precision)
+    connections.connect("default", **driver.MILVUS_CONFIG)
+    col = Collection(collection_name(dim, precision))
+    index = next(i for i in col.indexes if i.field_name == "vector")
+    if index.params.get("metric_type") != metric:
+        index_type, params, _ = milvus_pipeline.precision_index(precision, dim, metric)
+        print(f"   [Build] {index_type} {metric}...")
+        milvus_pipeline.build_vector_index(col, index_type, params, metric)
+    return driver.milvus_index_type(col)
+
+
+def encode_queries(db_type, precision, queries, params):
+    """Η Milvus θέλει τα queries στον τύπο του vector πεδίου. Το local τα κωδικοποιεί μόνο του
+    και η Weaviate κάνει το compression στον server."""
+    if db_type != "milvus":
+        return queries
+    vectors = milvus_pipeline.milvus_query_vectors(precision, np.asarray([q[0] for q in queries], dtype=np.float32), params)
+    return [(v, *q[1:]) for v, q in zip(vectors, queries)]
+
+
+def run_matrix(workload, db_type, dim, dataset_size, variants=None, binary_metrics=None, num_queries=100,
+               concurrency=1, seed=driver.DEFAULT_SEED):
+    folder = driver.dataset_folder(dim)
+    dataset = driver.load_dataset(folder)
+    dataset.check_dim(dim)
+    max_idx = dataset.size_rows(dataset_size)
+    queries, _ = driver.workload_queries(workload, dataset, max_idx, num_queries, seed)
+    workload_name = driver.query_set_name(workload)
+    runs = variant_runs(db_type, variants or VARIANTS[db_type], binary_metrics or milvus_pipeline.BINARY_METRICS, workload.METRIC)
+    missing = {v for v, _ in runs if v in PRECISIONS and db_type != "weaviate"} - set(dataset.precisions)
+    if missing:
+        print(f"[Error] {dataset.name} has no {', '.join(sorted(missing))} vectors: run src/generators/convert_precision.py {dim}")
+        return
+    params = dataset.precision_params()
+    if db_type == "local":
+        loader_wrapper.load_data("local", dim, dataset_size)
+
+    sampler = cgroups.ResourceSampler(cgroups.CONTAINERS[db_type]).start()
+    baseline = None
+    previous = None     # Weaviate: το τελευταίο index που χτίστηκε επιτυχώς
+    try:
+        for variant, metric in runs:
+            print(f"\n>>> PRECISION {db_type} {dim}d {dataset_size} | {variant} {metric}")
+            cgroups.mark_phase("build")
+            try:
+                if db_type == "milvus":
+                    index = prepare_milvus(dim, dataset_size, variant, metric)
+                    handle = driver.open_backend(db_type, dim, variant)
+                elif db_type == "weaviate":
+                    index = WEAVIATE_VARIANTS[variant]
+                    last, previous = previous, None
+                    build_weaviate(index, dim, dataset_size, last)
+                    previous = index
+                    handle = driver.open_backend(db_type, dim)
+                else:
+                    index = "exact"
+                    handle = driver.open_backend(db_type, dim, variant)
+            except Exception as e:
+                # π.χ. bfloat16 χωρίς ml_dtypes
+                print(f"   [WARN] {variant} failed: {e}")
+                continue
+            query_start = sampler.elapsed()
+            cgroups.mark_phase("query")
+
+            search_params = None
+            if db_type == "milvus":
+                search_params = driver.milvus_search_params(index, driver.DEFAULT_EF, driver.DEFAULT_NPROBE)
+            search_fn = driver.make_search_fn(PrecisionWorkload(workload, metric), db_type, handle, search_params)
+            encoded = encode_queries(db_type, variant, queries, params)
+            batches = driver.make_batches(encoded, 1, num_queries)
+            for _ in range(driver.WARMUP_QUERIES): search_fn(encoded[:1])
+            # Ground truth πάντα από τα float32 queries με το metric του workload
+            recalls = driver.measure_recall(workload, db_type, handle, search_fn, encoded, folder, max_idx, gt_queries=queries)
+            tracker = driver.run_closed_loop(search_fn, batches, concurrency,
+                                             max(num_queries, concurrency * driver.MIN_QUERIES_PER_WORKER), sampler)
+            stats = tracker.get_stats()
+            driver.print_stats(f"{db_type} {dim}d {variant} {metric}", stats)
+            if not stats:
+                # Κανένα request δεν μετρήθηκε: ούτε γραμμή ούτε float32 baseline για τα ποσοστά
+                driver.close_backend(db_type, handle)
+                continue
+
+            if db_type == "milvus":
+                memory = mib(milvus_loaded_size(handle))
+            elif db_type == "local":
+                memory = mib(max_idx * vector_bytes(variant, dim))
+            else:
+                memory = ""
+            query_mem = sampler.summary(since=query_start)
+            extra = {"Workload": workload_name, "Precision": variant, "Metric": metric, "Index": index,
+                     "Concurrency": concurrency, "Vector Bytes": variant_bytes(variant, dim), "Memory (MiB)": memory,
+                     "Query Peak MEM (MiB)": query_mem["Server Peak MEM (MiB)"] if query_mem else ""}
+            extra.update(recalls)
+            if variant == "float32":
+                baseline = {"memory": memory, "qps": stats["Throughput (QPS)"]}
+            if baseline:
+                extra["Memory vs float32 (%)"] = round(100 * memory / baseline["memory"], 1) if memory and baseline["memory"] else ""
+                extra["QPS vs float32 (%)"] = round(100 * stats["Throughput (QPS)"] / baseline["qps"], 1) if baseline["qps"] else ""
+            tracker.save_to_csv(RESULTS_FILE, db_type, dim, dataset_size, extra=extra)
+            driver.close_backend(db_type, handle)
+    finally:
+        cgroups.mark_phase("idle")
+        sampler.stop()
+
+    if db_type == "weaviate" and previous != "HNSW":
+        print(f"\n   [Note] Weaviate class is left as {previous or 'failed'}; re-run loader_wrapper.py for plain HNSW.")
+    print(f"\n[Result] Precision matrix -> {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare float32 with float16 / bfloat16 / int8 / binary (and Weaviate PQ) "
+                                                 "on memory, QPS and recall against the float32 ground truth")
+    parser.add_argument("db", choices=["milvus", "weaviate", "local"])
+    parser.add_argument("dim", type=int)
+    parser.add_argument("size", choices=SIZE_NAMES)
+    parser.add_argument("--precisions", type=lambda v: v.split(","), default=None,
+                        help=f"Milvus / local: {','.join(PRECISIONS)}; Weaviate: {','.join(WEAVIATE_VARIANTS)}")
+    parser.add_argument("--binary-metrics", type=lambda v: v.split(","), default=list(milvus_pipeline.BINARY_METRICS),
+                        help="Milvus metrics for the binary collection (HAMMING,JACCARD)")
+    parser.add_argument("--workload", default="query4_pure_l2", help="Module name in src/queries")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=driver.DEFAULT_SEED)
+    parser.add_argument("--dataset", default=None, help="Dataset folder under data/ instead of the exp_* of the dimension")
+    args = parser.parse_args()
+    select_dataset(args.dataset)
+
+    unknown = set(args.precisions or []) - set(VARIANTS[args.db])
+    if unknown:
+        parser.error(f"Unknown {args.db} precisions: {', '.join(sorted(unknown))}")
+    unknown = set(args.binary_metrics) - set(milvus_pipeline.BINARY_METRICS)
+    if unknown:
+        parser.error(f"Unknown binary metrics: {', '.join(sorted(unknown))}")
+    workload = importlib.import_module(f"src.queries.{args.workload}")
+    run_matrix(workload, args.db, args.dim, args.size, args.precisions, args.binary_metrics, args.queries,
+               args.concurrency, args.seed)
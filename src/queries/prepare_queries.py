@@ -0,0 +1,51 @@
+import argparse
+import importlib
+import sys
+import os
+
+# --- PATH CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../../"))
+sys.path.append(PROJECT_ROOT)
+from src.queries import driver
+from src.queries.query6_selectivity import SelectivityWorkload, FILTER_KINDS, SELECTIVITY_SWEEP
+from src.utils.dataset import Dataset, select_dataset
+from src.utils.sizes import SIZE_NAMES
+
+# Γράφει μία φορά τα query sets (src/utils/query_sets.py) ενός dataset για όλα τα workloads,
+# πριν από τα runs των βάσεων. Τα query scripts τα φτιάχνουν και μόνα τους την πρώτη φορά που τα χρειάζονται.
+WORKLOADS = ["query1_city", "query2_range", "query3_combined", "query4_pure_l2", "query5_pure_ip"]
+
+
+def prepare(dim, sizes, count, seed=driver.DEFAULT_SEED, selectivity=False):
+    folder = driver.dataset_folder(dim)
+    if not Dataset.exists(folder):
+        print(f"Error: Dataset not found at {folder}")
+        return
+    dataset = driver.load_dataset(folder)
+    dataset.check_dim(dim)
+    workloads = [importlib.import_module(f"src.queries.{name}") for name in WORKLOADS]
+    if selectivity:
+        workloads += [SelectivityWorkload(kind, percent, None) for kind in FILTER_KINDS for percent in SELECTIVITY_SWEEP]
+    for size in sizes:
+        max_idx = dataset.size_rows(size)
+        for workload in workloads:
+            queries, path = driver.workload_queries(workload, dataset, max_idx, count, seed)
+            print(f"   [{size}] {driver.query_set_name(workload)}: {len(queries)} queries in {os.path.relpath(path, PROJECT_ROOT)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the persisted query sets of a dataset")
+    parser.add_argument("dim", type=int)
+    parser.add_argument("--sizes", type=lambda v: v.split(","), default=SIZE_NAMES,
+                        help=f"Comma separated size tiers (default: {','.join(SIZE_NAMES)})")
+    parser.add_argument("--queries", type=int, default=1000, help="Queries per set (runs use the first N they need)")
+    parser.add_argument("--seed", type=int, default=driver.DEFAULT_SEED)
+    parser.add_argument("--selectivity", action="store_true", help="Also the query6 sets of every filter / selectivity")
+    parser.add_argument("--dataset", default=None, help="Dataset folder under data/ instead of the exp_* of the dimension")
+    args = parser.parse_args()
+    unknown = set(args.sizes) - set(SIZE_NAMES)
+    if unknown:
+        parser.error(f"Unknown sizes: {', '.join(sorted(unknown))}")
+    select_dataset(args.dataset)
+    prepare(args.dim, args.sizes, args.queries, args.seed, args.selectivity)
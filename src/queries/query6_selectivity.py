@@ -0,0 +1,174 @@
+import random
+import argparse
+import sys
+import os
+import numpy as np
+
+# --- PATH CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../../"))
+sys.path.append(PROJECT_ROOT)
+from src.queries import driver
+from src.ingestion import milvus_pipeline
+from src.utils.payloads import SELECTIVITY_BUCKETS, SCALAR_INDEXES
+from src.utils.sizes import SIZE_NAMES
+
+# Selectivity sweep πάνω στις στήλες category / sel_bucket / corr_bucket (src/utils/payloads.py).
+# Κάθε φίλτρο είναι "lo <= στήλη < hi", ώστε η selectivity να ρυθμίζεται ακριβώς:
+#   uniform:    sel_bucket στο [0, t * BUCKETS), ασυσχέτιστο με τα vectors
+#   correlated: corr_bucket σε παράθυρο γύρω από το bucket του query (οι γείτονές του περνάνε το φίλτρο)
+#   anti:       corr_bucket σε παράθυρο στην απέναντι άκρη (τα matches είναι σε μακρινά clusters)
+#   zipf:       category == k (μία κατηγορία) ή category < k (οι k-1 πιο συχνές), όποιο είναι πιο κοντά στο t
+RESULTS_FILE = "results/stats/query6_selectivity.csv"
+METRIC = "L2"
+QUERY_PAYLOADS = ["category", "sel_bucket", "corr_bucket"]
+
+FILTER_KINDS = ["uniform", "correlated", "anti", "zipf"]
+# Ποσοστό (%) των γραμμών που περνάνε το φίλτρο
+SELECTIVITY_SWEEP = [0.001, 0.01, 0.1, 1, 10, 50, 90, 99]
+
+
+def parse_percent(value):
+    """'sweep' -> SELECTIVITY_SWEEP, '0.01,1,50' -> [0.01, 1.0, 50.0]"""
+    if value == "sweep":
+        return list(SELECTIVITY_SWEEP)
+    return [float(v) for v in value.split(",") if v]
+
+
+class SelectivityWorkload:
+    """Ένα σημείο του sweep (είδος φίλτρου, target selectivity) με το interface των query*.py modules.
+    Τα queries είναι (vector, στήλη, lo, hi)."""
+    RESULTS_FILE = RESULTS_FILE
+    METRIC = METRIC
+    QUERY_PAYLOADS = QUERY_PAYLOADS
+
+    def __init__(self, kind, percent, scalar_index):
+        self.kind = kind
+        self.percent = percent
+        self.scalar_index = scalar_index
+        self.column = "category" if kind == "zipf" else "sel_bucket" if kind == "uniform" else "corr_bucket"
+        self.WEAVIATE_PROPERTIES = [self.column]
+        # Ένα persisted query set ανά σημείο του sweep (driver.workload_queries)
+        self.QUERY_SET_NAME = f"query6_{kind}_{percent:g}pct"
+        self.selectivity = None
+
+    def _window(self, bucket):
+        width = max(1, round(self.percent / 100 * SELECTIVITY_BUCKETS))
+        if self.kind == "uniform":
+            return 0, width
+        if self.kind == "correlated":
+            lo = min(max(0, bucket - width // 2), SELECTIVITY_BUCKETS - width)
+            return lo, lo + width
+        # anti: στην άκρη που απέχει περισσότερο από το bucket του query
+        return (SELECTIVITY_BUCKETS - width, SELECTIVITY_BUCKETS) if bucket < SELECTIVITY_BUCKETS // 2 else (0, width)
+
+    def _zipf_filter(self, categories):
+        """Η κατηγορία ή το prefix κατηγοριών με share πιο κοντά (σε log) στο target."""
+        share = np.bincount(categories, minlength=2)[1:] / len(categories)
+        candidates = [(k, k + 1, s) for k, s in enumerate(share, 1) if s > 0]
+        candidates += [(1, k + 1, s) for k, s in enumerate(np.cumsum(share), 1)][1:]
+        target = np.log(self.percent / 100)
+        lo, hi, _ = min(candidates, key=lambda c: abs(np.log(c[2]) - target))
+        return int(lo), int(hi)
+
+    def build_queries(self, vectors, max_idx, count, rng=random, payloads=None):
+        rows = [rng.randint(0, max_idx - 1) for _ in range(count)]
+        column = np.asarray(payloads[self.column][:max_idx])
+        if self.kind == "zipf":
+            fixed = self._zipf_filter(column)
+            windows = [fixed] * count
+        else:
+            windows = [self._window(int(column[r])) for r in rows]
+        self._measure(column, windows)
+        return [(vectors[r].tolist(), self.column, lo, hi) for r, (lo, hi) in zip(rows, windows)]
+
+    def _measure(self, column, windows):
+        """Πραγματική selectivity στις γραμμές του size (μέσος όρος των queries)."""
+        fractions = {w: float(((column >= w[0]) & (column < w[1])).mean()) for w in set(windows)}
+        self.selectivity = float(np.mean([fractions[w] for w in windows]))
+
+    def query_set_loaded(self, queries, dataset, max_idx):
+        column = np.asarray(dataset.payloads([self.column])[self.column][:max_idx])
+        self._measure(column, [(lo, hi) for _, _, lo, hi in queries])
+
+    def milvus_expr(self, query):
+        _, column, lo, hi = query
+        if hi - lo == 1:
+            return f"{column} == {lo}"
+        if lo == 0:
+            return f"{column} < {hi}"
+        return f"{column} >= {lo} && {column} < {hi}"
+
+    def weaviate_where(self, query):
+        _, column, lo, hi = query
+        if hi - lo == 1:
+            return {"path": [column], "operator": "Equal", "valueInt": lo}
+        upper = {"path": [column], "operator": "LessThan", "valueInt": hi}
+        if lo == 0:
+            return upper
+        return {"operator": "And", "operands": [
+            {"path": [column], "operator": "GreaterThanEqual", "valueInt": lo}, upper]}
+
+    def payload_mask(self, query, columns):
+        _, column, lo, hi = query
+        values = columns[column]
+        return (values >= lo) & (values < hi)
+
+    def extra_columns(self):
+        return {"Filter": self.kind, "Scalar_Index": self.scalar_index,
+                "Target Selectivity (%)": self.percent,
+                "Selectivity (%)": round(100 * self.selectivity, 5) if self.selectivity is not None else ""}
+
+
+def weaviate_range_index(handle):
+    """Αν οι στήλες selectivity του class έχουν indexRangeFilters (ορίζεται μόνο στο ingestion)."""
+    schema = handle.client.schema.get(handle.class_name)
+    return any(p.get("indexRangeFilters") for p in schema["properties"] if p["name"] in QUERY_PAYLOADS)
+
+
+def scalar_states(db_type, handle, requested):
+    """[(label, enabled)] που μπορούν να τρέξουν: η Milvus αλλάζει indexes επί τόπου,
+    η Weaviate μόνο με νέο ingestion (loader_wrapper.py --scalar-index)."""
+    if db_type == "local":
+        return [("n/a", None)]
+    if db_type == "weaviate":
+        current = weaviate_range_index(handle)
+        if requested != "both" and (requested == "on") != current:
+            print(f"   [WARN] Weaviate class has indexRangeFilters={current}; re-ingest with "
+                  f"{'--scalar-index' if requested == 'on' else 'no --scalar-index'} to change it.")
+        return [("on" if current else "off", current)]
+    return [(state, state == "on") for state in (["off", "on"] if requested == "both" else [requested])]
+
+
+def run_sweep(db_type, dim, dataset_size, kinds=None, percents=None, scalar_index="both", **options):
+    handle = driver.open_backend(db_type, dim)
+    try:
+        for label, enabled in scalar_states(db_type, handle, scalar_index):
+            if db_type == "milvus":
+                milvus_pipeline.set_scalar_indexes(handle, SCALAR_INDEXES, enabled)
+            for kind in kinds or FILTER_KINDS:
+                for percent in percents or SELECTIVITY_SWEEP:
+                    print(f"\n>>> {db_type} {dim}d {dataset_size} | {kind} {percent}% | scalar index {label}")
+                    workload = SelectivityWorkload(kind, percent, label)
+                    driver.run_workload(workload, db_type, dim, dataset_size, handle=handle, **options)
+    finally:
+        driver.close_backend(db_type, handle)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Filter selectivity sweep (0.001% - 99%), with and without scalar indexes")
+    parser.add_argument("db", choices=["milvus", "weaviate", "local"])
+    parser.add_argument("dim", type=int)
+    parser.add_argument("size", choices=SIZE_NAMES)
+    parser.add_argument("--filters", type=lambda v: v.split(","), default=FILTER_KINDS,
+                        help=f"Comma separated subset of {','.join(FILTER_KINDS)}")
+    parser.add_argument("--selectivity", type=parse_percent, default=SELECTIVITY_SWEEP,
+                        help="Target selectivities in percent, comma separated or 'sweep'")
+    parser.add_argument("--scalar-index", choices=["on", "off", "both"], default="both",
+                        help="Milvus: toggle INVERTED/STL_SORT indexes between runs. Weaviate: fixed at ingestion")
+    driver.add_workload_options(parser)
+    args = parser.parse_args()
+    unknown = set(args.filters) - set(FILTER_KINDS)
+    if unknown:
+        parser.error(f"Unknown filters: {', '.join(sorted(unknown))}")
+    run_sweep(args.db, args.dim, args.size, args.filters, args.selectivity, args.scalar_index, **driver.workload_options(args))
@@ -0,0 +1,162 @@
+import argparse
+import importlib
+import csv
+import sys
+import os
+
+# --- PATH CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../../"))
+sys.path.append(PROJECT_ROOT)
+from src.queries import driver
+from src.ingestion import loader_wrapper, milvus_pipeline
+from src.utils.sizes import SIZE_NAMES
+from src.utils.dataset import select_dataset
+
+# --- CONFIGURATION ---
+EF_SWEEP = [16, 32, 64, 128, 256, 512]
+NPROBE_SWEEP = [1, 4, 16, 64, 256]
+# (dynamicEfMin, dynamicEfMax, dynamicEfFactor). Το τελευταίο είναι το default της Weaviate,
+# ώστε το class να μένει στις default ρυθμίσεις μετά το sweep
+DYNAMIC_EF_SWEEP = [(50, 250, 4), (100, 500, 8)]
+# Recall@10 με limit=10: έτσι επιτρέπονται και ef < 100
+RECALL_LIMIT = 10
+RECALL_KS = [1, 10]
+
+RESULTS_FILE = os.path.join(PROJECT_ROOT, "results/sweeps/param_sweep.csv")
+
+
+def parse_ints(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def parse_build(value):
+    """'16:256,32:400' -> [{"M": 16, "efConstruction": 256}, ...]"""
+    params = []
+    for item in value.split(","):
+        m, efc = item.split(":")
+        params.append({"M": int(m), "efConstruction": int(efc)})
+    return params
+
+
+def pareto_frontier(points):
+    """Τα σημεία που δεν κυριαρχούνται: κανένα άλλο δεν έχει ταυτόχρονα μεγαλύτερο recall και QPS."""
+    frontier, best_qps = [], -1.0
+    for p in sorted(points, key=lambda p: (p["Recall@10"] or 0, p["Throughput (QPS)"]), reverse=True):
+        if p["Throughput (QPS)"] > best_qps:
+            frontier.append(p)
+            best_qps = p["Throughput (QPS)"]
+    return frontier
+
+
+def rebuild_milvus_index(col, build_params):
+    print(f"   [Build] Rebuilding HNSW index with {build_params}...")
+    milvus_pipeline.build_vector_index(col, "HNSW", build_params)
+    col.load()
+
+
+def search_settings(db_type, handle, ef_values, nprobe_values):
+    """(label, milvus params) για κάθε search-time ρύθμιση. Για τη Weaviate εφαρμόζει το ef στο class."""
+    if db_type == "milvus":
+        index_type = driver.milvus_index_type(handle)
+        if index_type == "HNSW":
+            for ef in ef_values: yield f"ef={ef}", {"ef": ef}
+        elif index_type == "DISKANN":
+            # Το search_list παίζει τον ρόλο του ef και πρέπει να είναι >= limit
+            for ef in ef_values:
+                if ef >= RECALL_LIMIT: yield f"search_list={ef}", driver.milvus_search_params(index_type, ef)
+        elif index_type.startswith("IVF"):
+            for nprobe in nprobe_values: yield f"nprobe={nprobe}", {"nprobe": nprobe}
+        else:
+            print(f"   [Note] {index_type} has no search-time parameter to sweep: one point only")
+            yield index_type, {}
+        return
+
+    for ef in ef_values:
+        driver.set_weaviate_ef(handle.client, handle.class_name, ef)
+        yield f"ef={ef}", None
+    for dynamic_ef in DYNAMIC_EF_SWEEP:
+        driver.set_weaviate_ef(handle.client, handle.class_name, None, dynamic_ef)
+        yield "dynamic_ef={}/{}/{}".format(*dynamic_ef), None
+
+
+def run_sweep(workload, db_type, dim, dataset_size, num_queries=100, concurrency=1,
+              ef_values=None, nprobe_values=None, build_values=None, seed=driver.DEFAULT_SEED):
+    folder = driver.dataset_folder(dim)
+    dataset = driver.load_dataset(folder)
+    max_idx = dataset.size_rows(dataset_size)
+    queries, _ = driver.workload_queries(workload, dataset, max_idx, num_queries, seed)
+    batches = driver.make_batches(queries, 1, num_queries)
+    workload_name = os.path.splitext(os.path.basename(workload.RESULTS_FILE))[0]
+
+    points = []
+    for build_params in build_values or [None]:
+        if build_params and db_type == "weaviate":
+            # maxConnections / efConstruction δεν αλλάζουν σε υπάρχον class: ξαναφορτώνουμε
+            loader_wrapper.load_data(db_type, dim, dataset_size, index_params=build_params)
+
+        handle = driver.open_backend(db_type, dim)
+        if build_params and db_type == "milvus":
+            rebuild_milvus_index(handle, build_params)
+        build_label = "M={M}/efc={efConstruction}".format(**build_params) if build_params else "current"
+
+        try:
+            for label, params in search_settings(db_type, handle, ef_values or EF_SWEEP, nprobe_values or NPROBE_SWEEP):
+                search_fn = driver.make_search_fn(workload, db_type, handle, params)
+                for _ in range(driver.WARMUP_QUERIES): search_fn(queries[:1])
+
+                recalls = driver.measure_recall(workload, db_type, handle, search_fn, queries, folder, max_idx,
+                                                limit=RECALL_LIMIT, ks=RECALL_KS)
+                tracker = driver.run_closed_loop(search_fn, batches, concurrency,
+                                                 max(num_queries, concurrency * driver.MIN_QUERIES_PER_WORKER))
+                stats = tracker.get_stats()
+                driver.print_stats(f"{db_type} {dim}d {build_label} {label}", stats)
+                if not stats:
+                    continue
+
+                extra = {"Workload": workload_name, "Build_Params": build_label, "Search_Params": label,
+                         "Concurrency": concurrency}
+                extra.update(recalls)
+                tracker.save_to_csv(RESULTS_FILE, db_type, dim, dataset_size, extra=extra)
+                point = dict(extra)
+                point.update(stats)
+                points.append(point)
+        finally:
+            driver.close_backend(db_type, handle)
+
+    frontier = pareto_frontier(points)
+    pareto_file = os.path.join(PROJECT_ROOT, f"results/sweeps/pareto_{workload_name}_{db_type}_{dim}d_{dataset_size}.csv")
+    os.makedirs(os.path.dirname(pareto_file), exist_ok=True)
+    with open(pareto_file, "w", newline="") as f:
+        columns = ["Build_Params", "Search_Params", "Recall@1", "Recall@10", "Throughput (QPS)",
+                   "P50 Latency (s)", "P99 Latency (s)"]
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(frontier)
+
+    print(f"\n[Result] Pareto frontier ({len(frontier)}/{len(points)} settings) -> {pareto_file}")
+    for p in frontier:
+        print(f"   {p['Build_Params']:<20} {p['Search_Params']:<22} recall@10={p['Recall@10']} QPS={p['Throughput (QPS)']}")
+    return frontier
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep index parameters and report the recall/QPS Pareto frontier")
+    parser.add_argument("db", choices=["milvus", "weaviate"])
+    parser.add_argument("dim", type=int)
+    parser.add_argument("size", choices=SIZE_NAMES)
+    parser.add_argument("--workload", default="query4_pure_l2", help="Module name in src/queries")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--ef", type=parse_ints, default=None, help=f"HNSW ef / DISKANN search_list values (default {EF_SWEEP})")
+    parser.add_argument("--nprobe", type=parse_ints, default=None, help=f"IVF nprobe values (default {NPROBE_SWEEP})")
+    parser.add_argument("--build", type=parse_build, default=None,
+                        help="HNSW build settings M:efConstruction, e.g. 16:256,32:400 (Weaviate re-ingests per setting)")
+    parser.add_argument("--seed", type=int, default=driver.DEFAULT_SEED)
+    parser.add_argument("--dataset", default=None, help="Dataset folder under data/ instead of the exp_* of the dimension")
+    args = parser.parse_args()
+    select_dataset(args.dataset)
+
+    workload = importlib.import_module(f"src.queries.{args.workload}")
+    run_sweep(workload, args.db, args.dim, args.size, args.queries, args.concurrency,
+              args.ef, args.nprobe, args.build, args.seed)
@@ -0,0 +1,314 @@
+import os
+import re
+import sys
+import csv
+import time
+import argparse
+import threading
+import subprocess
+from contextlib import contextmanager
+
+# Μετρήσεις απευθείας από τα cgroup v2 αρχεία ενός container (χωρίς docker stats, που κάνει ~1-2s ανά δείγμα)
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+UNITS = {"": 1, "B": 1, "K": 1024, "KB": 1000, "KIB": 1024, "M": 1024**2, "MB": 1000**2, "MIB": 1024**2,
+         "G": 1024**3, "GB": 1000**3, "GIB": 1024**3, "T": 1024**4, "TB": 1000**4, "TIB": 1024**4}
+
+
+def parse_size(value):
+    """'8G' / '7.5GiB' / '512MB' / '1024' -> bytes"""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([a-zA-Z]*)\s*", str(value))
+    if not match or match.group(2).upper() not in UNITS:
+        raise ValueError(f"Invalid size: {value}")
+    return int(float(match.group(1)) * UNITS[match.group(2).upper()])
+
+
+def container_id(name):
+    try:
+        out = subprocess.run(["docker", "inspect", "--format", "{{.Id}}", name], capture_output=True, text=True)
+    except OSError:
+        return None  # χωρίς docker CLI
+    return out.stdout.strip() or None
+
+
+def container_cgroup(name, root=CGROUP_ROOT):
+    """Ο φάκελος cgroup του container (systemd ή cgroupfs driver), ή None.
+    Ένας φάκελος <root>/<name> έχει προτεραιότητα, ώστε ένα ψεύτικο sysfs tree να αρκεί για tests."""
+    direct = os.path.join(root, name)
+    if os.path.isfile(os.path.join(direct, "memory.current")):
+        return direct
+    cid = container_id(name)
+    if not cid:
+        return None
+    for candidate in (os.path.join(root, "system.slice", f"docker-{cid}.scope"), os.path.join(root, "docker", cid)):
+        if os.path.isdir(candidate):
+            return candidate
+    return None
+
+
+def read_memory_current(cgroup_dir):
+    with open(os.path.join(cgroup_dir, "memory.current")) as f:
+        return int(f.read())
+
+
+def read_cpu_usage(cgroup_dir):
+    """Συνολικός CPU χρόνος του cgroup σε µs (cpu.stat: usage_usec)."""
+    with open(os.path.join(cgroup_dir, "cpu.stat")) as f:
+        for line in f:
+            key, value = line.split()
+            if key == "usage_usec":
+                return int(value)
+    return 0
+
+
+def read_io_bytes(cgroup_dir):
+    """(read, written) bytes αθροιστικά για όλα τα devices (io.stat: rbytes / wbytes)."""
+    read = written = 0
+    path = os.path.join(cgroup_dir, "io.stat")
+    if not os.path.exists(path):
+        return 0, 0
+    with open(path) as f:
+        for line in f:
+            for field in line.split()[1:]:
+                key, _, value = field.partition("=")
+                if key == "rbytes":
+                    read += int(value)
+                elif key == "wbytes":
+                    written += int(value)
+    return read, written
+
+
+def container_disk_usage(name, path):
+    """Bytes κάτω από το path μέσα στο container (docker exec du -sb), ή None.
+    Δουλεύει και όταν τα docker volumes δεν είναι προσβάσιμα από τον host (Docker Desktop, χωρίς root)."""
+    try:
+        out = subprocess.run(["docker", "exec", name, "du", "-sb", path], capture_output=True, text=True)
+    except OSError:
+        return None
+    fields = out.stdout.split()
+    return int(fields[0]) if fields and fields[0].isdigit() else None
+
+
+def docker_stats_memory(name):
+    """Fallback όταν δεν έχουμε πρόσβαση στο cgroup fs (π.χ. Docker Desktop)."""
+    out = subprocess.run(["docker", "stats", "--no-stream", "--format", "{{.MemUsage}}", name], capture_output=True, text=True)
+    usage = out.stdout.split("/")[0].strip()
+    return parse_size(usage) if usage else None
+
+
+class ContainerMemory:
+    """Μνήμη ενός container σε bytes: cgroup αρχείο αν υπάρχει, αλλιώς docker stats."""
+
+    def __init__(self, name, root=CGROUP_ROOT):
+        self.name = name
+        self.cgroup = container_cgroup(name, root)
+
+    def read(self):
+        try:
+            if self.cgroup:
+                return read_memory_current(self.cgroup)
+            return docker_stats_memory(self.name)
+        except (OSError, ValueError):
+            return None
+
+
+# --- BACKGROUND SAMPLER ---
+# Containers ανά βάση (docker/docker-compose.yml)
+CONTAINERS = {
+    "milvus": ["milvus_db", "milvus-etcd", "milvus-minio"],
+    "weaviate": ["weaviate_db"],
+    "local": [],
+}
+SAMPLE_INTERVAL = 0.2
+# Ένα script μπορεί να δηλώνει τη φάση του σε sampler άλλου process (π.χ. master_milvus.sh) μέσω αρχείου
+PHASE_ENV = "BENCH_PHASE_FILE"
+RESOURCES_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../results/stats/resources"))
+SAMPLE_FIELDS = ["Timestamp", "Elapsed (s)", "Phase", "Container", "CPU (%)", "Memory (MiB)", "Read (MiB/s)", "Write (MiB/s)"]
+
+_current_phase = "idle"
+_active_samplers = set()
+
+
+def mark_phase(name):
+    """Ορίζει την τρέχουσα φάση (ingest, flush, index, query, ...) για όλους τους samplers
+    του process και, αν έχει οριστεί το $BENCH_PHASE_FILE, για sampler άλλου process."""
+    global _current_phase
+    _current_phase = name
+    for sampler in list(_active_samplers):
+        sampler.phase = name
+    path = os.environ.get(PHASE_ENV)
+    if path:
+        with open(path, "w") as f:
+            f.write(name)
+
+
+@contextmanager
+def phase(name):
+    previous = _current_phase
+    mark_phase(name)
+    try:
+        yield
+    finally:
+        mark_phase(previous)
+
+
+class ResourceSampler:
+    """Thread που διαβάζει cpu.stat / memory.current / io.stat κάθε container απευθείας από το cgroup fs
+    κάθε interval sec. Κάθε δείγμα έχει τη φάση που ίσχυε όταν πάρθηκε.
+    output: CSV όπου γράφεται κάθε δείγμα αμέσως (αντέχει kill). phase_file: διαβάζει τη φάση από αρχείο."""
+
+    def __init__(self, containers, interval=SAMPLE_INTERVAL, root=CGROUP_ROOT, output=None, phase_file=None):
+        self.interval = interval
+        self.output = output
+        self.phase_file = phase_file
+        self.phase = _current_phase
+        self.cgroups = {}
+        for name in containers:
+            cgroup = container_cgroup(name, root)
+            if cgroup:
+                self.cgroups[name] = cgroup
+            else:
+                print(f"   [Sampler] No cgroup v2 directory for container '{name}', skipping it")
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._writer = None
+        self._file = None
+        self._t0 = 0.0
+
+    def _read(self, cgroup):
+        read, written = read_io_bytes(cgroup)
+        return read_cpu_usage(cgroup), read_memory_current(cgroup), read, written
+
+    def _current_phase(self):
+        if self.phase_file and os.path.exists(self.phase_file):
+            with open(self.phase_file) as f:
+                return f.read().strip() or self.phase
+        return self.phase
+
+    def _run(self):
+        previous = {}
+        last = time.perf_counter()
+        for name, cgroup in self.cgroups.items():
+            try:
+                previous[name] = self._read(cgroup)
+            except (OSError, ValueError):
+                pass
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            elapsed = now - last
+            last = now
+            current_phase = self._current_phase()
+            for name, cgroup in self.cgroups.items():
+                try:
+                    cpu, memory, read, written = self._read(cgroup)
+                except (OSError, ValueError):
+                    continue  # το container σταμάτησε / ξεκινάει ξανά
+                if name in previous and elapsed > 0:
+                    prev_cpu, _, prev_read, prev_written = previous[name]
+                    self._add({
+                        "Timestamp": time.strftime("%H:%M:%S"),
+                        "Elapsed (s)": round(now - self._t0, 3),
+                        "Phase": current_phase,
+                        "Container": name,
+                        "CPU (%)": round((cpu - prev_cpu) / (elapsed * 1e6) * 100, 1),
+                        "Memory (MiB)": round(memory / 2**20, 1),
+                        "Read (MiB/s)": round((read - prev_read) / elapsed / 2**20, 2),
+                        "Write (MiB/s)": round((written - prev_written) / elapsed / 2**20, 2),
+                    })
+                previous[name] = (cpu, memory, read, written)
+
+    def _add(self, sample):
+        self.samples.append(sample)
+        if self._writer:
+            self._writer.writerow(sample)
+            self._file.flush()
+
+    def start(self):
+        if self.output:
+            os.makedirs(os.path.dirname(os.path.abspath(self.output)), exist_ok=True)
+            self._file = open(self.output, "w", newline="")
+            self._writer = csv.DictWriter(self._file, fieldnames=SAMPLE_FIELDS)
+            self._writer.writeheader()
+        self._t0 = time.perf_counter()
+        _active_samplers.add(self)
+        if self.cgroups:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        _active_samplers.discard(self)
+        if self._file:
+            self._file.close()
+            self._file = self._writer = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def summary(self, phase_name=None, since=None, until=None):
+        """Άθροισμα όλων των containers ανά δείγμα: μέσο / μέγιστο CPU (%) και peak μνήμη (MiB).
+        Προαιρετικά μόνο για μία φάση και / ή για δείγματα στο [since, until] (Elapsed sec)."""
+        ticks = {}
+        for s in list(self.samples):
+            t = s["Elapsed (s)"]
+            if (phase_name is None or s["Phase"] == phase_name) and (since is None or t >= since) and (until is None or t <= until):
+                tick = ticks.setdefault(round(s["Elapsed (s)"] / self.interval), [0.0, 0.0])
+                tick[0] += s["CPU (%)"]
+                tick[1] += s["Memory (MiB)"]
+        if not ticks:
+            return None
+        cpu = [t[0] for t in ticks.values()]
+        return {
+            "Server Avg CPU (%)": round(sum(cpu) / len(cpu), 1),
+            "Server Max CPU (%)": round(max(cpu), 1),
+            "Server Peak MEM (MiB)": round(max(t[1] for t in ticks.values()), 1),
+        }
+
+    def elapsed(self):
+        return time.perf_counter() - self._t0
+
+    def phases(self):
+        return list(dict.fromkeys(s["Phase"] for s in self.samples))
+
+    def print_summary(self):
+        for name in self.phases():
+            stats = self.summary(name)
+            print(f"   [Resources] {name}: avg CPU={stats['Server Avg CPU (%)']}% max CPU={stats['Server Max CPU (%)']}% "
+                  f"peak MEM={stats['Server Peak MEM (MiB)']} MiB")
+
+
+def resources_file(kind, db, dim, size):
+    """results/stats/resources/<kind>_<db>_<dim>d_<size>.csv"""
+    return os.path.join(RESOURCES_DIR, f"{kind}_{db}_{dim}d_{size}.csv")
+
+
+if __name__ == "__main__":
+    # Standalone sampler για τα shell scripts: τρέχει μέχρι SIGTERM / Ctrl-C
+    parser = argparse.ArgumentParser(description="Sample container cgroup v2 CPU / memory / IO")
+    parser.add_argument("--containers", required=True, help="Comma separated container names")
+    parser.add_argument("--output", required=True, help="CSV file, one row per container per sample")
+    parser.add_argument("--interval", type=float, default=SAMPLE_INTERVAL, help="Seconds between samples (0.1-0.25)")
+    parser.add_argument("--root", default=CGROUP_ROOT, help="cgroup v2 mount point")
+    parser.add_argument("--phase-file", default=os.environ.get(PHASE_ENV), help=f"File holding the current phase (default ${PHASE_ENV})")
+    args = parser.parse_args()
+
+    import signal
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    sampler = ResourceSampler([c for c in args.containers.split(",") if c], args.interval, args.root, args.output, args.phase_file)
+    if not sampler.cgroups:
+        sys.exit("No cgroup v2 directories found for the given containers")
+    sampler.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        sampler.stop()
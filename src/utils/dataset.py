@@ -0,0 +1,238 @@
+import os
+import re
+import json
+import hashlib
+import numpy as np
+from src.utils.payloads import load_payloads, payload_dir
+from src.utils.sizes import SIZES
+from src.utils.layouts import layout_suffix
+
+# Ένα dataset είναι ένας φάκελος στο data/ με manifest.json:
+#   {"name": "exp_1_128d", "dim": 128, "dtype": "float32", "rows": 2500000,
+#    "shards": [{"file": "vectors.npy", "rows": 2500000}]}
+# Τα vectors μπορεί να είναι ένα vectors.npy ή πολλά shards (vectors/shard_00000.npy, ...).
+# Φάκελοι χωρίς manifest (παλιά datasets) διαβάζονται ως ένα vectors.npy.
+# Τα datasets του src/generators/import_ann.py έχουν επιπλέον "metric", "queries" (queries.npy) και
+# "neighbors" (neighbors.npy): το query set και το ground truth που δίνει η ίδια η πηγή.
+# Το "precisions" κρατάει τα reduced-precision αντίγραφα του src/generators/convert_precision.py
+# (src/utils/precision.py), με το ίδιο format των shards.
+# Τα layouts του src/utils/layouts.py (--layout) δεν αλλάζουν τα αρχεία, μόνο το όνομα του collection / class.
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../../"))
+DATA_ROOT = os.path.join(PROJECT_ROOT, "data")
+
+MANIFEST = "manifest.json"
+CHUNK_ROWS = 100_000
+# Επιλογή dataset με το όνομα του φακέλου του (π.χ. sift-128-euclidean) αντί για το exp_* της διάστασης.
+# Τα scripts το ορίζουν με --dataset. Ως env var περνάει και στα subprocesses του suite / των master scripts.
+DATASET_ENV = "BENCH_DATASET"
+
+
+def select_dataset(name):
+    if name:
+        os.environ[DATASET_ENV] = name
+
+
+def selected_dataset():
+    return os.environ.get(DATASET_ENV) or None
+
+
+def folder_name(dim):
+    return selected_dataset() or f"exp_{1 if dim==128 else 2 if dim==512 else 3}_{dim}d"
+
+
+def _collection_suffix(dim):
+    name = selected_dataset()
+    return re.sub(r"\W", "_", name) if name else f"{dim}d"
+
+
+def collection_name(dim, precision=None):
+    """Milvus collection του dataset: benchmark_128d, ή benchmark_<όνομα> για ένα επιλεγμένο dataset.
+    Τα precision variants και τα layouts έχουν δικό τους collection, π.χ. benchmark_128d_float16,
+    benchmark_128d_pkey16."""
+    suffix = f"_{precision}" if precision not in (None, "float32") else ""
+    return f"benchmark_{_collection_suffix(dim)}{layout_suffix('milvus')}{suffix}"
+
+
+def weaviate_class(dim):
+    """Weaviate class του dataset (πρέπει να ξεκινάει με κεφαλαίο), π.χ. Benchmark_128d_tenants1000."""
+    return f"Benchmark_{_collection_suffix(dim)}{layout_suffix('weaviate')}"
+
+
+def write_manifest(folder, dim, shards, dtype="float32", **extra):
+    """shards: [(relative path, rows), ...] με τη σειρά των γραμμών."""
+    manifest = {"name": os.path.basename(folder), "dim": dim, "dtype": dtype,
+                "rows": sum(rows for _, rows in shards),
+                "shards": [{"file": path, "rows": rows} for path, rows in shards]}
+    manifest.update(extra)
+    with open(os.path.join(folder, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class ShardedVectors:
+    """Οι πρώτες rows γραμμές πολλών .npy memmaps σαν ένας πίνακας (rows, dim).
+    Slices μέσα σε ένα shard είναι views. Slices που περνάνε όριο shard ενώνονται (αντίγραφο),
+    οπότε τα batches / blocks των loaders κοστίζουν όσο και με ένα αρχείο."""
+
+    def __init__(self, shards, rows=None):
+        self.shards = shards
+        self.offsets = np.cumsum([0] + [len(s) for s in shards])
+        total = int(self.offsets[-1])
+        self.rows = total if rows is None else min(rows, total)
+        self.dtype = shards[0].dtype
+        self.shape = (self.rows, shards[0].shape[1])
+        self.ndim = 2
+
+    def __len__(self):
+        return self.rows
+
+    def _locate(self, row):
+        shard = int(np.searchsorted(self.offsets, row, side="right")) - 1
+        return shard, row - int(self.offsets[shard])
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += self.rows
+            if not 0 <= key < self.rows:
+                raise IndexError(f"row {key} out of range for {self.rows} rows")
+            shard, local = self._locate(key)
+            return self.shards[shard][local]
+        if isinstance(key, slice) and key.step in (None, 1):
+            start, stop, _ = key.indices(self.rows)
+            parts = []
+            while start < stop:
+                shard, local = self._locate(start)
+                take = min(stop - start, len(self.shards[shard]) - local)
+                parts.append(self.shards[shard][local:local + take])
+                start += take
+            if not parts:
+                return np.empty((0, self.shape[1]), dtype=self.dtype)
+            return parts[0] if len(parts) == 1 else np.concatenate(parts)
+        if isinstance(key, np.ndarray) and key.dtype.kind in "iu":
+            # Γραμμές με τη σειρά του key (π.χ. layouts.Permuted): fancy indexing ανά shard
+            out = np.empty((len(key), self.shape[1]), dtype=self.dtype)
+            shards = np.searchsorted(self.offsets, key, side="right") - 1
+            for shard in np.unique(shards):
+                mask = shards == shard
+                out[mask] = self.shards[shard][key[mask] - int(self.offsets[shard])]
+            return out
+        raise TypeError(f"Unsupported index for ShardedVectors: {key!r}")
+
+    def __array__(self, dtype=None, copy=None):
+        array = self[0:self.rows]
+        return array if dtype is None else array.astype(dtype)
+
+
+class Dataset:
+    """Vectors, payloads και size tiers ενός φακέλου του data/."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.name = os.path.basename(os.path.normpath(folder))
+        manifest_file = os.path.join(folder, MANIFEST)
+        if os.path.exists(manifest_file):
+            with open(manifest_file) as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"shards": [{"file": "vectors.npy"}]}
+        # Το shape έρχεται από το header κάθε .npy, όχι από hard-coded νούμερα
+        self._shards = [np.load(os.path.join(folder, s["file"]), mmap_mode="r") for s in self.manifest["shards"]]
+        self.rows = sum(len(s) for s in self._shards)
+        self.dim = self._shards[0].shape[1]
+        self.metric = self.manifest.get("metric")
+        self.precisions = ["float32"] + list(self.manifest.get("precisions", {}))
+        self.sizes = SIZES
+        self._variants = {}
+        self._fingerprint = None
+
+    @classmethod
+    def for_dim(cls, dim):
+        return cls(os.path.join(DATA_ROOT, folder_name(dim)))
+
+    @staticmethod
+    def exists(folder):
+        return os.path.exists(os.path.join(folder, MANIFEST)) or os.path.exists(os.path.join(folder, "vectors.npy"))
+
+    def vectors(self, rows=None, precision=None):
+        """Οι πρώτες rows γραμμές: memmap view για ένα αρχείο, ShardedVectors για πολλά.
+        Με precision (float16, bfloat16, int8, binary) τα codes του αντίστοιχου αντιγράφου."""
+        shards = self._shards if precision in (None, "float32") else self._precision_shards(precision)
+        if len(shards) == 1:
+            return shards[0] if rows is None else shards[0][:rows]
+        return ShardedVectors(shards, rows)
+
+    def _precision_shards(self, precision):
+        if precision not in self._variants:
+            variant = self.manifest.get("precisions", {}).get(precision)
+            if variant is None:
+                raise ValueError(f"Dataset {self.name} has no {precision} vectors "
+                                 f"(run src/generators/convert_precision.py)")
+            self._variants[precision] = [np.load(os.path.join(self.folder, s["file"]), mmap_mode="r")
+                                         for s in variant["shards"]]
+        return self._variants[precision]
+
+    def precision_params(self):
+        """min / max / mean ανά διάσταση (int8, binary), ή None αν δεν έχει γίνει conversion."""
+        path = self.manifest.get("precision_params")
+        if not path:
+            return None
+        with np.load(os.path.join(self.folder, path)) as params:
+            return {key: params[key] for key in params.files}
+
+    def fingerprint(self):
+        """Hash της γενιάς των δεδομένων: manifest (χωρίς τα precision αντίγραφα) και μέγεθος / mtime των
+        vector shards και των payload στηλών. Αλλάζει όταν το generate_data.py / import_ann.py ξαναγράφει
+        το dataset, οπότε query sets και ground truth της προηγούμενης γενιάς δεν ξαναδιαβάζονται."""
+        if self._fingerprint is None:
+            manifest = {k: v for k, v in self.manifest.items() if k not in ("precisions", "precision_params")}
+            key = hashlib.sha1(json.dumps(manifest, sort_keys=True).encode())
+            files = [os.path.join(self.folder, s["file"]) for s in self.manifest["shards"]]
+            payloads = payload_dir(self.folder)
+            if os.path.isdir(payloads):
+                files += [os.path.join(payloads, f) for f in sorted(os.listdir(payloads)) if f.endswith(".npy")]
+            for path in files:
+                stat = os.stat(path)
+                key.update(f"{os.path.relpath(path, self.folder)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+            self._fingerprint = key.hexdigest()[:12]
+        return self._fingerprint
+
+    def check_dim(self, dim):
+        if self.dim != dim:
+            raise ValueError(f"Dataset {self.name} has {self.dim} dimensions, not {dim}")
+
+    def _extra(self, key):
+        path = self.manifest.get(key)
+        return np.load(os.path.join(self.folder, path), mmap_mode="r") if path else None
+
+    def queries(self):
+        """Το query set της πηγής (import_ann.py), ή None για τα συνθετικά datasets."""
+        return self._extra("queries")
+
+    def neighbors(self):
+        """Ground truth ids της πηγής για το queries(), πάνω σε όλες τις γραμμές, ή None."""
+        return self._extra("neighbors")
+
+    def size_rows(self, size):
+        """Γραμμές ενός size tier, περιορισμένες στο μέγεθος του dataset."""
+        if size not in self.sizes:
+            raise ValueError(f"Unknown size '{size}' for {self.name} (known: {', '.join(self.sizes)})")
+        return min(self.sizes[size], self.rows)
+
+    def payloads(self, columns=None):
+        return load_payloads(self.folder, columns)
+
+    def iter_chunks(self, start=0, stop=None, chunk=CHUNK_ROWS):
+        """(start, end, vectors) για τις γραμμές [start, stop). Τα chunks δεν περνάνε όρια shard,
+        οπότε κάθε chunk είναι view του memmap χωρίς αντιγραφή."""
+        stop = self.rows if stop is None else min(stop, self.rows)
+        offset = 0
+        for shard in self._shards:
+            shard_end = offset + len(shard)
+            s = max(start, offset)
+            while s < min(stop, shard_end):
+                e = min(s + chunk, stop, shard_end)
+                yield s, e, shard[s - offset:e - offset]
+                s = e
+            offset = shard_end
@@ -0,0 +1,132 @@
+import os
+import hashlib
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.payloads import load_payloads
+from src.utils.dataset import Dataset
+
+# --- CONFIGURATION ---
+BLOCK_ROWS = 65_536          # Γραμμές του memmap ανά matmul block
+RECALL_AT = [1, 10, 100]
+GT_K = max(RECALL_AT)
+
+
+def _block_topk(vectors, queries, start, end, k, metric, masks):
+    """Exact top-k ενός block [start, end). Μικρότερη τιμή = καλύτερο (για IP αρνητικό dot product)."""
+    block = np.asarray(vectors[start:end], dtype=np.float32)
+    scores = queries @ block.T
+    if metric == "IP":
+        dist = -scores
+    else:
+        # ||q - x||^2 = ||q||^2 - 2 q.x + ||x||^2, το ||q||^2 δεν αλλάζει τη σειρά
+        dist = np.einsum("ij,ij->i", block, block)[None, :] - 2 * scores
+    if masks is not None:
+        dist[~(masks(start, end) if callable(masks) else masks[:, start:end])] = np.inf
+
+    kk = min(k, end - start)
+    part = np.argpartition(dist, kk - 1, axis=1)[:, :kk]
+    part_dist = np.take_along_axis(dist, part, axis=1)
+    return part_dist, part + start
+
+
+def exact_topk(vectors, queries, k=GT_K, metric="L2", limit=None, masks=None, workers=None, pool=None):
+    """Brute-force top-k πάνω στις πρώτες limit γραμμές του vectors (memmap ή ShardedVectors).
+    masks: bool array (num_queries, limit), masks(start, end) -> bool (num_queries, end - start)
+    (payload_masks, χωρίς ολόκληρο πίνακα στη μνήμη) ή None. Τα blocks μοιράζονται σε threads
+    (το numpy matmul απελευθερώνει το GIL), σε ένα υπάρχον pool αν δοθεί.
+    Θέσεις χωρίς αρκετά matches γεμίζουν με -1."""
+    limit = limit or vectors.shape[0]
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    starts = range(0, limit, BLOCK_ROWS)
+    block = lambda s: _block_topk(vectors, queries, s, min(s + BLOCK_ROWS, limit), k, metric, masks)
+
+    if pool is not None:
+        parts = list(pool.map(block, starts))
+    else:
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as own_pool:
+            parts = list(own_pool.map(block, starts))
+
+    all_dist = np.concatenate([p[0] for p in parts], axis=1)
+    all_ids = np.concatenate([p[1] for p in parts], axis=1)
+    order = np.argsort(all_dist, axis=1, kind="stable")[:, :k]
+    ids = np.take_along_axis(all_ids, order, axis=1)
+    ids[np.isinf(np.take_along_axis(all_dist, order, axis=1))] = -1
+    return ids
+
+
+def payload_masks(workload, queries, columns):
+    """masks(start, end) για το exact_topk: τα payload_mask των queries μόνο για τις γραμμές του block,
+    αντί για έναν (queries, rows) bool πίνακα (nq=1000 σε 2.5M γραμμές = 2.5 GB ανά request).
+    None για workloads χωρίς φίλτρο."""
+    if workload.payload_mask(queries[0], {name: col[:0] for name, col in columns.items()}) is None:
+        return None
+
+    def masks(start, end):
+        block = {name: col[start:end] for name, col in columns.items()}
+        return np.stack([workload.payload_mask(q, block) for q in queries])
+    return masks
+
+
+def provided_ground_truth(folder, workload, queries, limit, k=GT_K):
+    """Τα neighbors της πηγής ενός imported dataset (src/generators/import_ann.py), όταν ισχύουν:
+    χωρίς φίλτρο, πάνω σε όλες τις γραμμές, ίδιο metric (ή normalized vectors, όπου L2 και IP δίνουν την ίδια σειρά)
+    και queries από το query set της πηγής. Αλλιώς None."""
+    dataset = Dataset(folder)
+    neighbors = dataset.neighbors()
+    if neighbors is None or limit < dataset.rows or neighbors.shape[1] < k or workload.milvus_expr(queries[0]) is not None:
+        return None
+    if workload.METRIC != dataset.metric and not dataset.manifest.get("normalized"):
+        return None
+    rows = {row.tobytes(): i for i, row in enumerate(np.asarray(dataset.queries(), dtype=np.float32))}
+    index = [rows.get(np.asarray(q[0], dtype=np.float32).tobytes()) for q in queries]
+    if None in index:
+        return None
+    return np.asarray(neighbors[index, :k], dtype=np.int64)
+
+
+def ground_truth(folder, workload, queries, limit, k=GT_K):
+    """Ground truth ids για τα queries ενός workload, cached στο <dataset>/ground_truth/.
+    Το κλειδί του cache είναι hash της γενιάς του dataset (Dataset.fingerprint), των query vectors,
+    των φίλτρων, του limit και του metric.
+    Για imported datasets χρησιμοποιείται το ground truth της πηγής όπου ισχύει."""
+    provided = provided_ground_truth(folder, workload, queries, limit, k)
+    if provided is not None:
+        return provided
+    metric = workload.METRIC
+    query_vectors = np.asarray([q[0] for q in queries], dtype=np.float32)
+    dataset = Dataset(folder)
+
+    key = hashlib.sha1(dataset.fingerprint().encode())
+    key.update(query_vectors.tobytes())
+    key.update(repr([q[1:] for q in queries]).encode())
+    key.update(f"{limit}:{metric}:{k}".encode())
+    name = os.path.splitext(os.path.basename(workload.RESULTS_FILE))[0]
+    cache_file = os.path.join(folder, "ground_truth", f"{name}_{metric}_{key.hexdigest()[:16]}.npy")
+    if os.path.exists(cache_file):
+        return np.load(cache_file)
+
+    masks = None
+    if workload.milvus_expr(queries[0]) is not None:
+        columns = {name: np.asarray(col[:limit]) for name, col in load_payloads(folder).items()}
+        masks = payload_masks(workload, queries, columns)
+
+    vectors = dataset.vectors()
+    print(f"   [GT] Computing exact top-{k} ({metric}) over {limit:,} vectors for {len(queries)} queries...")
+    ids = exact_topk(vectors, query_vectors, k, metric, limit, masks)
+
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    np.save(cache_file, ids)
+    return ids
+
+
+def recall_at(result_ids, gt_ids, ks=RECALL_AT):
+    """Μέσο recall@k. Αν ένα φίλτρο έχει λιγότερα από k matches, ο παρονομαστής είναι τα διαθέσιμα."""
+    recalls = {}
+    for k in ks:
+        values = []
+        for found, truth in zip(result_ids, gt_ids):
+            truth = [t for t in truth[:k] if t >= 0]
+            if truth:
+                values.append(len(set(found[:k]) & set(truth)) / len(truth))
+        recalls[f"Recall@{k}"] = round(float(np.mean(values)), 4) if values else None
+    return recalls
@@ -1,12 +1,35 @@
+import os
+import sys
+import csv
+import time
+import argparse
+import requests
 import weaviate
-from pymilvus import connections, utility
+import numpy as np
+from pymilvus import connections, utility, Collection, DataType
+
+# --- CONFIGURATION ---
+MILVUS_CONFIG = {"host": "localhost", "port": "19530"}
+MILVUS_HEALTHZ = "http://localhost:9091/healthz"
+WEAVIATE_URL = "http://localhost:8080"
+
+POLL_INTERVAL = 0.5
+READY_TIMEOUT = 300           # sec μέχρι να θεωρήσουμε ότι η βάση δεν θα σηκωθεί
+QUERYABLE_TIMEOUT = 3600      # το index build του big dataset μπορεί να πάρει αρκετά λεπτά
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../../"))
+LIFECYCLE_CSV = os.path.join(PROJECT_ROOT, "results", "stats", "lifecycle.csv")
+sys.path.append(PROJECT_ROOT)
+from src.utils.precision import bfloat16_rows
+
 
 def check_weaviate():
     print("--- Έλεγχος Weaviate ---")
     try:
         # Σύνδεση με τον παλιό τρόπο (v3)
         client = weaviate.Client("http://localhost:8080")
-        
+
         if client.is_ready():
             print("✅ Weaviate: ONLINE")
             schema = client.schema.get()
@@ -31,19 +54,131 @@ def check_milvus():
         # Σύνδεση στη Milvus
         connections.connect("default", host="localhost", port="19530")
         print("✅ Milvus: ONLINE")
-        
+
         collections = utility.list_collections()
         if not collections:
             print("ℹ️  Δεν βρέθηκαν Collections (είναι άδεια).")
         else:
             print(f"📊 Βρέθηκαν {len(collections)} collections:")
             for col_name in collections:
-                from pymilvus import Collection
                 col = Collection(col_name)
                 print(f"   - {col_name}: {col.num_entities} vectors")
     except Exception as e:
         print(f"❌ Σφάλμα σύνδεσης στη Milvus: {e}")
 
+
+# --- LIFECYCLE: polling αντί για σταθερά sleeps ---
+
+def wait_until(check, timeout=READY_TIMEOUT, interval=POLL_INTERVAL, what="condition"):
+    """Καλεί το check() μέχρι να επιστρέψει truthy. Exceptions μετράνε ως "όχι ακόμα"
+    (π.χ. connection refused όσο ξεκινάει το container). Επιστρέφει τα seconds που περίμενε."""
+    t0 = time.perf_counter()
+    last_error = None
+    while True:
+        try:
+            if check():
+                return time.perf_counter() - t0
+        except Exception as e:
+            last_error = e
+        if time.perf_counter() - t0 > timeout:
+            raise TimeoutError(f"{what} not reached after {timeout}s (last error: {last_error})")
+        time.sleep(interval)
+
+
+def milvus_ready():
+    """/healthz του standalone (ελέγχει etcd/minio/coords) και ένα πραγματικό gRPC call."""
+    if requests.get(MILVUS_HEALTHZ, timeout=2).status_code != 200:
+        return False
+    connections.connect("healthcheck", timeout=2, **MILVUS_CONFIG)
+    try:
+        return bool(utility.get_server_version(using="healthcheck"))
+    finally:
+        connections.disconnect("healthcheck")
+
+
+def weaviate_ready():
+    return weaviate.Client(WEAVIATE_URL, timeout_config=(2, 5), startup_period=None).is_ready()
+
+
+def wait_ready(db, timeout=READY_TIMEOUT):
+    """Time-to-ready: από τώρα μέχρι η βάση να δέχεται requests."""
+    check = milvus_ready if db == "milvus" else weaviate_ready
+    return wait_until(check, timeout, what=f"{db} ready")
+
+
+def probe_vector(field):
+    """Μηδενικό query vector στον τύπο του vector πεδίου (float, float16, bfloat16 ή binary)."""
+    dim = field.params["dim"]
+    if field.dtype == DataType.BINARY_VECTOR:
+        return bytes(dim // 8)
+    if field.dtype == DataType.FLOAT16_VECTOR:
+        return np.zeros(dim, dtype=np.float16)
+    if field.dtype == DataType.BFLOAT16_VECTOR:
+        return bfloat16_rows(np.zeros((1, dim), dtype=np.uint16))[0]
+    return [0.0] * dim
+
+
+def wait_milvus_queryable(col, timeout=QUERYABLE_TIMEOUT):
+    """Time-to-queryable: index build ολοκληρωμένο για όλες τις γραμμές, collection loaded
+    και ένα search που επιστρέφει αποτέλεσμα. Ένα άδειο collection είναι queryable μόλις γίνει load."""
+    t0 = time.perf_counter()
+    empty = col.num_entities == 0
+
+    def indexed():
+        progress = utility.index_building_progress(col.name)
+        print(f"   -> Index progress {progress['indexed_rows']:,} / {progress['total_rows']:,}", end="\r")
+        # total_rows = 0 με γραμμές στο collection σημαίνει ότι το index δεν τις έχει δει ακόμα
+        return (empty or progress["total_rows"] > 0) and progress["indexed_rows"] >= progress["total_rows"]
+
+    wait_until(indexed, timeout, interval=2.0, what=f"{col.name} index build")
+    col.load(timeout=timeout)
+    if empty:
+        return time.perf_counter() - t0
+    index = next(i for i in col.indexes if i.field_name == "vector")
+    field = next(f for f in col.schema.fields if f.name == "vector")
+    probe = {"data": [probe_vector(field)], "anns_field": "vector", "limit": 1,
+             "param": {"metric_type": index.params.get("metric_type", "L2"), "params": {}}}
+    wait_until(lambda: len(col.search(**probe)[0]) > 0, timeout, what=f"{col.name} queryable")
+    return time.perf_counter() - t0
+
+
+def wait_weaviate_queryable(client, class_name, dim, timeout=QUERYABLE_TIMEOUT, tenant=None):
+    """Time-to-queryable της Weaviate: ένα nearVector query επιστρέφει αποτέλεσμα (σε multi-tenant class,
+    μέσα στον tenant)."""
+    query = client.query.get(class_name, ["city_id"]).with_near_vector({"vector": [0.0] * dim}).with_limit(1)
+    if tenant:
+        query = query.with_tenant(tenant)
+    return wait_until(lambda: query.do()["data"]["Get"][class_name], timeout, what=f"{class_name} queryable")
+
+
+def record_lifecycle(event, seconds, db, dimension="", dataset_size=""):
+    """Μία γραμμή στο results/stats/lifecycle.csv (time_to_ready, time_to_queryable, ...)."""
+    os.makedirs(os.path.dirname(LIFECYCLE_CSV), exist_ok=True)
+    file_exists = os.path.isfile(LIFECYCLE_CSV)
+    with open(LIFECYCLE_CSV, mode='a', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        if not file_exists:
+            writer.writerow(["Timestamp", "Database", "Dimension", "Dataset_Size", "Event", "Seconds"])
+        writer.writerow([time.strftime("%Y-%m-%d %H:%M:%S"), db, dimension, dataset_size, event, round(seconds, 3)])
+    print(f"   [Lifecycle] {db} {event}: {seconds:.2f}s")
+
+
 if __name__ == "__main__":
-    check_weaviate()
-    check_milvus()
+    parser = argparse.ArgumentParser(description="Database health check / readiness wait")
+    parser.add_argument("--wait", choices=["milvus", "weaviate"], default=None,
+                        help="Block until the database is ready and record time_to_ready")
+    parser.add_argument("--timeout", type=float, default=READY_TIMEOUT)
+    parser.add_argument("--dim", default="")
+    parser.add_argument("--size", default="")
+    args = parser.parse_args()
+
+    if args.wait:
+        try:
+            seconds = wait_ready(args.wait, args.timeout)
+        except TimeoutError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        record_lifecycle("time_to_ready", seconds, args.wait, args.dim, args.size)
+    else:
+        check_weaviate()
+        check_milvus()
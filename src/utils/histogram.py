@@ -0,0 +1,121 @@
+import json
+import math
+import numpy as np
+
+# Log-bucketed (HDR-style) histogram latencies: σταθερή μνήμη ανεξάρτητα από το πλήθος των δειγμάτων.
+# Το bucket i >= 1 καλύπτει [MIN_VALUE * (1+PRECISION)^(i-1), MIN_VALUE * (1+PRECISION)^i),
+# άρα κάθε percentile έχει σχετικό σφάλμα το πολύ PRECISION. Το bucket 0 κρατάει τιμές < MIN_VALUE.
+MIN_VALUE = 1e-6        # 1 µs
+MAX_VALUE = 1e4         # ό,τι είναι μεγαλύτερο πέφτει στο τελευταίο bucket (min/max μένουν ακριβή)
+PRECISION = 0.01        # 1% σχετικό πλάτος bucket
+FORMAT_VERSION = 1
+
+
+class LatencyHistogram:
+    """Histogram σε seconds. Δύο histograms με ίδια παραμέτρους ενώνονται χωρίς απώλεια (merge),
+    οπότε μπορούν να μετρούν ξεχωριστά threads / processes και να αθροιστούν στο τέλος."""
+
+    def __init__(self, min_value=MIN_VALUE, max_value=MAX_VALUE, precision=PRECISION):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self.buckets = int(math.ceil(math.log(max_value / min_value) / self._log_base)) + 2
+        self.counts = np.zeros(self.buckets, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, value):
+        if value < self.min_value:
+            return 0
+        return min(self.buckets - 1, int(math.log(value / self.min_value) / self._log_base) + 1)
+
+    def _bucket_value(self, index):
+        """Αντιπροσωπευτική τιμή (γεωμετρικό μέσο) του bucket."""
+        if index == 0:
+            return self.min_value / 2
+        return self.min_value * (1 + self.precision) ** (index - 0.5)
+
+    def record(self, value):
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def record_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        safe = np.maximum(values, self.min_value)
+        index = np.floor(np.log(safe / self.min_value) / self._log_base).astype(np.int64) + 1
+        index[values < self.min_value] = 0
+        np.add.at(self.counts, np.minimum(index, self.buckets - 1), 1)
+        self.count += int(values.size)
+        self.total += float(values.sum())
+        self.total_sq += float(np.dot(values, values))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def _compatible(self, other):
+        return (self.min_value, self.max_value, self.precision) == (other.min_value, other.max_value, other.precision)
+
+    def merge(self, other):
+        if not self._compatible(other):
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def reset(self):
+        self.counts[:] = 0
+        self.count = 0
+        self.total = self.total_sq = 0.0
+        self.min, self.max = math.inf, 0.0
+
+    def percentile(self, q):
+        """Η τιμή κάτω από την οποία βρίσκεται το q% των δειγμάτων (±PRECISION)."""
+        if self.count == 0:
+            return None
+        rank = max(1, int(math.ceil(q / 100.0 * self.count)))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(max(self._bucket_value(index), self.min), self.max)
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def std(self):
+        if not self.count:
+            return None
+        mean = self.total / self.count
+        return math.sqrt(max(0.0, self.total_sq / self.count - mean * mean))
+
+    def encode(self):
+        """Συμπαγές JSON (μόνο τα μη μηδενικά buckets) για μία στήλη του CSV."""
+        nonzero = np.flatnonzero(self.counts)
+        return json.dumps({
+            "v": FORMAT_VERSION, "min_value": self.min_value, "max_value": self.max_value, "precision": self.precision,
+            "count": self.count, "sum": self.total, "sum_sq": self.total_sq,
+            "min": self.min if self.count else None, "max": self.max,
+            "buckets": {int(i): int(self.counts[i]) for i in nonzero},
+        }, separators=(",", ":"))
+
+    @classmethod
+    def decode(cls, text):
+        data = json.loads(text)
+        hist = cls(data["min_value"], data["max_value"], data["precision"])
+        for index, count in data["buckets"].items():
+            hist.counts[int(index)] = count
+        hist.count = data["count"]
+        hist.total, hist.total_sq = data["sum"], data["sum_sq"]
+        hist.min = math.inf if data["min"] is None else data["min"]
+        hist.max = data["max"]
+        return hist
@@ -0,0 +1,10 @@
+import uuid
+
+# Η Weaviate θέλει UUID ανά object. Χρησιμοποιούμε το row index του dataset ως UUID,
+# ώστε τα αποτελέσματα να αντιστοιχίζονται πίσω σε ids για τον υπολογισμό του recall.
+
+def row_uuid(row):
+    return str(uuid.UUID(int=int(row)))
+
+def uuid_row(value):
+    return uuid.UUID(value).int
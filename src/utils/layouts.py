@@ -0,0 +1,110 @@
+import os
+import bisect
+import numpy as np
+
+# Layout των δεδομένων για τα filtered workloads (query1 / query3, φίλτρο city_id):
+#   flat:       ένα collection / class, το φίλτρο τρέχει πάνω σε όλες τις γραμμές (default)
+#   pkey:       Milvus partition key στο city_id (num_partitions buckets). Το routing το κάνει ο server
+#               από το expr city_id == X, χωρίς partition_names
+#   partitions: Milvus explicit partitions, μία ανά bucket. Το query στέλνει partition_names=[bucket]
+#   tenants:    Weaviate multi-tenancy, ένας tenant ανά bucket. Το query στέλνει tenant=bucket
+# Bucket μιας πόλης: (city_id - 1) % partitions, οπότε με partitions=1000 κάθε πόλη έχει δικό της
+# partition / tenant. Με λιγότερα buckets μοιράζονται πόλεις και το φίλτρο μένει στο query.
+# Κάθε layout έχει δικό του collection / class (benchmark_128d_pkey16, Benchmark_128d_tenants1000).
+# Τα scripts το ορίζουν με --layout / --partitions. Ως env var (όπως το BENCH_DATASET) περνάει και στα subprocesses.
+LAYOUT_ENV = "BENCH_LAYOUT"
+LAYOUTS = ["flat", "pkey", "partitions", "tenants"]
+ENGINE_LAYOUTS = {"milvus": ["flat", "pkey", "partitions"], "weaviate": ["flat", "tenants"], "local": ["flat"]}
+CITIES = 1000
+DEFAULT_PARTITIONS = {"pkey": 16, "partitions": 64, "tenants": CITIES}
+# Η Milvus 2.4 δέχεται έως 1024 partitions ανά collection
+PARTITION_SWEEP = [16, 64, 256, 1000]
+
+
+def select_layout(kind, partitions=None):
+    if not kind:
+        return
+    if kind == "flat":
+        os.environ.pop(LAYOUT_ENV, None)
+        return
+    if kind not in LAYOUTS:
+        raise ValueError(f"Unknown layout: {kind} (known: {', '.join(LAYOUTS)})")
+    partitions = partitions or DEFAULT_PARTITIONS[kind]
+    if not 1 <= partitions <= CITIES:
+        raise ValueError(f"Partitions must be between 1 and {CITIES}, not {partitions}")
+    os.environ[LAYOUT_ENV] = f"{kind}:{partitions}"
+
+
+def selected_layout():
+    """(kind, partitions) του επιλεγμένου layout, ("flat", 0) αν δεν έχει οριστεί."""
+    value = os.environ.get(LAYOUT_ENV)
+    if not value:
+        return "flat", 0
+    kind, partitions = value.split(":")
+    return kind, int(partitions)
+
+
+def engine_layout(db_type):
+    """Το επιλεγμένο layout αν αφορά το db_type, αλλιώς flat (π.χ. η Weaviate με --layout pkey)."""
+    kind, partitions = selected_layout()
+    return (kind, partitions) if kind in ENGINE_LAYOUTS[db_type] else ("flat", 0)
+
+
+def layout_suffix(db_type):
+    kind, partitions = engine_layout(db_type)
+    return "" if kind == "flat" else f"_{kind}{partitions}"
+
+
+def layout_label(db_type):
+    kind, partitions = engine_layout(db_type)
+    return kind if kind == "flat" else f"{kind}:{partitions}"
+
+
+def partition_name(city_id, partitions):
+    """Το partition / tenant μιας πόλης."""
+    return f"part_{(int(city_id) - 1) % partitions}"
+
+
+def partition_names(partitions):
+    return [f"part_{k}" for k in range(partitions)]
+
+
+def partition_ranges(city_ids, partitions):
+    """Σειρά ingestion ανά bucket: (order, [(name, start, end)]). Το order είναι stable, οπότε μέσα
+    σε κάθε bucket οι γραμμές μένουν με τη σειρά τους. Τα ranges είναι θέσεις στο order (όχι row ids)."""
+    buckets = (np.asarray(city_ids, dtype=np.int64) - 1) % partitions
+    order = np.argsort(buckets, kind="stable")
+    ends = np.cumsum(np.bincount(buckets, minlength=partitions))
+    starts = ends - np.bincount(buckets, minlength=partitions)
+    names = partition_names(partitions)
+    return order, [(names[k], int(s), int(e)) for k, (s, e) in enumerate(zip(starts, ends)) if e > s]
+
+
+def range_at(ranges, position):
+    """(name, end) του range που περιέχει τη θέση position. Τα batches κόβονται στο end."""
+    k = bisect.bisect_right([s for _, s, _ in ranges], position) - 1
+    name, _, end = ranges[k]
+    return name, end
+
+
+class Permuted:
+    """Μια στήλη (memmap, ShardedVectors, codes) με τις γραμμές στη σειρά του order:
+    το slice [s:e] επιστρέφει τις γραμμές order[s:e]. Οι loaders κόβουν slices όπως με ένα array."""
+
+    def __init__(self, column, order):
+        self.column = column
+        self.order = order
+        self.shape = (len(order),) + tuple(getattr(column, "shape", (len(column),))[1:])
+        self.dtype = column.dtype
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            rows = self.order[key]
+            if len(rows) and rows[-1] - rows[0] == len(rows) - 1 and np.all(np.diff(rows) == 1):
+                # Συνεχές κομμάτι (π.χ. ένα bucket με flat σειρά): view αντί για fancy indexing
+                return self.column[int(rows[0]):int(rows[-1]) + 1]
+            return self.column[rows]
+        return self.column[self.order[key]]
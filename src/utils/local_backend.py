@@ -0,0 +1,65 @@
+import os
+import json
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.dataset import Dataset
+from src.utils.ground_truth import exact_topk, payload_masks, BLOCK_ROWS
+from src.utils.metrics import lap
+from src.utils.precision import DecodedVectors, query_as_float32
+
+# "local" backend: exact brute-force search μέσα στο process, χωρίς containers.
+# Δίνει το άνω όριο του recall (πάντα 1.0) και ένα CPU-only baseline για το latency.
+STATE_FILE = "local_backend.json"
+
+
+def load(folder, rows):
+    """Το αντίστοιχο του ingestion + col.load(): σημειώνει πόσες γραμμές περιέχει η "συλλογή"
+    και διαβάζει μία φορά το memmap ώστε τα vectors να είναι στο page cache. Επιστρέφει seconds."""
+    t0 = time.perf_counter()
+    dataset = Dataset(folder)
+    rows = min(rows, dataset.rows)
+    for _, _, chunk in dataset.iter_chunks(0, rows, BLOCK_ROWS):
+        np.asarray(chunk).sum()
+    with open(os.path.join(folder, STATE_FILE), "w") as f:
+        json.dump({"rows": rows}, f)
+    return time.perf_counter() - t0
+
+
+def loaded_rows(folder):
+    path = os.path.join(folder, STATE_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)["rows"]
+
+
+class LocalBackend:
+    """Exact top-k πάνω στις πρώτες rows γραμμές του dataset με blocked matmuls σε ένα κοινό
+    thread pool. Τα φίλτρα εφαρμόζονται ως boolean masks από το payload_mask κάθε workload,
+    ανά query και ανά block (payload_masks), οπότε η μνήμη ενός request δεν εξαρτάται από τις γραμμές.
+    Με precision το search γίνεται πάνω στα codes ενός variant (src/utils/precision.py), αποκωδικοποιημένα
+    ανά block: το recall του δείχνει μόνο την απώλεια της κωδικοποίησης, χωρίς index."""
+
+    def __init__(self, folder, rows=None, workers=None, precision=None):
+        self.folder = folder
+        dataset = Dataset(folder)
+        self.rows = min(rows or loaded_rows(folder) or dataset.rows, dataset.rows)
+        self.precision = precision or "float32"
+        self.params = dataset.precision_params()
+        if self.precision == "float32":
+            self.vectors = dataset.vectors(self.rows)
+        else:
+            self.vectors = DecodedVectors(dataset.vectors(self.rows, self.precision), self.precision, dataset.dim, self.params)
+        self.columns = {name: np.asarray(col[:self.rows]) for name, col in dataset.payloads().items()}
+        self.pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+
+    def search(self, workload, batch, limit=10):
+        """(len(batch), limit) row ids, -1 όπου δεν υπάρχουν αρκετά matches."""
+        queries = query_as_float32(self.precision, [q[0] for q in batch], self.params)
+        masks = payload_masks(workload, batch, self.columns)
+        lap("prepare")
+        return exact_topk(self.vectors, queries, limit, workload.METRIC, self.rows, masks, pool=self.pool)
+
+    def close(self):
+        self.pool.shutdown()
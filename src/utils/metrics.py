@@ -1,77 +1,258 @@
 import time
+import threading
 import psutil
 import numpy as np
 import os
 import csv
+from src.utils.histogram import LatencyHistogram
+
+# Διάρκεια (sec) των per-interval snapshots: δείχνουν αν το latency αλλάζει μέσα σε ένα run (soak, GC, compaction)
+SNAPSHOT_INTERVAL = 1.0
+
+# Client-side breakdown κάθε request. Τα search functions του driver καλούν lap() στο τέλος κάθε φάσης,
+# το "other" είναι ό,τι μένει από το latency (στο open loop: αναμονή για ελεύθερο worker).
+PHASES = {"prepare": "Prepare", "serialize": "Serialize", "wire": "Wire+Server", "decode": "Decode", "other": "Other"}
+CLIENT_PHASES = ["prepare", "serialize", "decode"]
+
+_request = threading.local()
+
+
+def begin_request():
+    _request.laps = {}
+    _request.t = time.perf_counter()
+
+
+def lap(phase):
+    """Ο χρόνος από το προηγούμενο lap (ή το begin_request) χρεώνεται στη φάση. Χωρίς begin_request δεν κάνει τίποτα."""
+    laps = getattr(_request, "laps", None)
+    if laps is None:
+        return
+    now = time.perf_counter()
+    laps[phase] = laps.get(phase, 0.0) + now - _request.t
+    _request.t = now
+
+
+def end_request():
+    laps = getattr(_request, "laps", None)
+    _request.laps = None
+    return laps
 
 class BenchmarkMetrics:
-    def __init__(self):
-        self.latencies = []
+    """Latencies σε log-bucketed histogram (σταθερή μνήμη, merge χωρίς απώλεια μεταξύ threads / processes)
+    και ένα μικρότερο histogram ανά SNAPSHOT_INTERVAL για τα per-interval snapshots.
+    Με resources (cgroups.ResourceSampler) τα CPU / MEM είναι των containers της βάσης για το διάστημα
+    start-stop. Χωρίς αυτόν (local backend, χωρίς cgroup v2) μένει το psutil του client host."""
+
+    def __init__(self, interval=SNAPSHOT_INTERVAL, resources=None):
+        self.interval = interval
+        self.resources = resources if resources is not None and resources.cgroups else None
+        self.histogram = LatencyHistogram()
+        self.phases = {}
         self.cpu_readings = []
         self.memory_readings = []
+        self.intervals = []
+        self.errors = 0
+        self.failed_latencies = 0
         self.start_time = 0
         self.end_time = 0
+        self._window = LatencyHistogram()
+        self._window_start = 0.0
+        self._perf_start = 0.0
+        self._resources_span = (None, None)
+        self._lock = threading.Lock()
 
     def start(self):
-        self.latencies = []
+        self.histogram.reset()
+        self.phases = {}
+        self._window.reset()
         self.cpu_readings = []
         self.memory_readings = []
+        self.intervals = []
+        self.errors = 0
+        self.failed_latencies = 0
         self.start_time = time.time()
+        self._perf_start = self._window_start = time.perf_counter()
+        if self.resources:
+            self._resources_span = (self.resources.elapsed(), None)
 
     def stop(self):
         self.end_time = time.time()
+        if self.resources:
+            self._resources_span = (self._resources_span[0], self.resources.elapsed())
+        with self._lock:
+            self._close_window(time.perf_counter())
+
+    def record_latency(self, seconds, laps=None):
+        """laps: {φάση: seconds} του end_request() για το breakdown του request."""
+        # Καλείται από πολλά worker threads ταυτόχρονα
+        with self._lock:
+            now = time.perf_counter()
+            if now - self._window_start >= self.interval:
+                self._close_window(now)
+            self.histogram.record(seconds)
+            self._window.record(seconds)
+            if laps:
+                for phase, value in laps.items():
+                    self._phase(phase).record(value)
+                self._phase("other").record(max(0.0, seconds - sum(laps.values())))
+
+    def record_error(self, seconds=None):
+        """Ένα αποτυχημένο request. Με seconds (open loop: από τον προγραμματισμένο χρόνο αποστολής μέχρι
+        την αποτυχία) μπαίνει και στο histogram, ώστε timeouts και errors να μένουν στο tail.
+        Επιστρέφει πόσα errors έχουν μετρηθεί."""
+        with self._lock:
+            self.errors += 1
+            if seconds is not None:
+                now = time.perf_counter()
+                if now - self._window_start >= self.interval:
+                    self._close_window(now)
+                self.histogram.record(seconds)
+                self._window.record(seconds)
+                self.failed_latencies += 1
+            return self.errors
 
-    def record_latency(self, seconds):
-        self.latencies.append(seconds)
+    def _phase(self, phase):
+        if phase not in self.phases:
+            self.phases[phase] = LatencyHistogram()
+        return self.phases[phase]
+
+    def _close_window(self, now):
+        window = self._window
+        if window.count:
+            elapsed = now - self._window_start
+            self.intervals.append({
+                "Interval_Start (s)": round(self._window_start - self._perf_start, 3),
+                "Count": window.count,
+                "QPS": round(window.count / elapsed, 2) if elapsed > 0 else 0,
+                "P50 Latency (s)": round(window.percentile(50), 5),
+                "P99 Latency (s)": round(window.percentile(99), 5),
+                "Max Latency (s)": round(window.max, 5),
+            })
+        window.reset()
+        self._window_start = now
+
+    def merge(self, other):
+        """Ενώνει τις μετρήσεις ενός άλλου BenchmarkMetrics (π.χ. από άλλο process) σε αυτό."""
+        self.histogram.merge(other.histogram)
+        for phase, hist in other.phases.items():
+            self._phase(phase).merge(hist)
+        self.cpu_readings += other.cpu_readings
+        self.memory_readings += other.memory_readings
+        self.intervals += other.intervals
+        self.errors += other.errors
+        self.failed_latencies += other.failed_latencies
+        self.start_time = min(self.start_time, other.start_time) if self.start_time else other.start_time
+        self.end_time = max(self.end_time, other.end_time)
+        return self
 
     def sample_system_resources(self):
+        if self.resources:
+            return  # ο sampler μετράει ήδη τα containers στο background
         self.cpu_readings.append(psutil.cpu_percent(interval=None))
         self.memory_readings.append(psutil.virtual_memory().percent)
 
     def get_stats(self):
         """Υπολογίζει τα meaningful statistics"""
         total_time = self.end_time - self.start_time
-        count = len(self.latencies)
-        
+        hist = self.histogram
+        count = hist.count
+
         if count == 0:
             return None
 
-        avg_lat = np.mean(self.latencies)
-        p95_lat = np.percentile(self.latencies, 95) # Το 95% των queries κάτω από αυτό
-        std_dev = np.std(self.latencies)           # Η σταθερότητα της βάσης
-        throughput = count / total_time if total_time > 0 else 0
-        
+        # QPS μόνο από τα επιτυχημένα requests, το Error Rate από όλα
+        succeeded = count - self.failed_latencies
+        throughput = succeeded / total_time if total_time > 0 else 0
+        attempts = succeeded + self.errors
+
         avg_cpu = np.mean(self.cpu_readings) if self.cpu_readings else 0
         avg_mem = np.mean(self.memory_readings) if self.memory_readings else 0
 
-        return {
-            "Avg Latency (s)": round(avg_lat, 5),
-            "P95 Latency (s)": round(p95_lat, 5),
-            "Std Dev (s)": round(std_dev, 5),
+        stats = {
+            "Avg Latency (s)": round(hist.mean(), 5),
+            "P50 Latency (s)": round(hist.percentile(50), 5),
+            "P90 Latency (s)": round(hist.percentile(90), 5),
+            "P95 Latency (s)": round(hist.percentile(95), 5), # Το 95% των queries κάτω από αυτό
+            "P99 Latency (s)": round(hist.percentile(99), 5),
+            "P99.9 Latency (s)": round(hist.percentile(99.9), 5),
+            "Max Latency (s)": round(hist.max, 5),
+            "Std Dev (s)": round(hist.std(), 5),                # Η σταθερότητα της βάσης
             "Throughput (QPS)": round(throughput, 2),
+            "Errors": self.errors,
+            "Error Rate (%)": round(100 * self.errors / attempts, 2) if attempts else 0,
             "Avg CPU (%)": round(avg_cpu, 1),
             "Avg MEM (%)": round(avg_mem, 1)
         }
+        stats.update(self.breakdown_stats())
+        if self.resources:
+            server = self.resources.summary(since=self._resources_span[0], until=self._resources_span[1])
+            if server:
+                del stats["Avg CPU (%)"], stats["Avg MEM (%)"]
+                stats.update(server)
+        return stats
+
+    def breakdown_stats(self):
+        """p50 / p99 ανά φάση και το ποσοστό του μέσου latency που ξοδεύει ο ίδιος ο client."""
+        stats = {}
+        for phase, label in PHASES.items():
+            hist = self.phases.get(phase)
+            if hist and hist.count:
+                stats[f"{label} P50 (s)"] = round(hist.percentile(50), 6)
+                stats[f"{label} P99 (s)"] = round(hist.percentile(99), 6)
+        if stats and self.histogram.total:
+            client = sum(self.phases[p].total for p in CLIENT_PHASES if p in self.phases)
+            stats["Client Share (%)"] = round(100 * client / self.histogram.total, 1)
+        return stats
 
-    def save_to_csv(self, file_path, db_name, dimension, dataset_size):
-        """Αποθηκεύει τα αποτελέσματα στο Master CSV του συγκεκριμένου Query"""
+    def save_to_csv(self, file_path, db_name, dimension, dataset_size, extra=None):
+        """Αποθηκεύει τα αποτελέσματα στο Master CSV του συγκεκριμένου Query.
+        Το extra (π.χ. {"Concurrency": 8}) γράφεται ως επιπλέον στήλες μετά το Dataset_Size.
+        Κάθε γραμμή κρατάει και ολόκληρο το histogram (στήλη "Histogram", LatencyHistogram.decode),
+        ενώ τα per-interval snapshots γράφονται στο <file>_intervals.csv."""
         stats = self.get_stats()
+        extra = extra or {}
         if not stats:
             return
 
-        # Αν ο φάκελος δεν υπάρχει, τον φτιάχνουμε
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        
-        file_exists = os.path.isfile(file_path)
-        
-        with open(file_path, mode='a', newline='') as csvfile:
-            fieldnames = ["Database", "Dimension", "Dataset_Size"] + list(stats.keys())
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-            if not file_exists:
-                writer.writeheader() # Γράφει κεφαλίδες μόνο την πρώτη φορά
-
-            # Συνδυάζουμε τα info με τα στατιστικά
-            row = {"Database": db_name, "Dimension": dimension, "Dataset_Size": dataset_size}
-            row.update(stats)
-            writer.writerow(row)
\ No newline at end of file
+        row = {"Database": db_name, "Dimension": dimension, "Dataset_Size": dataset_size}
+        row.update(extra)
+        row.update(stats)
+        row["Histogram"] = self.histogram.encode()
+        append_row(file_path, row)
+
+        base, ext = os.path.splitext(file_path)
+        for snapshot in self.intervals:
+            interval_row = {"Database": db_name, "Dimension": dimension, "Dataset_Size": dataset_size}
+            interval_row.update(extra)
+            interval_row.update(snapshot)
+            append_row(f"{base}_intervals{ext}", interval_row)
+
+
+def append_row(file_path, row):
+    """Append μίας γραμμής. Αν η γραμμή έχει στήλες που λείπουν από το header του υπάρχοντος αρχείου,
+    το αρχείο ξαναγράφεται με την ένωση των στηλών, ώστε οι παλιές γραμμές να μη "γλιστρήσουν"."""
+    # Αν ο φάκελος δεν υπάρχει, τον φτιάχνουμε
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    fieldnames = list(row.keys())
+
+    if os.path.isfile(file_path):
+        with open(file_path, newline='') as csvfile:
+            reader = csv.DictReader(csvfile)
+            header = reader.fieldnames or []
+            missing = [name for name in fieldnames if name not in header]
+            old_rows = list(reader) if missing else None
+        if old_rows is not None:
+            with open(file_path, mode='w', newline='') as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=header + missing, restval="")
+                writer.writeheader()
+                writer.writerows(old_rows)
+        fieldnames = header + missing
+
+    file_exists = os.path.isfile(file_path)
+    with open(file_path, mode='a', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, restval="")
+
+        if not file_exists:
+            writer.writeheader() # Γράφει κεφαλίδες μόνο την πρώτη φορά
+
+        writer.writerow(row)
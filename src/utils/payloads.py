@@ -0,0 +1,125 @@
+import os
+import json
+import numpy as np
+
+# Columnar payload store: ένα .npy ανά στήλη στο <dataset>/payloads/.
+# Οι loaders κόβουν batches από memmaps, χωρίς json.loads ανά γραμμή στο hot path.
+PAYLOAD_COLUMNS = {
+    "id": np.int64,
+    "city_id": np.int32,
+    "quality_score": np.float32,
+    "category": np.int32,
+    "sel_bucket": np.int32,
+    "corr_bucket": np.int32,
+}
+# Οι στήλες του παλιού payloads.jsonl. Οι υπόλοιπες παράγονται από το write_selectivity_columns
+JSONL_COLUMNS = ["id", "city_id", "quality_score"]
+
+# Στήλες ελεγχόμενης selectivity για το query6:
+#   category:    Zipf (rank 1 το πιο συχνό): ~10% για το 1, ~0.001% για το CATEGORIES
+#   sel_bucket:  ομοιόμορφο στο [0, SELECTIVITY_BUCKETS), "sel_bucket < t" κρατάει t / SELECTIVITY_BUCKETS
+#   corr_bucket: επίσης ομοιόμορφο, αλλά κάθε cluster καταλαμβάνει συνεχόμενο εύρος buckets, οπότε ένα
+#                παράθυρο γύρω από το bucket του query κρατάει τους γείτονές του (correlated) και ένα
+#                παράθυρο στην άλλη άκρη κρατάει μακρινά clusters (anti-correlated)
+SELECTIVITY_COLUMNS = ["category", "sel_bucket", "corr_bucket"]
+SELECTIVITY_BUCKETS = 100_000
+CATEGORIES = 10_000
+CATEGORY_SKEW = 1.0
+# Scalar indexes της Milvus για το query6 (INVERTED για ισότητες, STL_SORT για ranges)
+SCALAR_INDEXES = {"category": "INVERTED", "sel_bucket": "STL_SORT", "corr_bucket": "STL_SORT"}
+
+CONVERT_CHUNK = 100_000
+DEFAULT_SEED = 42
+
+
+def payload_dir(folder):
+    return os.path.join(folder, "payloads")
+
+
+def write_column(folder, name, values):
+    """Γράφει μία στήλη ατομικά (tmp + rename), ώστε ένα μισό αρχείο να μη μοιάζει με έτοιμο cache."""
+    os.makedirs(payload_dir(folder), exist_ok=True)
+    path = os.path.join(payload_dir(folder), f"{name}.npy")
+    tmp = path + ".tmp.npy"
+    np.save(tmp, np.asarray(values, dtype=PAYLOAD_COLUMNS.get(name, None)))
+    os.replace(tmp, path)
+
+
+def convert_jsonl(folder):
+    """Μετατρέπει μία φορά το payloads.jsonl σε στήλες .npy."""
+    jsonl = os.path.join(folder, "payloads.jsonl")
+    print(f"   [Payloads] Converting {jsonl} to columnar .npy (one-off)...")
+    columns = {name: [] for name in JSONL_COLUMNS}
+    with open(jsonl, "r") as f:
+        while True:
+            lines = f.readlines(CONVERT_CHUNK * 64)
+            if not lines: break
+            records = [json.loads(line) for line in lines]
+            for name in JSONL_COLUMNS:
+                columns[name].append(np.fromiter((r[name] for r in records), dtype=PAYLOAD_COLUMNS[name], count=len(records)))
+
+    for name, chunks in columns.items():
+        write_column(folder, name, np.concatenate(chunks) if chunks else [])
+
+
+def zipf_categories(rng, count):
+    """count τιμές στο [1, CATEGORIES] με P(k) ~ 1 / k^CATEGORY_SKEW."""
+    weights = 1.0 / np.arange(1, CATEGORIES + 1) ** CATEGORY_SKEW
+    cdf = np.cumsum(weights / weights.sum())
+    return np.minimum(np.searchsorted(cdf, rng.random(count)), CATEGORIES - 1) + 1
+
+
+def cluster_order_keys(folder, rng):
+    """Ένα float ανά γραμμή: γραμμές του ίδιου cluster (clusters.npy) έχουν κλειδιά στο [label, label+1).
+    Χωρίς clusters (uniform dataset) η προβολή κάθε vector σε μία τυχαία κατεύθυνση: κοντινά vectors,
+    κοντινά κλειδιά."""
+    label_file = os.path.join(folder, "clusters.npy")
+    if os.path.exists(label_file):
+        labels = np.load(label_file, mmap_mode="r")
+        return labels + rng.random(len(labels))
+    from src.utils.dataset import Dataset  # το dataset.py κάνει import αυτό το module
+    dataset = Dataset(folder)
+    direction = rng.standard_normal(dataset.dim).astype(np.float32)
+    keys = np.empty(dataset.rows, dtype=np.float64)
+    for start, end, chunk in dataset.iter_chunks():
+        keys[start:end] = np.asarray(chunk, dtype=np.float32) @ direction
+    return keys
+
+
+def write_selectivity_columns(folder, seed=None):
+    """Παράγει category / sel_bucket / corr_bucket. Ντετερμινιστικά από το seed του generation.json,
+    ώστε και τα παλιά datasets να αποκτούν τις ίδιες στήλες την πρώτη φορά που ζητηθούν."""
+    if seed is None:
+        generation = os.path.join(folder, "generation.json")
+        seed = DEFAULT_SEED
+        if os.path.exists(generation):
+            with open(generation) as f:
+                seed = json.load(f).get("seed", DEFAULT_SEED)
+    id_file = os.path.join(payload_dir(folder), "id.npy")
+    if not os.path.exists(id_file):
+        convert_jsonl(folder)
+    total = len(np.load(id_file, mmap_mode="r"))
+    print(f"   [Payloads] Writing selectivity columns for {total:,} rows...")
+    rng = np.random.default_rng([seed, 0x5E1])
+
+    write_column(folder, "category", zipf_categories(rng, total))
+    write_column(folder, "sel_bucket", rng.integers(0, SELECTIVITY_BUCKETS, size=total))
+
+    # Ταξινόμηση κατά cluster: η γραμμή με rank r παίρνει bucket r * BUCKETS / total (ομοιόμορφο περιθώριο)
+    order = np.argsort(cluster_order_keys(folder, rng), kind="stable")
+    corr = np.empty(total, dtype=np.int64)
+    corr[order] = np.arange(total, dtype=np.int64) * SELECTIVITY_BUCKETS // total
+    write_column(folder, "corr_bucket", corr)
+
+
+def load_payloads(folder, columns=None):
+    """Dict {στήλη: read-only memmap}. Αν λείπουν οι βασικές στήλες, τις φτιάχνει από το payloads.jsonl,
+    αν λείπουν οι στήλες selectivity, τις παράγει."""
+    columns = columns or list(PAYLOAD_COLUMNS)
+    paths = {name: os.path.join(payload_dir(folder), f"{name}.npy") for name in columns}
+    missing = [name for name, p in paths.items() if not os.path.exists(p)]
+    if any(name in JSONL_COLUMNS for name in missing):
+        convert_jsonl(folder)
+    if any(name in SELECTIVITY_COLUMNS for name in missing):
+        write_selectivity_columns(folder)
+    return {name: np.load(path, mmap_mode="r") for name, path in paths.items()}
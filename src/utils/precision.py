@@ -0,0 +1,116 @@
+import os
+import numpy as np
+
+# Προαιρετικό: η pymilvus δέχεται BFLOAT16_VECTOR μόνο ως numpy arrays με dtype bfloat16 (ml_dtypes)
+try:
+    import ml_dtypes
+except ImportError:
+    ml_dtypes = None
+
+# Reduced-precision / quantized αντίγραφα των vectors ενός dataset, δίπλα στα float32:
+#   <dataset>/precision/<variant>.npy  (ή <variant>/shard_*.npy, με τα ίδια όρια γραμμών με τα float32 shards)
+#   <dataset>/precision/params.npz      min / max / mean ανά διάσταση (για int8 και binary)
+# και στο manifest "precisions": {"float16": {"dtype": "float16", "shards": [...]}, ...}.
+# Queries, query sets και ground truth μένουν float32: το recall κάθε variant μετριέται έναντι του float32 top-k.
+#   float16:  IEEE half
+#   bfloat16: τα πάνω 16 bits του float32 (round to nearest even), ως uint16 αφού το numpy δεν έχει bfloat16
+#   int8:     scalar quantization ανά διάσταση, [min, max] -> [-128, 127]
+#   binary:   ένα bit ανά διάσταση (x > mean της διάστασης), packed σε dim / 8 bytes
+PRECISIONS = ["float32", "float16", "bfloat16", "int8", "binary"]
+STORAGE_DTYPES = {"float16": np.float16, "bfloat16": np.uint16, "int8": np.int8, "binary": np.uint8}
+PRECISION_DIR = "precision"
+PARAMS_FILE = os.path.join(PRECISION_DIR, "params.npz")
+
+
+def vector_bytes(precision, dim):
+    """Bytes ανά vector χωρίς index overhead."""
+    if precision == "binary":
+        return (dim + 7) // 8
+    return dim * {"float32": 4, "float16": 2, "bfloat16": 2, "int8": 1}[precision]
+
+
+def column_stats(chunks, dim):
+    """min / max / mean ανά διάσταση σε ένα πέρασμα πάνω στα (start, end, vectors) chunks."""
+    lo = np.full(dim, np.inf, dtype=np.float32)
+    hi = np.full(dim, -np.inf, dtype=np.float32)
+    total = np.zeros(dim, dtype=np.float64)
+    rows = 0
+    for start, end, chunk in chunks:
+        chunk = np.asarray(chunk, dtype=np.float32)
+        np.minimum(lo, chunk.min(axis=0), out=lo)
+        np.maximum(hi, chunk.max(axis=0), out=hi)
+        total += chunk.sum(axis=0, dtype=np.float64)
+        rows += end - start
+    return {"min": lo, "max": hi, "mean": (total / max(rows, 1)).astype(np.float32)}
+
+
+def _int8_scale(params):
+    return np.maximum(params["max"] - params["min"], 1e-12) / 255.0
+
+
+def encode(precision, vectors, params=None):
+    """float32 (n, dim) -> codes στον τύπο αποθήκευσης του variant."""
+    x = np.asarray(vectors, dtype=np.float32)
+    if precision == "float32":
+        return x
+    if precision == "float16":
+        return x.astype(np.float16)
+    if precision == "bfloat16":
+        bits = np.ascontiguousarray(x).view(np.uint32)
+        return ((bits + 0x7FFF + ((bits >> 16) & 1)) >> 16).astype(np.uint16)
+    if precision == "int8":
+        codes = np.rint((x - params["min"]) / _int8_scale(params)) - 128
+        return np.clip(codes, -128, 127).astype(np.int8)
+    if precision == "binary":
+        return np.packbits(x > params["mean"], axis=-1)
+    raise ValueError(f"Unknown precision: {precision}")
+
+
+def as_float32(precision, codes, dim, params=None):
+    """codes -> float32 για exact search (local backend). Το binary γίνεται ±1, όπου
+    ||a - b||^2 = 4 * Hamming(a, b), οπότε το L2 top-k είναι το Hamming top-k."""
+    codes = np.asarray(codes)
+    if precision == "float32":
+        return codes.astype(np.float32, copy=False)
+    if precision == "float16":
+        return codes.astype(np.float32)
+    if precision == "bfloat16":
+        return (codes.astype(np.uint32) << 16).view(np.float32)
+    if precision == "int8":
+        return (codes.astype(np.float32) + 128) * _int8_scale(params) + params["min"]
+    if precision == "binary":
+        return np.unpackbits(codes, axis=-1, count=dim).astype(np.float32) * 2 - 1
+    raise ValueError(f"Unknown precision: {precision}")
+
+
+def query_as_float32(precision, queries, params=None):
+    """Τα queries όπως τα συγκρίνει το search ενός variant: με την κωδικοποίηση των vectors, εκτός από
+    το int8, όπου (όπως στο IVF_SQ8 και στο SQ της Weaviate) το query μένει float32."""
+    queries = np.asarray(queries, dtype=np.float32)
+    if precision in ("float32", "int8"):
+        return queries
+    return as_float32(precision, encode(precision, queries, params), queries.shape[1], params)
+
+
+def bfloat16_rows(codes):
+    """uint16 bits -> γραμμές με dtype bfloat16 (χωρίς αντιγραφή), όπως τις θέλει η pymilvus."""
+    if ml_dtypes is None:
+        raise ImportError("bfloat16 vectors need the ml_dtypes package (pip install ml_dtypes)")
+    return list(np.ascontiguousarray(codes).view(ml_dtypes.bfloat16))
+
+
+class DecodedVectors:
+    """Slices ενός variant ως float32 (as_float32), με το interface που περιμένει το exact_topk."""
+
+    def __init__(self, codes, precision, dim, params=None):
+        self.codes = codes
+        self.precision = precision
+        self.params = params
+        self.shape = (len(codes), dim)
+        self.nbytes = len(codes) * vector_bytes(precision, dim)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        return as_float32(self.precision, self.codes[key], self.shape[1], self.params)
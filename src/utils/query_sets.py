@@ -0,0 +1,52 @@
+import os
+import json
+import shutil
+import numpy as np
+
+# Persisted query sets: τα queries ενός workload φτιάχνονται μία φορά ανά (dataset, γενιά, rows, seed) και
+# ξαναδιαβάζονται από όλα τα runs και όλες τις βάσεις. Ένας φάκελος ανά set στο <dataset>/query_sets/:
+#   vectors.npy  (count, dim) float32
+#   params.npz   μία στήλη ανά θέση φίλτρου του query tuple (p1, p2, ...)
+#   meta.json    workload, rows, seed, count, fingerprint
+# Η γενιά (Dataset.fingerprint) είναι στο όνομα του φακέλου: ένα dataset που ξαναγράφτηκε παίρνει νέα sets.
+# Τα queries στη μνήμη μένουν tuples (vector list, *φίλτρα), όπως τα φτιάχνει το build_queries.
+QUERY_SETS_DIR = "query_sets"
+
+
+def query_set_path(folder, name, rows, seed, fingerprint):
+    return os.path.join(folder, QUERY_SETS_DIR, f"{name}_{rows}r_s{seed}_{fingerprint}")
+
+
+def save_query_set(path, queries, **meta):
+    """Ατομικά (tmp φάκελος + rename), ώστε ένα μισογραμμένο set να μη διαβαστεί ποτέ."""
+    tmp = path + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "vectors.npy"), np.asarray([q[0] for q in queries], dtype=np.float32))
+    width = len(queries[0]) - 1
+    np.savez(os.path.join(tmp, "params.npz"), **{f"p{i}": np.asarray([q[i] for q in queries]) for i in range(1, width + 1)})
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(dict(meta, count=len(queries), width=width), f, indent=2)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+
+
+def query_set_meta(path):
+    meta_file = os.path.join(path, "meta.json")
+    if not os.path.exists(meta_file):
+        return None
+    with open(meta_file) as f:
+        return json.load(f)
+
+
+def load_query_set(path, count=None):
+    """Τα πρώτα count queries, ή None αν το set δεν υπάρχει ή έχει λιγότερα. Τα seeded build_queries
+    παράγουν τα ίδια πρώτα queries για κάθε count, οπότε ένα μεγαλύτερο set καλύπτει και τα μικρότερα."""
+    meta = query_set_meta(path)
+    if meta is None or (count is not None and meta["count"] < count):
+        return None
+    count = meta["count"] if count is None else count
+    vectors = np.load(os.path.join(path, "vectors.npy"))[:count]
+    with np.load(os.path.join(path, "params.npz")) as params:
+        columns = [params[f"p{i}"][:count].tolist() for i in range(1, meta["width"] + 1)]
+    return [(vector, *values) for vector, *values in zip(vectors.tolist(), *columns)]
@@ -0,0 +1,22 @@
+import os
+import json
+
+# Ενιαίος πίνακας μεγεθών για ingestion, queries, ground truth και suite.
+# Με τη σειρά: το growth mode περνάει από κάθε checkpoint προσθέτοντας μόνο τις γραμμές που λείπουν.
+SIZES = {"small": 100_000, "medium": 500_000, "big": 2_500_000}
+
+# Επιπλέον tiers χωρίς αλλαγή κώδικα, π.χ. data/sizes.json: {"xl": 50000000, "xxl": 100000000}
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+SIZES_FILE = os.path.join(CURRENT_DIR, "../../data/sizes.json")
+if os.path.exists(SIZES_FILE):
+    with open(SIZES_FILE) as f:
+        SIZES.update(json.load(f))
+    SIZES = dict(sorted(SIZES.items(), key=lambda item: item[1]))
+
+SIZE_NAMES = list(SIZES)
+
+
+def size_rows(size, available=None):
+    """Γραμμές για ένα size, περιορισμένες στις διαθέσιμες του dataset αν δοθούν."""
+    rows = SIZES[size]
+    return rows if available is None else min(rows, available)
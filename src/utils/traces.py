@@ -0,0 +1,51 @@
+import os
+import json
+import time
+import numpy as np
+
+# Trace ενός run: JSONL με μία γραμμή header και μία γραμμή ανά request,
+#   {"trace": 1, "workload": ..., "query_set": ..., "nq": 1, "batches": 100, ...}
+#   {"t": 0.0131, "b": 7}
+# t: seconds από την αρχή του run που στάλθηκε (closed loop) ή προγραμματίστηκε (open loop) το request,
+# b: index στο make_batches(query set, nq, batches). Το replay στέλνει τα ίδια batches στα ίδια offsets
+# (ή με speed x ρυθμό) σε οποιοδήποτε backend.
+FORMAT_VERSION = 1
+TRACES_DIR = "results/traces"
+
+
+class TraceRecorder:
+    """Καταγράφει (offset, batch) από πολλά worker threads. Το list.append είναι atomic, οπότε δεν
+    χρειάζεται lock στο hot path. Το start() ορίζει το μηδέν του χρόνου."""
+
+    def __init__(self, path, **header):
+        self.path = path
+        self.header = header
+        self.events = []
+        self._t0 = 0.0
+
+    def start(self, t0=None):
+        self.events = []
+        self._t0 = time.perf_counter() if t0 is None else t0
+
+    def record(self, batch, t=None):
+        self.events.append(((time.perf_counter() if t is None else t) - self._t0, batch))
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        events = sorted(self.events)
+        with open(self.path, "w") as f:
+            f.write(json.dumps(dict(self.header, trace=FORMAT_VERSION, requests=len(events))) + "\n")
+            f.write("".join(f'{{"t": {t:.6f}, "b": {b}}}\n' for t, b in events))
+        return self.path
+
+
+def load_trace(path):
+    """(header, offsets array, batch indexes array)"""
+    with open(path) as f:
+        header = json.loads(f.readline())
+        if header.get("trace") != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} trace")
+        events = [json.loads(line) for line in f if line.strip()]
+    offsets = np.array([e["t"] for e in events], dtype=np.float64)
+    batches = np.array([e["b"] for e in events], dtype=np.int64)
+    return header, offsets, batches
@@ -0,0 +1,83 @@
+import csv
+import os
+import sys
+import time
+
+# --- PATH CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../"))
+sys.path.append(PROJECT_ROOT)
+from src.utils import cgroups
+
+# Ψεύτικο cgroup v2 tree: <root>/<container>/{memory.current, cpu.stat, io.stat},
+# όπως το βρίσκει το container_cgroup() χωρίς docker.
+MIB = 2**20
+
+
+def write_cgroup(folder, memory, usage_usec, devices):
+    """devices: [(major:minor, rbytes, wbytes)]"""
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, "memory.current"), "w") as f:
+        f.write(f"{memory}\n")
+    with open(os.path.join(folder, "cpu.stat"), "w") as f:
+        f.write(f"usage_usec {usage_usec}\nuser_usec {usage_usec * 2 // 3}\nsystem_usec {usage_usec // 3}\n"
+                f"nr_periods 0\nnr_throttled 0\nthrottled_usec 0\n")
+    with open(os.path.join(folder, "io.stat"), "w") as f:
+        for device, rbytes, wbytes in devices:
+            f.write(f"{device} rbytes={rbytes} wbytes={wbytes} rios=1 wios=2 dbytes=0 dios=0\n")
+
+
+def test_parsers(tmp_path):
+    folder = tmp_path / "milvus_db"
+    write_cgroup(folder, 512 * MIB, 1_500_000, [("8:0", 4096, 8192), ("259:0", 1000, 0)])
+    assert cgroups.container_cgroup("milvus_db", str(tmp_path)) == str(folder)
+    assert cgroups.read_memory_current(folder) == 512 * MIB
+    assert cgroups.read_cpu_usage(folder) == 1_500_000
+    assert cgroups.read_io_bytes(folder) == (5096, 8192)
+
+    os.remove(folder / "io.stat")
+    assert cgroups.read_io_bytes(folder) == (0, 0)
+
+
+def test_parse_size():
+    assert cgroups.parse_size("8G") == 8 * 1024**3
+    assert cgroups.parse_size("512MB") == 512 * 1000**2
+    assert cgroups.parse_size("1.5GiB") == int(1.5 * 1024**3)
+    assert cgroups.parse_size(1024) == 1024
+
+
+def test_sampler(tmp_path):
+    root = tmp_path / "cgroup"
+    folder = root / "weaviate_db"
+    write_cgroup(folder, 100 * MIB, 0, [("8:0", 0, 0)])
+    output = tmp_path / "resources.csv"
+
+    sampler = cgroups.ResourceSampler(["weaviate_db", "missing_db"], interval=0.05, root=str(root), output=str(output))
+    assert list(sampler.cgroups) == ["weaviate_db"]
+    with sampler:
+        with cgroups.phase("ingest"):
+            time.sleep(0.3)
+            # 1 s CPU και 10 / 20 MiB IO μέσα σε ένα interval: ένα δείγμα με CPU > 0 και IO > 0
+            write_cgroup(folder, 300 * MIB, 1_000_000, [("8:0", 10 * MIB, 20 * MIB)])
+            time.sleep(0.3)
+        time.sleep(0.2)
+
+    assert sampler.phases()[0] == "ingest"
+    ingest = [s for s in sampler.samples if s["Phase"] == "ingest"]
+    assert ingest and all(s["Container"] == "weaviate_db" for s in ingest)
+    assert ingest[0]["CPU (%)"] == 0 and ingest[0]["Memory (MiB)"] == 100
+    assert max(s["CPU (%)"] for s in ingest) > 0
+    assert max(s["Read (MiB/s)"] for s in ingest) > 0
+    assert max(s["Write (MiB/s)"] for s in ingest) > max(s["Read (MiB/s)"] for s in ingest)
+
+    stats = sampler.summary("ingest")
+    assert stats["Server Peak MEM (MiB)"] == 300
+    assert stats["Server Max CPU (%)"] > stats["Server Avg CPU (%)"] > 0
+    assert sampler.summary("missing") is None
+
+    # Το CSV έχει ένα row ανά δείγμα, με τις στήλες του SAMPLE_FIELDS
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == len(sampler.samples)
+    assert list(rows[0]) == cgroups.SAMPLE_FIELDS
+    assert float(rows[0]["Memory (MiB)"]) == 100
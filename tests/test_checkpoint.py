@@ -0,0 +1,85 @@
+import os
+import sys
+import pytest
+
+# --- PATH CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../"))
+sys.path.append(PROJECT_ROOT)
+from src.ingestion.checkpoint import Checkpoint, ingest_resumable, resume_point
+
+# Το live είναι το πλήθος γραμμών στη βάση (None = δεν υπάρχει collection), όπως το δίνει το live_count
+SMALL, MEDIUM = 100_000, 500_000
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return Checkpoint("milvus", "benchmark_128d", MEDIUM, directory=str(tmp_path))
+
+
+def test_fresh_load(checkpoint):
+    # Χωρίς checkpoint και χωρίς --append: πάντα drop + create, ό,τι κι αν έχει η βάση
+    assert resume_point(checkpoint, None, MEDIUM, False) == (None, None)
+    assert resume_point(checkpoint, SMALL, MEDIUM, False) == (None, None)
+    assert resume_point(checkpoint, None, MEDIUM, True) == (None, None)
+    assert resume_point(checkpoint, 0, MEDIUM, True) == (None, None)
+
+
+def test_resume_from_checkpoint(checkpoint):
+    checkpoint.save(0, 250_000, 12.5)
+    # Η βάση έχει ό,τι επιβεβαίωσε το checkpoint (ή και μέρος του επόμενου segment): συνέχεια από το offset
+    for live in (250_000, 260_000):
+        start, state = resume_point(checkpoint, live, MEDIUM, False)
+        assert start == 0 and state["offset"] == 250_000 and state["active_seconds"] == 12.5
+    # Το checkpoint υπερισχύει του growth offset
+    start, state = resume_point(checkpoint, 260_000, MEDIUM, True)
+    assert (start, state["offset"]) == (0, 250_000)
+
+
+def test_stale_checkpoint(checkpoint):
+    checkpoint.save(0, 250_000, 12.5)
+    # Drop του collection / σβησμένο volume μετά το checkpoint: φρέσκο load, όχι resume σε κενή βάση
+    assert resume_point(checkpoint, None, MEDIUM, False) == (None, None)
+    assert resume_point(checkpoint, 0, MEDIUM, False) == (None, None)
+    assert resume_point(checkpoint, 100_000, MEDIUM, False) == (None, None)
+    # Checkpoint άλλου target (άλλο size) δεν ισχύει
+    other = Checkpoint("milvus", "benchmark_128d", SMALL, directory=os.path.dirname(checkpoint.path))
+    assert other.load() is None
+    assert resume_point(other, 250_000, SMALL, False) == (None, None)
+
+
+def test_append_growth(checkpoint):
+    # small -> medium: συνέχεια από τις γραμμές που υπάρχουν ήδη
+    assert resume_point(checkpoint, SMALL, MEDIUM, True) == (SMALL, None)
+    # Ήδη γεμάτο: τίποτα να σταλεί, αλλά όχι drop
+    assert resume_point(checkpoint, MEDIUM, MEDIUM, True) == (MEDIUM, None)
+    # Περισσότερες γραμμές από το target (π.χ. large -> medium): πλήρες reload
+    assert resume_point(checkpoint, MEDIUM + 1, MEDIUM, True) == (None, None)
+
+
+def test_ingest_resumable(checkpoint):
+    """Ένα segment αποτυγχάνει: ξανατρέχει από το checkpoint με overlap, χωρίς διπλές ή χαμένες γραμμές."""
+    calls, saved = [], []
+
+    def ingest(s, e, overlap):
+        state = checkpoint.load()
+        saved.append(state and state["offset"])
+        calls.append((s, e, overlap))
+        if (s, overlap) == (200, False):
+            raise ConnectionError("container restarted")
+
+    result = ingest_resumable(checkpoint, 0, 400, ingest, lambda: 1.0, segment=100)
+    assert calls == [(0, 100, False), (100, 200, False), (200, 300, False), (200, 300, True), (300, 400, False)]
+    assert saved == [None, 100, 200, 200, 300]
+    assert (result["rows"], result["restarts"], result["downtime"] >= 1.0) == (400, 1, True)
+    assert checkpoint.load() is None  # cleared στο τέλος
+
+
+def test_ingest_resumed_state(checkpoint):
+    # Resume μετά από crash: το πρώτο segment μπορεί να έχει ήδη γραφτεί εν μέρει (overlap=True)
+    calls = []
+    state = {"start": 0, "offset": 200, "active_seconds": 3.0}
+    result = ingest_resumable(checkpoint, 0, 400, lambda s, e, overlap: calls.append((s, e, overlap)),
+                              lambda: 0.0, state=state, segment=100)
+    assert calls == [(200, 300, True), (300, 400, False)]
+    assert result["rows"] == 400 and result["active_seconds"] >= 3.0
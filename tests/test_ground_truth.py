@@ -0,0 +1,130 @@
+import os
+import sys
+import types
+import numpy as np
+import pytest
+
+# --- PATH CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../"))
+sys.path.append(PROJECT_ROOT)
+from src.utils import ground_truth
+from src.utils.dataset import write_manifest
+from src.utils.payloads import write_column, write_selectivity_columns
+
+# Μικρός τυχαίος πίνακας, σε πολλά blocks (BLOCK_ROWS=64), απέναντι σε ένα πλήρες np.argsort
+ROWS, DIM, QUERIES, K = 1000, 16, 8, 10
+CITIES = 20
+
+
+def city_workload(metric="L2"):
+    """Workload σαν το query1_city (φίλτρο city_id == query[1]) χωρίς τους clients των βάσεων."""
+    return types.SimpleNamespace(
+        METRIC=metric, RESULTS_FILE="results/stats/query1_city_filter.csv",
+        milvus_expr=lambda q: f"city_id == {q[1]}",
+        payload_mask=lambda q, columns: columns["city_id"] == q[1])
+
+
+def pure_workload(metric="L2"):
+    return types.SimpleNamespace(
+        METRIC=metric, RESULTS_FILE="results/stats/query4_pure_l2.csv",
+        milvus_expr=lambda q: None, payload_mask=lambda q, columns: None)
+
+
+def brute_force(vectors, queries, k, metric, mask=None):
+    vectors, queries = vectors.astype(np.float64), queries.astype(np.float64)
+    if metric == "IP":
+        dist = -(queries @ vectors.T)
+    else:
+        dist = ((queries[:, None, :] - vectors[None, :, :]) ** 2).sum(axis=2)
+    if mask is not None:
+        dist[~mask] = np.inf
+    ids = np.argsort(dist, axis=1, kind="stable")[:, :k]
+    ids[np.isinf(np.take_along_axis(dist, ids, axis=1))] = -1
+    return ids
+
+
+@pytest.fixture
+def data(monkeypatch):
+    monkeypatch.setattr(ground_truth, "BLOCK_ROWS", 64)
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((ROWS, DIM)).astype(np.float32)
+    queries = rng.standard_normal((QUERIES, DIM)).astype(np.float32)
+    cities = rng.integers(1, CITIES + 1, ROWS).astype(np.int32)
+    return vectors, queries, cities
+
+
+@pytest.mark.parametrize("metric", ["L2", "IP"])
+def test_exact_topk(data, metric):
+    vectors, queries, _ = data
+    expected = brute_force(vectors, queries, K, metric)
+    assert np.array_equal(ground_truth.exact_topk(vectors, queries, K, metric, workers=4), expected)
+
+    # limit: μόνο οι πρώτες γραμμές, και όχι πολλαπλάσιο του block
+    limit = 300
+    expected = brute_force(vectors[:limit], queries, K, metric)
+    assert np.array_equal(ground_truth.exact_topk(vectors, queries, K, metric, limit=limit), expected)
+
+
+@pytest.mark.parametrize("metric", ["L2", "IP"])
+def test_masked_topk(data, metric):
+    vectors, queries, cities = data
+    workload = city_workload(metric)
+    batch = [(q.tolist(), i % CITIES + 1) for i, q in enumerate(queries)]
+    # Μία πόλη χωρίς γραμμές: όλες οι θέσεις -1
+    batch[-1] = (batch[-1][0], CITIES + 1)
+    dense = np.stack([cities == q[1] for q in batch])
+    expected = brute_force(vectors, queries, K, metric, dense)
+    assert (expected[-1] == -1).all()
+
+    # Ολόκληρος bool πίνακας και masks ανά block δίνουν το ίδιο αποτέλεσμα με το argsort
+    assert np.array_equal(ground_truth.exact_topk(vectors, queries, K, metric, masks=dense), expected)
+    masks = ground_truth.payload_masks(workload, batch, {"city_id": cities})
+    assert callable(masks)
+    assert np.array_equal(masks(100, 164), dense[:, 100:164])
+    assert np.array_equal(ground_truth.exact_topk(vectors, queries, K, metric, masks=masks), expected)
+
+    assert ground_truth.payload_masks(pure_workload(metric), batch, {"city_id": cities}) is None
+
+
+def write_dataset(folder, vectors, cities):
+    """Όλες οι payload στήλες από πριν, όπως τις γράφει το generate_data.py."""
+    os.makedirs(folder, exist_ok=True)
+    np.save(os.path.join(folder, "vectors.npy"), vectors)
+    write_manifest(folder, vectors.shape[1], [("vectors.npy", len(vectors))])
+    write_column(folder, "id", np.arange(len(vectors)))
+    write_column(folder, "city_id", cities)
+    write_column(folder, "quality_score", np.zeros(len(vectors)))
+    write_selectivity_columns(folder, seed=0)
+
+
+def test_cache(data, tmp_path, monkeypatch):
+    vectors, queries, cities = data
+    folder = str(tmp_path / "exp_test")
+    write_dataset(folder, vectors, cities)
+    calls = []
+    exact_topk = ground_truth.exact_topk
+    monkeypatch.setattr(ground_truth, "exact_topk", lambda *a, **kw: calls.append(1) or exact_topk(*a, **kw))
+
+    workload = city_workload()
+    batch = [(q.tolist(), i % CITIES + 1) for i, q in enumerate(queries)]
+    first = ground_truth.ground_truth(folder, workload, batch, ROWS, K)
+    assert len(calls) == 1
+    assert np.array_equal(first, brute_force(vectors, queries, K, "L2", np.stack([cities == q[1] for q in batch])))
+
+    # Ίδιο dataset, ίδια queries: από το cache
+    assert np.array_equal(ground_truth.ground_truth(folder, workload, batch, ROWS, K), first)
+    assert len(calls) == 1
+    # Άλλο limit: άλλο κλειδί
+    ground_truth.ground_truth(folder, workload, batch, 500, K)
+    assert len(calls) == 2
+
+    # Νέα γενιά του dataset (ξαναγραμμένα vectors): νέο fingerprint, το παλιό cache δεν διαβάζεται
+    regenerated = np.random.default_rng(1).standard_normal((ROWS, DIM)).astype(np.float32)
+    write_dataset(folder, regenerated, cities)
+    stat = os.stat(os.path.join(folder, "vectors.npy"))
+    os.utime(os.path.join(folder, "vectors.npy"), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    second = ground_truth.ground_truth(folder, workload, batch, ROWS, K)
+    assert len(calls) == 3
+    assert np.array_equal(second, brute_force(regenerated, queries, K, "L2", np.stack([cities == q[1] for q in batch])))
+    assert len(os.listdir(os.path.join(folder, "ground_truth"))) == 3
@@ -0,0 +1,79 @@
+import copy
+import math
+import os
+import sys
+import numpy as np
+import pytest
+
+# --- PATH CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../"))
+sys.path.append(PROJECT_ROOT)
+from src.utils.histogram import LatencyHistogram, PRECISION, MIN_VALUE
+
+PERCENTILES = [1, 10, 50, 90, 95, 99, 99.9, 100]
+
+
+def latencies(seed, size=20_000):
+    """Lognormal γύρω στα ~5ms με λίγες τιμές κάτω από 1 µs, όπως ένα πραγματικό run με ουρά."""
+    rng = np.random.default_rng(seed)
+    return np.concatenate([rng.lognormal(math.log(5e-3), 1.0, size), rng.uniform(0, MIN_VALUE, 10)])
+
+
+def histogram(values):
+    hist = LatencyHistogram()
+    hist.record_many(values)
+    return hist
+
+
+def same(a, b):
+    return (np.array_equal(a.counts, b.counts) and a.count == b.count and a.min == b.min and a.max == b.max
+            and math.isclose(a.total, b.total) and math.isclose(a.total_sq, b.total_sq))
+
+
+def test_record_matches_record_many():
+    values = latencies(0, 2_000)
+    one = LatencyHistogram()
+    for v in values:
+        one.record(float(v))
+    assert same(one, histogram(values))
+
+
+def test_percentile_within_one_bucket():
+    values = latencies(1)
+    hist = histogram(values)
+    for q in PERCENTILES:
+        # Nearest rank, όπως το percentile() του histogram
+        exact = np.percentile(values, q, method="inverted_cdf")
+        if exact < MIN_VALUE:
+            continue
+        assert abs(hist.percentile(q) - exact) <= PRECISION * exact, q
+    assert hist.percentile(100) == values.max()
+    assert hist.mean() == pytest.approx(values.mean())
+    assert hist.std() == pytest.approx(values.std())
+    assert LatencyHistogram().percentile(50) is None
+
+
+def test_merge_associative():
+    a, b, c = (histogram(latencies(seed)) for seed in (2, 3, 4))
+    left = copy.deepcopy(a).merge(b).merge(c)
+    right = copy.deepcopy(a).merge(copy.deepcopy(b).merge(c))
+    assert same(left, right)
+    # Ίδιο αποτέλεσμα με ένα histogram όλων των τιμών
+    assert same(left, histogram(np.concatenate([latencies(seed) for seed in (2, 3, 4)])))
+    assert same(copy.deepcopy(a).merge(LatencyHistogram()), a)
+
+    with pytest.raises(ValueError):
+        a.merge(LatencyHistogram(precision=0.05))
+
+
+def test_encode_decode():
+    hist = histogram(latencies(5))
+    decoded = LatencyHistogram.decode(hist.encode())
+    assert same(decoded, hist)
+    assert [decoded.percentile(q) for q in PERCENTILES] == [hist.percentile(q) for q in PERCENTILES]
+
+    empty = LatencyHistogram.decode(LatencyHistogram().encode())
+    assert empty.count == 0 and empty.min == math.inf and empty.percentile(99) is None
+    # Ένα decoded histogram ενώνεται με ένα καινούργιο (aggregation του concurrency sweep)
+    assert same(empty.merge(decoded), hist)